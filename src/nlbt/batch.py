@@ -0,0 +1,116 @@
+"""Headless batch mode: run many fully-specified strategies in parallel."""
+
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+REQUIRED_FIELDS = ["ticker", "period", "capital", "strategy"]
+
+
+def load_jobs(path: str) -> list:
+    """Read one JSON object per line: ticker, period, capital, strategy[, lang, id]."""
+    jobs = []
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                job = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{lineno}: invalid JSON ({e.msg})") from e
+            missing = [k for k in REQUIRED_FIELDS if not job.get(k)]
+            if missing:
+                raise ValueError(f"{path}:{lineno}: missing {', '.join(missing)}")
+            job.setdefault("id", f"job{lineno:04d}")
+            jobs.append(job)
+    return jobs
+
+
+def run_job(job: dict, model: str = None, reports_dir: str = "reports") -> dict:
+    """Feed one job straight into Phase 2/3 and describe the outcome."""
+    from .reflection import ReflectionEngine
+
+    started = time.time()
+    engine = ReflectionEngine(model, interactive=False, reports_dir=reports_dir)
+    engine.requirements = {k: job[k] for k in REQUIRED_FIELDS}
+    if job.get("lang"):
+        engine.requirements["lang"] = job["lang"]
+    engine.phase = "implementation"
+    try:
+        engine._phase2_implementation()
+        error = "" if engine.phase == "complete" else engine.last_error
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return {
+        "id": job["id"],
+        "status": "ok" if engine.phase == "complete" else "failed",
+        "report_dir": engine.run_dir if engine.phase == "complete" else None,
+        "tldr": engine.tldr,
+        "error": error,
+        "seconds": round(time.time() - started, 1),
+        **{k: job[k] for k in REQUIRED_FIELDS},
+    }
+
+
+def run_batch(path: str, workers: int = 4, model: str = None, reports_dir: str = "reports") -> str:
+    """Run every job in `path` with `workers` engines; return the index folder.
+
+    Each finished job is appended to index.jsonl immediately, so a partial
+    run still leaves a usable index; index.md is written at the end.
+    """
+    jobs = load_jobs(path)
+    batch_dir = os.path.join(reports_dir, f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    os.makedirs(batch_dir, exist_ok=True)
+    index_path = os.path.join(batch_dir, "index.jsonl")
+    lock = threading.Lock()
+    rows = []
+
+    print(f"📦 Batch: {len(jobs)} jobs, {workers} workers → {batch_dir}")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_job, job, model, reports_dir): job for job in jobs}
+        for future in as_completed(futures):
+            row = future.result()
+            with lock:
+                rows.append(row)
+                with open(index_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            mark = "✅" if row["status"] == "ok" else "❌"
+            print(f"{mark} [{len(rows)}/{len(jobs)}] {row['id']} {row['ticker']} {row['period']} ({row['seconds']}s)")
+
+    order = {job["id"]: i for i, job in enumerate(jobs)}
+    rows.sort(key=lambda r: order[r["id"]])
+    with open(os.path.join(batch_dir, "index.md"), "w", encoding="utf-8") as f:
+        ok = sum(r["status"] == "ok" for r in rows)
+        f.write(f"# Batch {os.path.basename(path)}\n\n{ok}/{len(rows)} succeeded\n\n")
+        f.write("| id | ticker | period | status | report | summary |\n|---|---|---|---|---|---|\n")
+        for r in rows:
+            report = os.path.relpath(r["report_dir"], batch_dir) if r["report_dir"] else ""
+            summary = ((r["tldr"] or r["error"] or "").splitlines() or [""])[0]
+            f.write(f"| {r['id']} | {r['ticker']} | {r['period']} | {r['status']} | {report} | {summary.replace('|', '/')} |\n")
+    return batch_dir
+
+
+def main(argv=None):
+    """Entry point for `nlbt batch strategies.jsonl --workers N`."""
+    parser = argparse.ArgumentParser(prog="nlbt batch", description="Run many strategies headlessly.")
+    parser.add_argument("jobs", help="JSONL file, one strategy per line")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent engines (default 4)")
+    parser.add_argument("--model", default=None, help="chat/report model (default: llm default)")
+    parser.add_argument("--reports-dir", default="reports", help="where report folders are written")
+    args = parser.parse_args(argv)
+
+    # .env settings take precedence over the batch defaults below
+    from .llm import load_env
+    load_env()
+
+    # In-process execution is serialized, so run backtests in worker processes
+    os.environ.setdefault("NLBT_SANDBOX_BACKEND", "pool")
+    os.environ.setdefault("NLBT_WORKERS", str(args.workers))
+
+    batch_dir = run_batch(args.jobs, args.workers, args.model, args.reports_dir)
+    print(f"📄 Index: {os.path.join(batch_dir, 'index.md')}")
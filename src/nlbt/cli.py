@@ -1,22 +1,57 @@
 """Minimal CLI for reflection backtesting."""
 
 import sys
-from .reflection import ReflectionEngine
-from datetime import datetime
 import os
-from rich.console import Console
-from rich.panel import Panel
+import threading
+
+STREAM_TITLES = {"plan": "🗺️ Planning report", "report": "📝 Writing report"}
+
+
+class StreamPrinter:
+    """Print streamed report text, stopping the active spinner on the first chunk."""
+
+    def __init__(self, console):
+        self.console = console
+        self.status = None
+        self.stage = None
+
+    def start(self, status):
+        self.status = status
+        self.stage = None
+        return status
+
+    def __call__(self, stage, chunk):
+        if self.status is not None:
+            self.status.stop()
+            self.status = None
+        if stage != self.stage:
+            self.stage = stage
+            self.console.print(f"\n[bold]{STREAM_TITLES.get(stage, stage)}[/bold] [dim](Ctrl+C to stop)[/dim]")
+        self.console.print(chunk, end="", style="dim" if stage == "plan" else None,
+                           markup=False, highlight=False, soft_wrap=True)
 
 
 def main():
     """Run the backtesting assistant."""
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from .batch import main as batch_main
+        return batch_main(sys.argv[2:])
+    
+    # Deferred so `nlbt batch` and --help style paths stay light; heavy
+    # libraries (pandas, backtesting, matplotlib) load on first backtest
+    from rich.console import Console
+    from rich.panel import Panel
+    from .reflection import ReflectionEngine
+
     model = sys.argv[1] if len(sys.argv) > 1 else None
     engine = ReflectionEngine(model)
     console = Console()
+    printer = StreamPrinter(console)
+    engine.stream_sink = printer
     header = (
         f"[bold cyan]🧠 Backtesting Assistant (WIP)[/bold cyan]\n"
-        f"[dim]Chat model:[/dim] {engine.llm.model}\n"
-        f"[dim]Code model:[/dim] {engine.code_llm.model} (strong model for implementation)\n\n"
+        f"[dim]Chat model:[/dim] {engine.llm.model_label()}\n"
+        f"[dim]Code model:[/dim] {engine.code_llm.model_label()} (strong model for implementation)\n\n"
         "[bold]📋 How it works:[/bold]\n"
         "  • Phase 1 (🔍 Understanding): Ask until info is complete\n"
         "  • Phase 2 (⚙️ Implementation): Generate, test, refine code\n"
@@ -31,10 +66,13 @@ def main():
         "  • Describe your strategy (e.g. 'Buy SPY when RSI < 30')\n"
         "  • Type 'info' for current phase and requirements\n"
         "  • Type 'debug' for internal state\n"
+        "  • Type 'sweep rsi_low=25,30 rsi_high=70,75' to grid-search the last strategy\n"
         "  • Type 'exit' to quit\n\n"
         "🚀 Ready! Describe your single-ticker trading strategy..."
     )
     console.print(Panel.fit(header, title="NLBT", border_style="cyan"))
+    # Resolve the transport and default model while the user types
+    threading.Thread(target=lambda: engine.llm.model, daemon=True).start()
     
     while True:
         try:
@@ -60,11 +98,18 @@ def main():
                 # Submit a default NL prompt through the same agent path; no auto-proceed
                 console.print("\n[bold]🎲 I'm feeling lucky[/bold] — using: [dim]Buy and hold AAPL in 2024 with $10,000[/dim]")
                 default_prompt = "Buy and hold AAPL in 2024 with $10,000"
-                with Console().status("Processing...", spinner="dots"):
+                with printer.start(Console().status("Processing...", spinner="dots")):
                     resp = engine.chat(default_prompt)
                 Console().print(f"\n🤖 {resp}\n")
                 continue
             
+            if user_input.lower() == "sweep" or user_input.lower().startswith("sweep "):
+                # Local parameter grid over the last generated strategy (no LLM calls)
+                with Console().status("🧪 Sweeping parameters...", spinner="dots"):
+                    resp = engine.sweep(user_input[5:].strip())
+                Console().print(f"\n🤖 {resp}\n")
+                continue
+            
             if user_input.lower() == "info":
                 phase_info = {
                     "understanding": "🔍 Phase 1 - Gathering requirements and asking clarifying questions",
@@ -138,8 +183,17 @@ def main():
                 "complete": "✅"
             }
             
-            with Console().status(f"{phase_emoji.get(engine.phase, '🤔')} Processing...", spinner="dots"):
-                response = engine.chat(user_input)
+            try:
+                with printer.start(Console().status(f"{phase_emoji.get(engine.phase, '🤔')} Processing...", spinner="dots")):
+                    response = engine.chat(user_input)
+            except KeyboardInterrupt:
+                if engine.phase != "reporting":
+                    raise
+                console.print(
+                    f"\n\n⏹️ Report generation stopped. Partial draft: {engine.run_dir}/report.md\n"
+                    "Send any message to generate the report again.\n"
+                )
+                continue
             Console().print(f"\n🤖 {response}\n")
 
             # Check if conversation is complete and handle accordingly
@@ -0,0 +1,110 @@
+"""Rule-based critic: check a finished backtest against the requirements.
+
+Ticker, date coverage, initial cash and the presence of stats are facts in
+the sandbox result, so most runs can be accepted or rejected without an
+LLM call. Only cases the rules can't decide are left to the LLM critic.
+"""
+
+import re
+from datetime import date
+
+from .precheck import parse_cash
+
+PROCEED = "PROCEED"
+RETRY = "RETRY"
+
+# Slack for weekends/holidays at period edges, and how much earlier data may
+# start to warm up long indicators (e.g. a 200-day SMA)
+EDGE_DAYS = 7
+WARMUP_DAYS = 400
+CASH_TOLERANCE = 0.005
+
+_DATE = r"\d{4}-\d{2}-\d{2}"
+_SYMBOL = re.compile(r"^\^?[A-Z0-9][A-Z0-9.\-=]{0,14}$")
+
+
+def parse_period(text: str):
+    """'2024', '2020-2024', '2023 to 2024' or two ISO dates → (start, end) Timestamps.
+
+    Returns None for anything else (e.g. 'last 5 years').
+    """
+    import pandas as pd
+
+    text = (text or "").strip()
+    dates = re.findall(_DATE, text)
+    if len(dates) == 2 and re.fullmatch(rf"\s*{_DATE}\s*(?:-|–|to|until|through)\s*{_DATE}\s*", text):
+        return pd.Timestamp(dates[0]), pd.Timestamp(dates[1])
+    match = re.fullmatch(r"\s*(\d{4})\s*(?:(?:-|–|to|until|through)\s*(\d{4}))?\s*", text)
+    if match:
+        first = int(match.group(1))
+        last = int(match.group(2) or first)
+        if 1900 < first <= last < 2200:
+            return pd.Timestamp(f"{first}-01-01"), pd.Timestamp(f"{last}-12-31")
+    return None
+
+
+def _same_ticker(wanted: str, used: str) -> bool:
+    wanted, used = wanted.strip().upper(), used.strip().upper()
+    return wanted == used or wanted.lstrip("^") == used.split(".")[0].lstrip("^")
+
+
+def review(requirements: dict, result: dict):
+    """Return (decision, reasons): PROCEED, RETRY, or None when undecided."""
+    import pandas as pd
+
+    artifacts = result.get("artifacts") or {}
+    stats = artifacts.get("stats")
+    if stats is None or "Return [%]" not in stats.index:
+        if "Return [%]" in (result.get("output") or ""):
+            # Printed stats without emit_result: only the LLM can read them
+            return None, ["stats were printed but not emitted"]
+        return RETRY, ["no backtest stats were produced; call emit_result(stats) after bt.run()"]
+
+    failures = []
+    unsure = []
+
+    # Ticker: what the script actually downloaded
+    wanted = (requirements.get("ticker") or "").strip()
+    used = [r["ticker"] for r in result.get("data_requests") or []]
+    if not used:
+        unsure.append("no get_ohlcv_data call was recorded")
+    elif not all(_same_ticker(wanted, t) for t in used):
+        if _SYMBOL.match(wanted.upper()):
+            failures.append(f"ticker: requested {wanted}, code downloaded {', '.join(sorted(set(used)))}")
+        else:
+            unsure.append(f"ticker '{wanted}' is not a plain symbol")
+
+    # Period: the backtest must span the requested dates
+    period = parse_period(requirements.get("period"))
+    if period is None:
+        unsure.append(f"period '{requirements.get('period')}' is not a fixed date range")
+    else:
+        start, end = period
+        end = min(end, pd.Timestamp(date.today()) - pd.Timedelta(days=1))
+        ran_from, ran_to = pd.Timestamp(stats["Start"]), pd.Timestamp(stats["End"])
+        slack = pd.Timedelta(days=EDGE_DAYS)
+        span = f"backtest ran {ran_from.date()}..{ran_to.date()}, requested {start.date()}..{end.date()}"
+        if ran_to > end + slack or ran_from < start - pd.Timedelta(days=WARMUP_DAYS):
+            failures.append(f"period: {span}")
+        elif ran_from > start + slack or ran_to < end - slack:
+            asked = [r for r in result.get("data_requests") or []
+                     if pd.Timestamp(r["start"]) <= start + slack and pd.Timestamp(r["end"]) >= end - slack]
+            if asked:
+                # The code asked for the right dates; history may simply be shorter
+                unsure.append(f"period: {span} (data may not exist)")
+            else:
+                failures.append(f"period: {span}")
+
+    # Cash: the first equity value is the starting cash
+    expected = parse_cash(requirements.get("capital") or "")
+    initial = (artifacts.get("summary") or {}).get("initial")
+    if expected is None or initial is None:
+        unsure.append(f"capital '{requirements.get('capital')}' could not be compared")
+    elif abs(initial - expected) > CASH_TOLERANCE * expected:
+        failures.append(f"cash: requested {expected:g}, backtest started with {initial:g}")
+
+    if failures:
+        return RETRY, failures
+    if unsure:
+        return None, unsure
+    return PROCEED, ["stats present; ticker, period and initial cash match the requirements"]
@@ -0,0 +1,176 @@
+"""Persistent on-disk OHLCV cache for get_ohlcv_data()."""
+
+import json
+import os
+import threading
+from datetime import date, datetime, timedelta
+
+
+def _to_date(value) -> date:
+    """Coerce 'YYYY-MM-DD' strings, datetimes and Timestamps to a date."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def normalize_ohlcv(data):
+    """Normalize a yfinance frame: naive DatetimeIndex, flat OHLCV columns, sorted."""
+    import pandas as pd
+
+    # Handle MultiIndex columns (yfinance returns (column_name, ticker))
+    # We need to keep just the column names: Open, High, Low, Close, Volume
+    if isinstance(data.columns, pd.MultiIndex):
+        data.columns = data.columns.droplevel(1)
+
+    # Remove timezone if present
+    if getattr(data.index, "tz", None) is not None:
+        data = data.tz_localize(None)
+
+    data.index.name = "Date"
+    data = data[~data.index.duplicated(keep="last")].sort_index()
+    return data
+
+
+def _download(ticker: str, start: date, end: date):
+    """Fetch [start, end) from Yahoo Finance."""
+    import yfinance as yf
+
+    return yf.download(ticker, start=start.isoformat(), end=end.isoformat(), progress=False)
+
+
+# Parquet schema metadata key holding the covered [start, end) span
+_SPAN_KEY = b"nlbt_span"
+# Longest run of days without bars (weekends, holidays) that is not an outage
+GAP_DAYS = 7
+
+
+class OHLCVCache:
+    """Per-ticker Parquet store that only downloads missing edge segments.
+
+    Each ticker keeps one frame (`<TICKER>.parquet`) whose schema metadata
+    records the contiguous [start, end) span that has been fetched, so one
+    `os.replace` commits rows and span together even with several writers.
+    Segments that come back without rows next to cached bars (weekends and
+    holidays after the last bar, days before a listing) count as covered
+    and are not re-requested; a raised fetch, an empty first download or
+    an empty stretch longer than `GAP_DAYS` after the last bar is retried
+    next time. Set `NLBT_OFFLINE=1` to serve only what is already on disk.
+    """
+
+    def __init__(self, cache_dir: str = None, fetch=None, offline: bool = None):
+        root = cache_dir or os.getenv("CACHE_DIR") or ".cache"
+        self.cache_dir = os.path.join(root, "ohlcv")
+        self.fetch = fetch or _download
+        if offline is None:
+            offline = os.getenv("NLBT_OFFLINE", "").lower() in ("1", "true", "yes")
+        self.offline = offline
+        self._lock = threading.Lock()
+
+    def get(self, ticker: str, start, end):
+        """Return OHLCV bars for [start, end), fetching only what is missing."""
+        start, end = _to_date(start), _to_date(end)
+        with self._lock:
+            data, span = self._load(ticker)
+            if not self.offline:
+                data, span = self._fill(ticker, data, span, start, end)
+        if data is None:
+            raise ValueError(f"No data found for {ticker} between {start} and {end}")
+        mask = (data.index >= str(start)) & (data.index < str(end))
+        return data.loc[mask].copy()
+
+    def _fill(self, ticker, data, span, start, end):
+        """Download the segments of [start, end) not covered by span."""
+        # Never mark future (or today's still-forming) bars as covered
+        end_cov = min(end, date.today())
+        if span is None:
+            segments = [(start, end)]
+        else:
+            segments = []
+            if start < span[0]:
+                segments.append((start, span[0]))
+            if end > span[1]:
+                segments.append((span[1], end))
+        if not segments:
+            return data, span
+
+        frames = [data] if data is not None and len(data) else []
+        new_span = span
+        error = None
+        for seg_start, seg_end in segments:
+            if seg_start >= seg_end:
+                continue
+            try:
+                fetched = self.fetch(ticker, seg_start, seg_end)
+            except Exception as e:
+                error = e
+                continue
+            seg_end = min(seg_end, end_cov)
+            if fetched is not None and len(fetched):
+                frames.append(normalize_ohlcv(fetched))
+            elif not (span and data is not None and len(data)):
+                # Nothing cached to anchor an empty answer to: maybe an outage
+                continue
+            elif seg_start >= span[1] and (seg_end - seg_start).days > GAP_DAYS:
+                # Too long to be a weekend or holiday: retry next time
+                continue
+            if seg_start < seg_end:
+                new_span = (seg_start, seg_end) if new_span is None else (
+                    min(seg_start, new_span[0]), max(seg_end, new_span[1]))
+        if new_span == span:
+            if error is not None:
+                raise error
+            return data, span
+
+        import pandas as pd
+
+        merged = normalize_ohlcv(pd.concat(frames)) if len(frames) > 1 else frames[0]
+        try:
+            self._save(ticker, merged, new_span)
+        except Exception:
+            # Cache write failures must never break a backtest
+            pass
+        if error is not None:
+            # Keep what did download, but don't hand back a silently short frame
+            raise error
+        return merged, new_span
+
+    def _path(self, ticker: str):
+        slug = ticker.upper().replace("/", "_").replace("^", "_")
+        return os.path.join(self.cache_dir, slug + ".parquet")
+
+    def _load(self, ticker: str):
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return None, None
+        try:
+            import pyarrow.parquet as pq
+
+            table = pq.read_table(path)
+            span = json.loads((table.schema.metadata or {})[_SPAN_KEY])
+            return table.to_pandas(), (_to_date(span["start"]), _to_date(span["end"]))
+        except Exception:
+            return None, None
+
+    def _save(self, ticker: str, data, span):
+        """Write rows and span as one file, replaced atomically."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(ticker)
+        table = pa.Table.from_pandas(data)
+        metadata = dict(table.schema.metadata or {})
+        metadata[_SPAN_KEY] = json.dumps({"start": span[0].isoformat(), "end": span[1].isoformat()}).encode("utf-8")
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        pq.write_table(table.replace_schema_metadata(metadata), tmp)
+        os.replace(tmp, path)
+
+    def seed(self, ticker: str, data, start=None, end=None):
+        """Pre-populate the cache (e.g. for offline tests)."""
+        data = normalize_ohlcv(data)
+        start = _to_date(start or data.index[0])
+        end = _to_date(end) if end else _to_date(data.index[-1]) + timedelta(days=1)
+        with self._lock:
+            self._save(ticker, data, (start, end))
@@ -0,0 +1,120 @@
+"""Bounded results digest for LLM prompts (instead of raw backtest output)."""
+
+import os
+
+# Rough chars-per-token ratio for budgeting without a tokenizer dependency
+CHARS_PER_TOKEN = 4
+
+
+def default_budget() -> int:
+    """Token budget for the results block of one prompt (NLBT_RESULTS_TOKENS)."""
+    return int(os.getenv("NLBT_RESULTS_TOKENS", 1500))
+
+
+def build_digest(artifacts: dict = None, output: str = "", token_budget: int = None) -> str:
+    """Summarize a backtest into a compact, size-bounded text block.
+
+    Sections are added in priority order (stats, downsampled equity,
+    drawdown episodes, best/worst trades) until the budget is used up.
+    Without structured artifacts the raw output is stripped of CSV dumps
+    and truncated to the same budget.
+    """
+    budget = (token_budget or default_budget()) * CHARS_PER_TOKEN
+    if not artifacts:
+        return _truncate(_strip_csv_blocks(output or ""), budget)
+
+    sections = []
+    stats = artifacts.get("stats")
+    if stats is not None:
+        sections.append("STATS:\n" + "\n".join(f"{k}: {_fmt(v)}" for k, v in stats.items()))
+    equity = artifacts.get("equity")
+    if equity is not None and len(equity) and "Equity" in equity.columns:
+        sections.append(_equity_section(equity["Equity"], points=24))
+        sections.append(_drawdown_section(equity["Equity"], top=3))
+    trades = artifacts.get("trades")
+    if trades is not None and len(trades):
+        sections.append(_trades_section(trades, n=5))
+
+    digest = ""
+    for section in sections:
+        candidate = (digest + "\n\n" + section) if digest else section
+        if len(candidate) > budget:
+            break
+        digest = candidate
+    return digest or _truncate(sections[0] if sections else "", budget)
+
+
+def _fmt(value) -> str:
+    # Fixed-point: scientific notation ("1.046e+05") confuses the critic
+    if isinstance(value, float):
+        if value != value or value in (float("inf"), float("-inf")):
+            return str(value)
+        return f"{value:,.2f}" if value == 0 or abs(value) >= 1 else f"{value:.4f}"
+    return str(value)
+
+
+def _truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    return text[:limit].rstrip() + "\n[... truncated ...]"
+
+
+def _strip_csv_blocks(text: str) -> str:
+    """Drop legacy TRADES_CSV/EQUITY_CSV dumps, keep everything before them."""
+    for marker in ("TRADES_TABLE", "TRADES_CSV", "EQUITY_CSV"):
+        if marker in text:
+            text = text.split(marker, 1)[0]
+    return text.strip()
+
+
+def _equity_section(equity, points: int) -> str:
+    step = max(1, len(equity) // points)
+    positions = list(range(0, len(equity), step))
+    if positions[-1] != len(equity) - 1:
+        positions.append(len(equity) - 1)
+    sampled = equity.iloc[positions]
+    rows = [f"{_label(idx)}: {val:,.2f}" for idx, val in sampled.items()]
+    return f"EQUITY (every {step} bars, {len(equity)} total):\n" + "\n".join(rows)
+
+
+def _drawdown_section(equity, top: int) -> str:
+    drawdown = equity / equity.cummax() - 1
+    episodes = []
+    start = None
+    for i, dd in enumerate(drawdown.to_numpy()):
+        if dd < 0 and start is None:
+            start = i
+        elif dd >= 0 and start is not None:
+            episodes.append((start, i))
+            start = None
+    if start is not None:
+        episodes.append((start, len(drawdown)))
+
+    ranked = sorted(episodes, key=lambda ep: drawdown.iloc[ep[0]:ep[1]].min())[:top]
+    if not ranked:
+        return "DRAWDOWN EPISODES: none"
+    rows = []
+    for s, e in ranked:
+        window = drawdown.iloc[s:e]
+        recovered = _label(drawdown.index[e]) if e < len(drawdown) else "not recovered"
+        rows.append(
+            f"{_label(window.index[0])} -> trough {_label(window.idxmin())} "
+            f"({window.min() * 100:.2f}%) -> {recovered}, {e - s} bars"
+        )
+    return f"DRAWDOWN EPISODES (worst {len(rows)}):\n" + "\n".join(rows)
+
+
+def _trades_section(trades, n: int) -> str:
+    cols = [c for c in ("EntryTime", "ExitTime", "Size", "EntryPrice", "ExitPrice", "PnL", "ReturnPct") if c in trades.columns]
+    ordered = trades.sort_values("ReturnPct") if "ReturnPct" in trades.columns else trades
+    worst = ordered.head(n)
+    best = ordered.tail(n).iloc[::-1]
+    fmt = lambda df: "\n".join(", ".join(f"{c}={_fmt(row[c])}" for c in cols) for _, row in df.iterrows())
+    return (
+        f"TRADES ({len(trades)} total)\nBEST {len(best)}:\n{fmt(best)}\n"
+        f"WORST {len(worst)}:\n{fmt(worst)}"
+    )
+
+
+def _label(idx) -> str:
+    return str(idx.date()) if hasattr(idx, "date") else str(idx)
@@ -0,0 +1,233 @@
+"""Vectorized indicators for generated strategies, exposed as `ind` in the sandbox.
+
+Use them through backtesting.py's `self.I`, e.g.
+`self.rsi = self.I(ind.rsi, self.data.Close, 14)`. Results are memoized by
+(indicator, content hash of the input arrays, params) in memory and under
+`$CACHE_DIR/indicators`, so re-running a strategy on the same bars (or a
+parameter sweep revisiting a setting) gets the arrays back without
+recomputing. Keys include a hash of this module's source, so fixing a
+formula invalidates its arrays. The directory keeps the
+`NLBT_INDICATOR_CACHE_MAX_ENTRIES` most recently used files (default
+5000). `NLBT_INDICATOR_CACHE=0` keeps the cache in memory only.
+"""
+
+import functools
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+MEMORY_ENTRIES = 512
+# Disk writes between two prunes of $CACHE_DIR/indicators
+PRUNE_EVERY = 64
+
+_memory = OrderedDict()
+_lock = threading.Lock()
+_writes = 0
+_source_hash = None
+stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+
+
+def _cache_dir():
+    if os.getenv("NLBT_INDICATOR_CACHE", "1").lower() in ("0", "false", "no"):
+        return None
+    return os.path.join(os.getenv("CACHE_DIR") or ".cache", "indicators")
+
+
+def _source_version() -> bytes:
+    """Hash of this module's source (once per process)."""
+    global _source_hash
+    if _source_hash is None:
+        try:
+            with open(__file__, "rb") as f:
+                _source_hash = hashlib.blake2b(f.read(), digest_size=8).digest()
+        except OSError:
+            _source_hash = b""
+    return _source_hash
+
+
+def _key(name: str, arrays, params) -> str:
+    import numpy as np
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(_source_version())
+    digest.update(name.encode("utf-8"))
+    for arr in arrays:
+        arr = np.ascontiguousarray(arr, dtype=float)
+        digest.update(str(arr.shape).encode("ascii"))
+        digest.update(arr.tobytes())
+    digest.update(repr(params).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _remember(key, value):
+    with _lock:
+        _memory[key] = value
+        _memory.move_to_end(key)
+        while len(_memory) > MEMORY_ENTRIES:
+            _memory.popitem(last=False)
+
+
+def _prune(root: str):
+    """Drop the least recently used files beyond the entry limit."""
+    limit = int(os.getenv("NLBT_INDICATOR_CACHE_MAX_ENTRIES", 5000))
+    try:
+        entries = [e for e in os.scandir(root) if e.name.endswith(".npy")]
+    except OSError:
+        return
+    if len(entries) <= limit:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime)
+    for entry in entries[:len(entries) - limit]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def _stored(root: str):
+    """Count a disk write; prune every PRUNE_EVERY writes."""
+    global _writes
+    with _lock:
+        _writes += 1
+        due = _writes % PRUNE_EVERY == 0
+    if due:
+        _prune(root)
+
+
+def cached(n_series: int = 1):
+    """Memoize an indicator whose first `n_series` arguments are price arrays."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            import numpy as np
+
+            arrays = args[:n_series]
+            params = (args[n_series:], sorted(kwargs.items()))
+            key = _key(func.__name__, arrays, params)
+            with _lock:
+                hit = _memory.get(key)
+                if hit is not None:
+                    _memory.move_to_end(key)
+                    stats["hits"] += 1
+                    return hit.copy()
+
+            root = _cache_dir()
+            path = os.path.join(root, f"{key}.npy") if root else None
+            if path and os.path.exists(path):
+                try:
+                    value = np.load(path)
+                    os.utime(path)
+                    stats["disk_hits"] += 1
+                    _remember(key, value)
+                    return value.copy()
+                except Exception:
+                    pass
+
+            stats["misses"] += 1
+            value = np.asarray(func(*[np.asarray(a, dtype=float) for a in arrays], *args[n_series:], **kwargs), dtype=float)
+            _remember(key, value)
+            if path:
+                try:
+                    os.makedirs(root, exist_ok=True)
+                    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                    with open(tmp, "wb") as f:
+                        np.save(f, value)
+                    os.replace(tmp, path)
+                    _stored(root)
+                except OSError:
+                    pass
+            return value.copy()
+        return wrapper
+    return decorator
+
+
+def _series(values):
+    import pandas as pd
+    return pd.Series(values)
+
+
+@cached()
+def sma(values, n: int = 20):
+    """Simple moving average."""
+    return _series(values).rolling(n).mean().to_numpy()
+
+
+@cached()
+def ema(values, n: int = 20):
+    """Exponential moving average (span n, no adjustment)."""
+    return _series(values).ewm(span=n, adjust=False).mean().to_numpy()
+
+
+@cached()
+def rsi(values, n: int = 14):
+    """Relative Strength Index with simple rolling averages of gains/losses."""
+    delta = _series(values).diff()
+    gain = delta.where(delta > 0, 0).rolling(n).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(n).mean()
+    return (100 - 100 / (1 + gain / loss)).to_numpy()
+
+
+@cached()
+def macd(values, fast: int = 12, slow: int = 26):
+    """MACD line: EMA(fast) - EMA(slow)."""
+    s = _series(values)
+    return (s.ewm(span=fast, adjust=False).mean() - s.ewm(span=slow, adjust=False).mean()).to_numpy()
+
+
+@cached()
+def macd_signal(values, fast: int = 12, slow: int = 26, signal: int = 9):
+    """Signal line: EMA(signal) of the MACD line."""
+    return _series(macd(values, fast, slow)).ewm(span=signal, adjust=False).mean().to_numpy()
+
+
+@cached()
+def macd_hist(values, fast: int = 12, slow: int = 26, signal: int = 9):
+    """MACD histogram: line minus signal."""
+    return macd(values, fast, slow) - macd_signal(values, fast, slow, signal)
+
+
+@cached()
+def bbands(values, n: int = 20, k: float = 2.0):
+    """Bollinger Bands as rows (upper, middle, lower)."""
+    import numpy as np
+
+    s = _series(values)
+    mid = s.rolling(n).mean()
+    std = s.rolling(n).std()
+    return np.vstack([(mid + k * std).to_numpy(), mid.to_numpy(), (mid - k * std).to_numpy()])
+
+
+@cached()
+def roc(values, n: int = 10):
+    """Rate of change in percent over n bars."""
+    return (_series(values).pct_change(n) * 100).to_numpy()
+
+
+@cached(n_series=3)
+def atr(high, low, close, n: int = 14):
+    """Average True Range (simple rolling mean of the true range)."""
+    import pandas as pd
+
+    prev_close = pd.Series(close).shift()
+    true_range = pd.concat([
+        pd.Series(high) - pd.Series(low),
+        (pd.Series(high) - prev_close).abs(),
+        (pd.Series(low) - prev_close).abs(),
+    ], axis=1).max(axis=1)
+    return true_range.rolling(n).mean().to_numpy()
+
+
+@cached(n_series=3)
+def stoch(high, low, close, n: int = 14, d: int = 3):
+    """Stochastic oscillator as rows (%K, %D)."""
+    import numpy as np
+    import pandas as pd
+
+    lowest = pd.Series(low).rolling(n).min()
+    highest = pd.Series(high).rolling(n).max()
+    k = 100 * (pd.Series(close) - lowest) / (highest - lowest)
+    return np.vstack([k.to_numpy(), k.rolling(d).mean().to_numpy()])
+
+
+INDICATORS = ["sma", "ema", "rsi", "macd", "macd_signal", "macd_hist", "bbands", "roc", "atr", "stoch"]
@@ -1,48 +1,426 @@
-"""Minimal LLM client using llm CLI."""
+"""Minimal LLM client using the llm CLI or the in-process llm Python API."""
 
+import codecs
+import contextlib
+import json
+import queue
 import subprocess
 import os
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
 from typing import List, Dict
 
-# Auto-load .env if available (non-fatal if missing)
-try:
-    from dotenv import load_dotenv  # type: ignore
-    load_dotenv()
-except Exception:
-    pass
+from .prompt_cache import get_prompt_cache
 
+# How long a resolved `llm models default` answer is trusted on disk
+DEFAULT_MODEL_TTL = 24 * 3600
+FALLBACK_MODEL = "gpt-4o-mini"
 
-class LLM:
-    """Simple LLM wrapper."""
-    
-    def __init__(self, model: str = None):
-        self.model = model or os.getenv("LLM_MODEL") or self._get_default()
-    
-    def _get_default(self) -> str:
+_env_loaded = False
+
+
+def load_env():
+    """Load .env once, on first use rather than at import (non-fatal if missing)."""
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+    try:
+        from dotenv import load_dotenv  # type: ignore
+        load_dotenv()
+    except Exception:
+        pass
+
+
+class SubprocessTransport:
+    """Spawn `llm -m <model>` for every prompt (original behaviour)."""
+
+    name = "cli"
+
+    def default_model(self) -> str:
         """Get default model from llm CLI."""
-        try:
-            result = subprocess.run(
-                ["llm", "models", "default"],
-                capture_output=True, text=True, timeout=5
-            )
-            if result.returncode == 0 and result.stdout.strip():
-                return result.stdout.strip()
-        except:
-            pass
-        return "gpt-4o-mini"
-    
-    def ask(self, prompt: str) -> str:
-        """Ask LLM a question, get response."""
         result = subprocess.run(
-            ["llm", "-m", self.model],
+            ["llm", "models", "default"],
+            capture_output=True, text=True, timeout=5
+        )
+        if result.returncode == 0 and result.stdout.strip():
+            return result.stdout.strip()
+        return ""
+
+    @staticmethod
+    def _args(model: str, options: dict = None) -> list:
+        args = ["llm", "-m", model]
+        for key, value in (options or {}).items():
+            args += ["-o", key, str(value)]
+        return args
+
+    def ask(self, model: str, prompt: str, timeout: int = 120, options: dict = None) -> str:
+        result = subprocess.run(
+            self._args(model, options),
             input=prompt,
             capture_output=True,
             text=True,
-            timeout=120
+            timeout=timeout
         )
-        
+
         if result.returncode != 0:
             raise RuntimeError(f"LLM failed: {result.stderr}")
-        
+
         return result.stdout.strip()
 
+    def stream(self, model: str, prompt: str, timeout: int = 120, options: dict = None):
+        """Yield stdout as the CLI prints it; closing the iterator kills the process."""
+        proc = subprocess.Popen(
+            self._args(model, options),
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+        try:
+            proc.stdin.write(prompt.encode("utf-8"))
+            proc.stdin.close()
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            while True:
+                data = proc.stdout.read1(4096)
+                if not data:
+                    break
+                text = decoder.decode(data)
+                if text:
+                    yield text
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+            if proc.wait(timeout) != 0:
+                raise RuntimeError(f"LLM failed: {proc.stderr.read().decode('utf-8', 'replace')}")
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+
+
+class PythonTransport:
+    """Call the `llm` Python API in-process, reusing one model object per name.
+
+    Avoids interpreter startup, plugin discovery and key loading on every
+    prompt; the model objects (and their HTTP clients) live for the process.
+    """
+
+    name = "python"
+
+    def __init__(self):
+        self._models = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def available() -> bool:
+        try:
+            import llm  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def default_model(self) -> str:
+        import llm
+        return llm.get_default_model() or ""
+
+    def _model(self, name: str):
+        with self._lock:
+            if name not in self._models:
+                import llm
+                try:
+                    self._models[name] = llm.get_model(name)
+                except llm.UnknownModelError as e:
+                    raise RuntimeError(f"LLM failed: {e}")
+            return self._models[name]
+
+    def ask(self, model: str, prompt: str, timeout: int = 120, options: dict = None) -> str:
+        """Blocking prompt; a provider that hangs past `timeout` seconds raises."""
+        def call():
+            return self._model(model).prompt(prompt, **(options or {})).text().strip()
+
+        try:
+            return _with_deadline(call, timeout)
+        except RuntimeError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"LLM failed: {e}")
+
+    def stream(self, model: str, prompt: str, timeout: int = 120, options: dict = None):
+        """Yield chunks from the model's streaming response within `timeout` seconds.
+
+        The response is read on a daemon thread, so a stalled provider can't
+        block the caller past the deadline; closing the iterator stops it
+        at the next chunk.
+        """
+        chunks = queue.Queue()
+        stop = threading.Event()
+        done = object()
+
+        def produce():
+            try:
+                for chunk in self._model(model).prompt(prompt, **(options or {})):
+                    if stop.is_set():
+                        return
+                    chunks.put(chunk)
+                chunks.put(done)
+            except BaseException as e:
+                chunks.put(e)
+
+        threading.Thread(target=produce, name="nlbt-llm-stream", daemon=True).start()
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                try:
+                    item = chunks.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    raise RuntimeError(f"LLM failed: no response within {timeout}s")
+                if item is done:
+                    return
+                if isinstance(item, RuntimeError):
+                    raise item
+                if isinstance(item, BaseException):
+                    raise RuntimeError(f"LLM failed: {item}")
+                yield item
+        finally:
+            stop.set()
+
+
+def _with_deadline(func, timeout):
+    """Run `func` on a daemon thread; RuntimeError if it takes over `timeout` seconds.
+
+    The llm API has no portable per-request timeout, so a hung call is
+    abandoned (its thread finishes or dies with the process) rather than
+    blocking the caller, like the CLI transport's subprocess timeout.
+    """
+    future = Future()
+
+    def work():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func())
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=work, name="nlbt-llm", daemon=True).start()
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        raise RuntimeError(f"LLM failed: no response within {timeout}s")
+
+
+_TRANSPORTS = {}
+_TRANSPORTS_LOCK = threading.Lock()
+
+
+def get_transport(backend: str = None):
+    """Return the shared transport for `backend` ("python", "cli" or "auto").
+
+    Defaults to LLM_BACKEND, then "auto": in-process when the `llm` package
+    is importable, otherwise the CLI subprocess.
+    """
+    backend = (backend or os.getenv("LLM_BACKEND") or "auto").lower()
+    if backend == "auto":
+        backend = "python" if PythonTransport.available() else "cli"
+    with _TRANSPORTS_LOCK:
+        if backend not in _TRANSPORTS:
+            if backend == "python":
+                _TRANSPORTS[backend] = PythonTransport()
+            elif backend == "cli":
+                _TRANSPORTS[backend] = SubprocessTransport()
+            else:
+                raise ValueError(f"Unknown LLM backend: {backend}")
+        return _TRANSPORTS[backend]
+
+
+_DEFAULTS = {}
+_DEFAULTS_LOCK = threading.Lock()
+
+
+def _default_model_path() -> str:
+    return os.path.join(os.getenv("CACHE_DIR") or ".cache", "llm_default_model.json")
+
+
+def cached_default_model(backend: str = None) -> str:
+    """Default model recorded on disk for `backend`, or "" if unknown/stale."""
+    backend = backend or "auto"
+    if backend in _DEFAULTS:
+        return _DEFAULTS[backend]
+    try:
+        with open(_default_model_path(), "r", encoding="utf-8") as f:
+            entry = json.load(f).get(backend) or {}
+        if entry.get("model") and time.time() - entry.get("resolved", 0) < DEFAULT_MODEL_TTL:
+            return entry["model"]
+    except Exception:
+        pass
+    return ""
+
+
+def default_model(transport, backend: str = None) -> str:
+    """Resolve the llm default model once per process and cache it on disk.
+
+    Asking the backend costs a CLI spawn or the `llm` package import, so
+    the answer is kept for DEFAULT_MODEL_TTL in $CACHE_DIR.
+    """
+    backend = backend or "auto"
+    with _DEFAULTS_LOCK:
+        model = cached_default_model(backend)
+        if not model:
+            try:
+                model = transport().default_model()
+            except Exception:
+                model = ""
+            if model:
+                path = _default_model_path()
+                try:
+                    try:
+                        with open(path, "r", encoding="utf-8") as f:
+                            data = json.load(f)
+                    except Exception:
+                        data = {}
+                    data[backend] = {"model": model, "resolved": time.time()}
+                    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                    tmp = f"{path}.{os.getpid()}.tmp"
+                    with open(tmp, "w", encoding="utf-8") as f:
+                        json.dump(data, f)
+                    os.replace(tmp, path)
+                except Exception:
+                    pass
+        model = model or FALLBACK_MODEL
+        _DEFAULTS[backend] = model
+        return model
+
+
+class LLM:
+    """Simple LLM wrapper.
+
+    Construction is cheap: the transport (which may import the `llm`
+    package) and the default model are resolved on first use.
+    """
+
+    def __init__(self, model: str = None, backend: str = None, limit: threading.Semaphore = None):
+        load_env()
+        self.backend = backend
+        # Shared per-role semaphore bounding concurrent requests (see ModelRegistry)
+        self.limit = limit
+        self._transport = None
+        self._model = model or os.getenv("LLM_MODEL") or None
+
+    @property
+    def transport(self):
+        if self._transport is None:
+            self._transport = get_transport(self.backend)
+        return self._transport
+
+    @property
+    def model(self) -> str:
+        if self._model is None:
+            self._model = default_model(lambda: self.transport, self.backend or os.getenv("LLM_BACKEND"))
+        return self._model
+
+    @model.setter
+    def model(self, value: str):
+        self._model = value
+
+    def model_label(self) -> str:
+        """Model name for display without resolving it (may say 'llm default')."""
+        return self._model or cached_default_model(self.backend or os.getenv("LLM_BACKEND")) or "llm default"
+
+    def ask(self, prompt: str, cache: bool = False, temperature: float = None) -> str:
+        """Ask LLM a question, get response.
+
+        With cache=True, identical (model, prompt) pairs are answered from the
+        shared prompt cache; use it only for deterministic helper prompts.
+        `temperature` is passed as a model option (never cached).
+        """
+        options = {"temperature": temperature} if temperature is not None else None
+        store = get_prompt_cache() if cache and not options else None
+        if store is not None:
+            hit = store.get(self.model, prompt)
+            if hit is not None:
+                return hit
+
+        with self.limit or contextlib.nullcontext():
+            response = self.transport.ask(self.model, prompt, timeout=120, options=options)
+
+        if store is not None and response:
+            store.put(self.model, prompt, response)
+        return response
+
+    def stream(self, prompt: str, temperature: float = None):
+        """Iterate over the response in chunks as they arrive (never cached).
+
+        Closing the iterator early (or breaking out of the loop) aborts the
+        generation.
+        """
+        options = {"temperature": temperature} if temperature is not None else None
+        return self._limited(self.transport.stream(self.model, prompt, timeout=120, options=options))
+
+    def _limited(self, chunks):
+        # Holds a concurrency slot for the whole stream
+        with self.limit or contextlib.nullcontext():
+            try:
+                yield from chunks
+            finally:
+                chunks.close()
+
+
+# Roles used by the engine: env var naming the model, default model and
+# default number of concurrent requests per process
+ROLES = {
+    "chat": ("LLM_MODEL", None, 4),
+    "code": ("LLM_CODE_MODEL", "openrouter/anthropic/claude-3.5-sonnet", 4),
+    "fast": ("LLM_FAST_MODEL", "gpt-4o-mini", 8),
+}
+
+
+class ModelRegistry:
+    """One LLM client per (role, model), shared by every engine in the process.
+
+    Roles are chat (conversation, reports), code (generation, critic) and
+    fast (small helper prompts). Models come from `models`, then the role's
+    env var (LLM_MODEL, LLM_CODE_MODEL, LLM_FAST_MODEL), then the defaults
+    above; a chat model of None means the llm default. Each role has one
+    semaphore (`limits`, or LLM_<ROLE>_CONCURRENCY) shared by all of its
+    clients, so concurrent runs can't exceed the provider's rate limits.
+    """
+
+    def __init__(self, models: dict = None, limits: dict = None, backend: str = None):
+        # Concurrency limits are read here, so .env must be loaded first
+        load_env()
+        self.models = dict(models or {})
+        self.backend = backend
+        self.semaphores = {}
+        for role, (_, _, default_limit) in ROLES.items():
+            limit = (limits or {}).get(role) or int(os.getenv(f"LLM_{role.upper()}_CONCURRENCY", default_limit))
+            self.semaphores[role] = threading.BoundedSemaphore(max(1, limit))
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def model_name(self, role: str) -> str:
+        env, default, _ = ROLES[role]
+        return self.models.get(role) or os.getenv(env) or default
+
+    def get(self, role: str, model: str = None) -> LLM:
+        """Client for `role`, optionally pinned to a specific `model`."""
+        if role not in ROLES:
+            raise ValueError(f"Unknown model role: {role}")
+        load_env()
+        name = model or self.model_name(role)
+        with self._lock:
+            key = (role, name)
+            if key not in self._clients:
+                self._clients[key] = LLM(name, backend=self.backend, limit=self.semaphores[role])
+            return self._clients[key]
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Process-wide registry shared by all engines."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
@@ -5,9 +5,16 @@ import subprocess
 import sys
 from typing import Any, Dict, List, Optional
 
-from dotenv import load_dotenv
+_env_loaded = False
 
-load_dotenv()
+
+def _load_env():
+    """Load .env on first client construction instead of at import."""
+    global _env_loaded
+    if not _env_loaded:
+        _env_loaded = True
+        from dotenv import load_dotenv
+        load_dotenv()
 
 
 class LLMClient:
@@ -19,6 +26,7 @@ class LLMClient:
         Args:
             model: Model to use. If None, uses LLM_MODEL from .env
         """
+        _load_env()
         self.model = model or self._get_default_model()
     
     def _get_default_model(self) -> str:
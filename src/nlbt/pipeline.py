@@ -0,0 +1,217 @@
+"""Phase 2 as an explicit, resumable state machine.
+
+States and transitions:
+
+    generate ─▶ execute ─┬─▶ critique ─┬─▶ report ─▶ done
+                  ▲      │             │
+                  │      ▼             ▼
+                  └──── fix        revise ──▶ (back to execute)
+
+`fix` and `revise` start the next attempt; once `max_attempts` attempts
+have failed the machine stops in `failed`. Each `step()` runs one state,
+so a scheduler (threads or an asyncio loop via `run_async`) can interleave
+many engines, and `checkpoint()` / `restore()` let a run be resumed.
+"""
+
+import asyncio
+import hashlib
+import time
+
+from .digest import build_digest
+
+MAX_ATTEMPTS = 3
+TERMINAL = ("done", "failed")
+
+
+class Phase2Pipeline:
+    """Generate → execute → critique loop for one ReflectionEngine."""
+
+    def __init__(self, engine, max_attempts: int = MAX_ATTEMPTS, attempt: int = 1):
+        self.engine = engine
+        self.max_attempts = max_attempts
+        self.attempt = attempt
+        self.state = "generate" if attempt <= max_attempts else "failed"
+        # One record per finished attempt: outcome, error/critique, code hash
+        self.attempts = []
+        # One record per executed state: state, attempt, seconds
+        self.timings = []
+        self.message = None
+        self._result = None
+        self._verdict = None
+        self._announced = 0
+
+    @property
+    def done(self) -> bool:
+        return self.state in TERMINAL
+
+    def step(self) -> str:
+        """Run the current state once and move to the next; returns the new state."""
+        if self.done:
+            return self.state
+        state = self.state
+        started = time.perf_counter()
+        try:
+            self.state = getattr(self, f"_{state}")()
+        finally:
+            self.timings.append({
+                "state": state,
+                "attempt": self.attempt,
+                "seconds": round(time.perf_counter() - started, 4),
+            })
+        return self.state
+
+    def run(self):
+        """Step until done or failed; returns the final message (None on failure)."""
+        while not self.done:
+            self.step()
+        return self.message
+
+    async def run_async(self, executor=None):
+        """Like run(), but each blocking step runs in `executor` so one event
+        loop can drive many pipelines."""
+        loop = asyncio.get_running_loop()
+        while not self.done:
+            await loop.run_in_executor(executor, self.step)
+        return self.message
+
+    # --- states -----------------------------------------------------------
+
+    def _generate(self) -> str:
+        engine = self.engine
+        self._announce()
+        code_prompt = engine._generation_prompt()
+        candidates = engine._speculative_candidates()
+        speculated = engine._speculate(code_prompt, candidates) if len(candidates) > 1 else None
+        if speculated:
+            # Already executed (and maybe judged) in parallel
+            engine.code, self._result, self._verdict = speculated
+            return "critique" if self._result["success"] else "fix"
+        engine.code = engine._extract_code(engine.code_llm.ask(code_prompt))
+        return "execute"
+
+    def _execute(self) -> str:
+        engine = self.engine
+        self._announce()
+        # Static precheck first: trivial mistakes never reach the sandbox
+        engine.code, result = engine._precheck_and_run(engine.code)
+        self._result = result
+        self._verdict = None
+        if engine.debug_logger:
+            memoized = " (memoized)" if result.get("memoized") else ""
+            engine.debug_logger.info(f"Execution result: {'SUCCESS' if result['success'] else 'FAILED'}{memoized}")
+            if result["success"]:
+                engine.debug_logger.info(f"Output:\n{result['output']}")
+            else:
+                engine.debug_logger.info(f"Error:\n{result['error']}")
+        return "critique" if result["success"] else "fix"
+
+    def _fix(self) -> str:
+        engine = self.engine
+        result = self._result
+        engine.last_error = result["error"]
+        self._record("error", error=result["error"])
+        if self.attempt >= self.max_attempts:
+            return "failed"
+        # Precheck errors are already precise, so they skip the diagnosis call
+        if result.get("precheck"):
+            fix_prompt = engine._static_fix_prompt(result["error"], engine.code)
+        else:
+            fix_prompt = engine._generate_error_fix_prompt(result["error"], engine.code)
+        engine.code = engine._extract_code(engine.code_llm.ask(fix_prompt))
+        self.attempt += 1
+        return "execute"
+
+    def _critique(self) -> str:
+        engine = self.engine
+        result = self._result
+        engine.results = result["output"]
+        engine.artifacts = result.get("artifacts")
+        engine.results_digest = build_digest(engine.artifacts, engine.results)
+        critique = self._verdict or engine._critic_decision(result)
+        self._verdict = critique
+        proceed = "PROCEED" in critique.upper()
+        if engine.debug_logger:
+            engine.debug_logger.info(f"Critic decision: {'PROCEED' if proceed else 'RETRY'}")
+        return "report" if proceed else "revise"
+
+    def _revise(self) -> str:
+        engine = self.engine
+        engine.last_error = f"Critic rejected the results:\n{self._verdict}"
+        self._record("rejected", critique=self._verdict)
+        if self.attempt >= self.max_attempts:
+            return "failed"
+        # Regenerate from the critic's reasons rather than re-running the same code
+        engine.code = engine._extract_code(
+            engine.code_llm.ask(engine._static_fix_prompt(engine.last_error, engine.code))
+        )
+        self.attempt += 1
+        return "execute"
+
+    def _report(self) -> str:
+        engine = self.engine
+        self._record("accepted", critique=self._verdict)
+        self.message = engine._report_summary()
+        return "done"
+
+    # --- helpers ----------------------------------------------------------
+
+    def _announce(self):
+        if self._announced != self.attempt:
+            self._announced = self.attempt
+            print(f"🔄 Attempt {self.attempt}/{self.max_attempts} - Generating/Testing/Executing...")
+            if self.engine.debug_logger:
+                self.engine.debug_logger.info(f"Attempt {self.attempt}/{self.max_attempts} - Generating/Testing/Executing...")
+
+    def log_timings(self, run_log):
+        """Write one "pipeline_state" event per executed state to `run_log`."""
+        for timing in self.timings:
+            run_log.event("pipeline_state", **timing)
+
+    def _record(self, outcome: str, error: str = None, critique: str = None):
+        self.attempts.append({
+            "attempt": self.attempt,
+            "outcome": outcome,
+            "error": error,
+            "critique": critique,
+            "code_sha": hashlib.sha256(self.engine.code.encode("utf-8")).hexdigest()[:12],
+            "seconds": round(sum(t["seconds"] for t in self.timings if t["attempt"] == self.attempt), 4),
+        })
+
+    def checkpoint(self) -> dict:
+        """JSON-serializable snapshot of the machine and the engine inputs it needs."""
+        return {
+            "state": self.state,
+            "attempt": self.attempt,
+            "max_attempts": self.max_attempts,
+            "attempts": list(self.attempts),
+            "timings": list(self.timings),
+            "critique": self._verdict,
+            "message": self.message,
+            "code": self.engine.code,
+            "requirements": dict(self.engine.requirements),
+            "last_error": self.engine.last_error,
+            # Text parts of the last sandbox result (artifacts hold DataFrames)
+            "result": {k: v for k, v in (self._result or {}).items() if k != "artifacts"} or None,
+        }
+
+    @classmethod
+    def restore(cls, engine, data: dict) -> "Phase2Pipeline":
+        """Rebuild a pipeline from checkpoint() output onto `engine`.
+
+        Result artifacts aren't checkpointed, so states that need them
+        (critique, report) resume from `execute`, re-running the same code.
+        """
+        engine.code = data.get("code", "")
+        engine.requirements = dict(data.get("requirements") or {})
+        engine.last_error = data.get("last_error", "")
+        pipeline = cls(engine, max_attempts=data.get("max_attempts", MAX_ATTEMPTS), attempt=data.get("attempt", 1))
+        pipeline.state = data.get("state", "generate")
+        pipeline.attempts = list(data.get("attempts") or [])
+        pipeline.timings = list(data.get("timings") or [])
+        pipeline.message = data.get("message")
+        pipeline._verdict = data.get("critique")
+        pipeline._result = data.get("result")
+        if pipeline.state in ("critique", "report") or (pipeline.state == "fix" and not pipeline._result):
+            pipeline.state = "execute"
+            pipeline._verdict = None
+        return pipeline
@@ -0,0 +1,195 @@
+"""AST checks on generated code before it reaches the sandbox.
+
+Catches the mistakes the fix prompt warns about without downloading data or
+executing anything. Safe fixes are applied to the source text; everything
+else comes back as precise, line-numbered errors for the fix prompt.
+"""
+
+import ast
+import re
+
+# Pandas methods whose result is a Series/DataFrame, not a numpy array
+_PANDAS_CALLS = {
+    "Series", "DataFrame", "rolling", "ewm", "expanding", "diff", "shift",
+    "pct_change", "where", "mask", "clip", "fillna", "cumsum", "cumprod",
+}
+# Expressions ending in these already produce arrays/lists
+_ARRAY_CALLS = {"to_numpy", "asarray", "array", "tolist"}
+
+_MULTIPLIERS = {"k": 1_000, "m": 1_000_000, "mm": 1_000_000, "b": 1_000_000_000,
+                "lakh": 100_000, "lac": 100_000, "cr": 10_000_000, "crore": 10_000_000,
+                "usd": 1, "inr": 1, "eur": 1, "gbp": 1, "rs": 1, "dollars": 1, "rupees": 1}
+
+
+def parse_cash(text: str):
+    """'$10,000' → 10000, '₹10,00,000' → 1000000, '50k' → 50000; None if unclear."""
+    match = re.fullmatch(r"\s*[^\d]*?\s*([\d,]*\.?\d+)\s*([a-zA-Z]*)\s*", text)
+    if not match:
+        return None
+    suffix = match.group(2).lower()
+    if suffix and suffix not in _MULTIPLIERS:
+        return None
+    value = float(match.group(1).replace(",", "")) * _MULTIPLIERS.get(suffix, 1)
+    return int(value) if value.is_integer() else value
+
+
+def _called_name(node) -> str:
+    func = node.func
+    return getattr(func, "id", None) or getattr(func, "attr", "")
+
+
+def _calls(node):
+    return [n for n in ast.walk(node) if isinstance(n, ast.Call)]
+
+
+class _Source:
+    """Byte-offset splicing (AST columns are UTF-8 byte offsets)."""
+
+    def __init__(self, code: str):
+        self.data = code.encode("utf-8")
+        self.line_starts = [0]
+        for line in self.data.splitlines(keepends=True):
+            self.line_starts.append(self.line_starts[-1] + len(line))
+        self.edits = []
+
+    def span(self, node, whole_lines=False):
+        if whole_lines:
+            return self.line_starts[node.lineno - 1], self.line_starts[node.end_lineno]
+        return (self.line_starts[node.lineno - 1] + node.col_offset,
+                self.line_starts[node.end_lineno - 1] + node.end_col_offset)
+
+    def text(self, node) -> str:
+        start, end = self.span(node)
+        return self.data[start:end].decode("utf-8")
+
+    def replace(self, start, end, text):
+        self.edits.append((start, end, text.encode("utf-8")))
+
+    def result(self) -> str:
+        data = self.data
+        for start, end, text in sorted(self.edits, reverse=True):
+            data = data[:start] + text + data[end:]
+        return data.decode("utf-8")
+
+
+def _is_numpy_call(node) -> bool:
+    func = node.func
+    return isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id in ("np", "numpy")
+
+
+def _is_pandas_expr(expr, tainted) -> bool:
+    """True if the outermost value of `expr` is a pandas object.
+
+    Follows the value itself (method chains, operands, subscripts), not
+    every call nested inside it: any `.to_numpy()`, `.values` or `np.*`
+    step yields an array, and so does everything built on it.
+    """
+    if isinstance(expr, ast.Name):
+        return expr.id in tainted
+    if isinstance(expr, ast.Attribute):
+        return expr.attr != "values" and _is_pandas_expr(expr.value, tainted)
+    if isinstance(expr, ast.Subscript):
+        return _is_pandas_expr(expr.value, tainted)
+    if isinstance(expr, ast.BinOp):
+        return _is_pandas_expr(expr.left, tainted) or _is_pandas_expr(expr.right, tainted)
+    if isinstance(expr, ast.UnaryOp):
+        return _is_pandas_expr(expr.operand, tainted)
+    if isinstance(expr, ast.Compare):
+        return any(_is_pandas_expr(e, tainted) for e in [expr.left] + expr.comparators)
+    if isinstance(expr, ast.IfExp):
+        return _is_pandas_expr(expr.body, tainted) or _is_pandas_expr(expr.orelse, tainted)
+    if not isinstance(expr, ast.Call):
+        # Constants and literal containers (self.I stacks tuples/lists on its own)
+        return False
+    func = expr.func
+    if isinstance(func, ast.Name):
+        # Series(...)/DataFrame(...) imported by name; builtins and helpers aren't pandas
+        return func.id in _PANDAS_CALLS
+    if _called_name(expr) in _ARRAY_CALLS or _is_numpy_call(expr):
+        return False
+    if isinstance(func, ast.Attribute):
+        return func.attr in _PANDAS_CALLS or _is_pandas_expr(func.value, tainted)
+    return False
+
+
+def _indicator_functions(tree) -> set:
+    """Names of functions passed to self.I(...)."""
+    names = set()
+    for call in _calls(tree):
+        func = call.func
+        if (isinstance(func, ast.Attribute) and func.attr == "I"
+                and isinstance(func.value, ast.Name) and func.value.id == "self"
+                and call.args and isinstance(call.args[0], ast.Name)):
+            names.add(call.args[0].id)
+    return names
+
+
+def _fix_indicator_returns(tree, source, fixes):
+    wanted = _indicator_functions(tree)
+    for func in ast.walk(tree):
+        if not isinstance(func, ast.FunctionDef) or func.name not in wanted:
+            continue
+        tainted = set()
+        for node in ast.walk(func):
+            if isinstance(node, ast.Assign):
+                names = {t.id for t in node.targets if isinstance(t, ast.Name)}
+                if _is_pandas_expr(node.value, tainted):
+                    tainted |= names
+                else:
+                    tainted -= names
+        for node in ast.walk(func):
+            if isinstance(node, ast.Return) and node.value is not None and _is_pandas_expr(node.value, tainted):
+                start, end = source.span(node.value)
+                source.replace(start, end, f"({source.text(node.value)}).to_numpy()")
+                fixes.append(f"line {node.lineno}: indicator '{func.name}' now returns .to_numpy()")
+
+
+def precheck(code: str):
+    """Check and repair generated code; returns (code, fixes, errors).
+
+    Auto-fixed: a redefined get_ohlcv_data (removed), a string cash
+    amount (converted to a number) and indicator helpers returning pandas
+    objects (`.to_numpy()` appended). Reported: syntax errors, unparseable
+    cash, and scripts that never build and run a Backtest (or call
+    run_signals).
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        return code, [], [f"line {e.lineno}: SyntaxError: {e.msg}"]
+
+    source = _Source(code)
+    fixes = []
+    errors = []
+
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name == "get_ohlcv_data":
+            start, end = source.span(node, whole_lines=True)
+            if node.decorator_list:
+                start = source.line_starts[node.decorator_list[0].lineno - 1]
+            source.replace(start, end, "")
+            fixes.append(f"line {node.lineno}: removed redefinition of get_ohlcv_data (it is provided)")
+        elif isinstance(node, ast.Assign) and any(
+                isinstance(t, ast.Name) and t.id == "get_ohlcv_data" for t in node.targets):
+            errors.append(f"line {node.lineno}: do not assign to get_ohlcv_data; it is provided by the sandbox")
+
+    backtests = [c for c in _calls(tree) if _called_name(c) == "Backtest"]
+    signal_runs = [c for c in _calls(tree) if _called_name(c) == "run_signals"]
+    if not backtests and not signal_runs:
+        errors.append("no Backtest(...) call: build bt = Backtest(data, MyStrategy, cash=...) and call stats = bt.run()")
+    elif backtests and not any(_called_name(c) in ("run", "optimize") for c in _calls(tree)):
+        errors.append("Backtest is never run: add stats = bt.run() and emit_result(stats)")
+
+    for call in backtests + signal_runs:
+        for kw in call.keywords:
+            if kw.arg == "cash" and isinstance(kw.value, ast.Constant) and isinstance(kw.value.value, str):
+                amount = parse_cash(kw.value.value)
+                if amount is None:
+                    errors.append(f"line {kw.value.lineno}: cash must be a number, got {kw.value.value!r}")
+                else:
+                    start, end = source.span(kw.value)
+                    source.replace(start, end, repr(amount))
+                    fixes.append(f"line {kw.value.lineno}: cash {kw.value.value!r} → {amount}")
+
+    _fix_indicator_returns(tree, source, fixes)
+    return source.result(), fixes, errors
@@ -0,0 +1,62 @@
+"""Warm the OHLCV cache in the background once ticker and period are known.
+
+Phase 1 usually learns the ticker and period turns before any code runs;
+downloading then hides the network fetch behind the user's typing and code
+generation. The window starts `LOOKBACK_DAYS` early so strategies that warm
+up long indicators (e.g. a 200-day SMA) still find everything on disk.
+"""
+
+import re
+import threading
+from concurrent.futures import Future
+from datetime import date, timedelta
+
+from .critic import WARMUP_DAYS, _SYMBOL, parse_period
+
+LOOKBACK_DAYS = WARMUP_DAYS
+# How long execution waits for a download still in flight
+WAIT_SECONDS = 30
+
+_RELATIVE = re.compile(r"\s*(?:last|past|previous)\s+(\d+)\s+(year|month|week|day)s?\s*", re.IGNORECASE)
+_UNIT_DAYS = {"year": 365, "month": 31, "week": 7, "day": 1}
+
+
+def prefetch_window(period: str):
+    """Requested period → (start, end) dates to download, end exclusive; None if unclear."""
+    parsed = parse_period(period)
+    if parsed is not None:
+        start, end = parsed[0].date(), parsed[1].date() + timedelta(days=1)
+    else:
+        match = _RELATIVE.fullmatch(period or "")
+        if not match:
+            return None
+        end = date.today()
+        start = end - timedelta(days=int(match.group(1)) * _UNIT_DAYS[match.group(2).lower()])
+    return start - timedelta(days=LOOKBACK_DAYS), min(end, date.today())
+
+
+def prefetch(cache, ticker: str, period: str):
+    """Start downloading `ticker` for `period` into `cache`; returns a Future or None.
+
+    Runs on a daemon thread so a slow download never delays exit. The
+    cache's lock makes a concurrent `get` for the same data wait for the
+    download instead of starting its own.
+    """
+    ticker = (ticker or "").strip().upper()
+    window = prefetch_window(period)
+    if not _SYMBOL.match(ticker) or window is None or window[0] >= window[1]:
+        return None
+
+    future = Future()
+
+    def work():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            cache.get(ticker, *window)
+            future.set_result(window)
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=work, name=f"nlbt-prefetch-{ticker}", daemon=True).start()
+    return future
@@ -0,0 +1,113 @@
+"""Content-addressed SQLite cache for LLM prompt/response pairs."""
+
+import contextlib
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+
+class PromptCache:
+    """Responses keyed by sha256(model, prompt) with TTL and LRU eviction.
+
+    Lives at `$CACHE_DIR/llm_cache.sqlite`. Entries older than `ttl` seconds
+    are ignored and purged; once more than `max_entries` rows exist the least
+    recently used ones are evicted. Hit/miss counters are per process.
+    """
+
+    def __init__(self, path: str = None, ttl: float = None, max_entries: int = None):
+        root = os.getenv("CACHE_DIR") or ".cache"
+        self.path = path or os.path.join(root, "llm_cache.sqlite")
+        self.ttl = ttl if ttl is not None else float(os.getenv("LLM_CACHE_TTL", 7 * 24 * 3600))
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("LLM_CACHE_MAX_ENTRIES", 10000))
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._ready = False
+
+    @staticmethod
+    def key(model: str, prompt: str) -> str:
+        return hashlib.sha256(f"{model}\0{prompt}".encode("utf-8")).hexdigest()
+
+    def _connect(self):
+        if not self._ready:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, model TEXT, response TEXT, "
+                "created REAL, accessed REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)")
+            self._ready = True
+        return conn
+
+    def get(self, model: str, prompt: str):
+        """Return the cached response or None (counts a hit or a miss)."""
+        key = self.key(model, prompt)
+        now = time.time()
+        with self._lock:
+            try:
+                with contextlib.closing(self._connect()) as conn, conn:
+                    row = conn.execute(
+                        "SELECT response, created FROM responses WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row and now - row[1] <= self.ttl:
+                        conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                        self.hits += 1
+                        return row[0]
+                    if row:
+                        conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            except sqlite3.Error:
+                pass
+            self.misses += 1
+            return None
+
+    def put(self, model: str, prompt: str, response: str):
+        """Store a response and evict least recently used rows beyond the bound."""
+        key = self.key(model, prompt)
+        now = time.time()
+        with self._lock:
+            try:
+                with contextlib.closing(self._connect()) as conn, conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                        (key, model, response, now, now),
+                    )
+                    conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+                    conn.execute(
+                        "DELETE FROM responses WHERE key IN ("
+                        "SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                        (self.max_entries,),
+                    )
+            except sqlite3.Error:
+                pass
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process plus the current entry count."""
+        entries = 0
+        with self._lock:
+            try:
+                with contextlib.closing(self._connect()) as conn:
+                    entries = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            except sqlite3.Error:
+                pass
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_prompt_cache():
+    """Shared process-wide cache, or None when disabled with LLM_CACHE=0."""
+    global _default_cache
+    if os.getenv("LLM_CACHE", "1").lower() in ("0", "false", "no"):
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = PromptCache()
+        return _default_cache
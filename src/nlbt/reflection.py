@@ -1,26 +1,99 @@
 """Minimal 3-phase reflection engine."""
 
 import os
-import logging
-import glob
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from .llm import LLM
-from .sandbox import Sandbox
+from .llm import get_model_registry
+from .sandbox import Sandbox, capability_manifest
+from .digest import build_digest
+from .sweep import parse_grid, run_sweep, strategy_parameters, write_sweep_report
+from .snapshots import git_sha, snapshot_codebase
+from .runlog import RunLog
+from .precheck import precheck
+from .critic import RETRY, review
+from .prefetch import WAIT_SECONDS as PREFETCH_WAIT, prefetch
+from .pipeline import MAX_ATTEMPTS, Phase2Pipeline
+from .rerun import mentions_parameters, parameter_changes, patch_code
+
+
+# Hard constraints of the scaffold, shared by the validator prompts
+VALIDATION_RULES = (
+    "# VALIDATION RULES (code-like, hard constraints)\n"
+    "supports_single_ticker = True\n"
+    "supports_multi_asset = False\n"
+    "supports_options = False\n"
+    "requires_numeric_thresholds = True  # e.g. 'dips' must include % or window\n\n"
+    "# Heuristics (pseudo)\n"
+    "def contains_multiple_tickers(text):\n"
+    "    import re\n"
+    "    # two distinct tickers like 'GLD and SPY'\n"
+    "    return bool(re.search(r'\\b[A-Z]{2,5}\\b.*\\b[A-Z]{2,5}\\b', text)) and (' & ' in text or ' and ' in text or ',' in text)\n\n"
+    "def mentions_options(text):\n"
+    "    t = text.lower()\n"
+    "    return any(w in t for w in ['option', 'iron condor', 'straddle', 'strangle', 'call', 'put', 'spread'])\n\n"
+    "def vague_without_numbers(text):\n"
+    "    import re\n"
+    "    t = text.lower()\n"
+    "    vague_terms = ['dip', 'dips', 'momentum', 'breakout', 'retrace', 'bounce']\n"
+    "    has_vague = any(v in t for v in vague_terms)\n"
+    "    has_numbers = bool(re.search(r'\\d+\\s*%|\\d+\\s*(day|bar|period|window)', t))\n"
+    "    return has_vague and not has_numbers\n\n"
+    "def clearly_numeric_strategy(text):\n"
+    "    t = text.lower()\n"
+    "    # Examples: 'RSI < 30 and > 70', 'EMA 10 crosses 20', '5% drop'\n"
+    "    return any(k in t for k in ['rsi', 'ema', 'sma', '%'])\n\n"
+)
+
+DECISION_LOGIC = (
+    "# DECISION LOGIC\n"
+    "# If multi-asset or options mentioned → IMPLEMENTABLE: NO\n"
+    "# If vague triggers without numeric thresholds → IMPLEMENTABLE: NO, but suggest concrete defaults\n"
+    "# If single ticker and rules are clearly numeric/precise → IMPLEMENTABLE: YES\n\n"
+)
+
+
+_SCAFFOLD_CACHE = {"key": None, "text": ""}
+
+
+def scaffold_digest() -> str:
+    """Capability manifest tagged with a version hash of the scaffold sources.
+
+    Rebuilt only when sandbox.py or reflection.py change on disk (mtime and
+    size are checked per call; contents are hashed only on rebuild).
+    """
+    base_dir = os.path.dirname(__file__)
+    paths = [os.path.join(base_dir, name) for name in ("sandbox.py", "reflection.py")]
+    try:
+        key = tuple((p, os.stat(p).st_mtime_ns, os.stat(p).st_size) for p in paths)
+    except OSError:
+        key = None
+    if key is None or key != _SCAFFOLD_CACHE["key"]:
+        digest = hashlib.sha256()
+        for p in paths:
+            try:
+                with open(p, 'rb') as f:
+                    digest.update(f.read())
+            except OSError:
+                pass
+        _SCAFFOLD_CACHE["text"] = f"SCAFFOLD VERSION: {digest.hexdigest()[:12]}\n" + capability_manifest()
+        _SCAFFOLD_CACHE["key"] = key
+    return _SCAFFOLD_CACHE["text"]
+
+
+def _result_or(future, fallback):
+    """A report section's value, or `fallback` if its call failed."""
+    try:
+        return future.result()
+    except Exception:
+        return fallback
 
 
 def setup_run_logging(run_dir):
-    """Setup debug and agent loggers for this run."""
-    # Developer trace logger
-    debug = logging.getLogger(f'debug_{run_dir}')
-    debug.setLevel(logging.INFO)
-    debug.addHandler(logging.FileHandler(f'{run_dir}/debug.log'))
-    
-    # Agent context logger
-    agent = logging.getLogger(f'agent_{run_dir}')
-    agent.setLevel(logging.INFO)
-    agent.addHandler(logging.FileHandler(f'{run_dir}/agent.log'))
-    
-    return debug, agent
+    """Open debug.log, agent.log and events.jsonl for this run (close when done)."""
+    return RunLog(run_dir)
 
 
 class ReflectionEngine:
@@ -32,30 +105,43 @@ class ReflectionEngine:
     Phase 3: Reporting - Plan/Write/Refine
     """
     
-    def __init__(self, model: str = None):
-        self.llm = LLM(model)
-        # Use strong model for code generation
-        # Use advanced model for code generation - try Claude first, fallback to GPT-4.5
-        # Allow environment override; prefer Claude if explicitly set
-        code_model = (
-            os.getenv("LLM_CODE_MODEL")
-            or "openrouter/anthropic/claude-3.5-sonnet"
-        )
-        try:
-            self.code_llm = LLM(code_model)
-        except Exception:
-            # Fallback to an advanced OpenAI model if available
-            self.code_llm = LLM("gpt-4.5-preview")
+    def __init__(self, model: str = None, interactive: bool = True, reports_dir: str = "reports", models=None):
+        # Clients are shared across engines: chat for conversation and
+        # reports, a strong code model for generation, fast for helpers
+        self.models = models or get_model_registry()
+        self.llm = self.models.get("chat", model)
+        self.code_llm = self.models.get("code")
+        self.fast_llm = self.models.get("fast")
         self.sandbox = Sandbox()
+        # Headless runs (batch mode) never fall back to the Phase 1 chat
+        self.interactive = interactive
+        self.reports_dir = reports_dir
+        # Folder of the last saved report
+        self.run_dir = None
         self.phase = "understanding"
         self.history = []
         self.requirements = {}
         self.code = ""
         self.results = ""
+        # Structured results handed back by emit_result(stats)
+        self.artifacts = None
+        # Bounded summary of the results used in every prompt
+        self.results_digest = ""
         self.last_error = ""
+        # State machine of the last Phase 2 run (attempt records, timings)
+        self.pipeline = None
+        # ((ticker, period), Future) of the background data download
+        self.prefetched = None
+        # Requirements and code of the last accepted run (for quick re-runs)
+        self.baseline = None
+        # One-line TL;DR from the last report (shared with the CLI echo)
+        self.tldr = ""
+        # Optional callable(stage, chunk): report plan/draft are streamed to it
+        self.stream_sink = None
         # Last validator decision for debugging
         self.last_validation = None
         # Loggers (initialized in phase 3 when run_dir is created)
+        self.run_log = None
         self.debug_logger = None
         self.agent_logger = None
     
@@ -69,6 +155,13 @@ class ReflectionEngine:
         user_input = user_input.strip()
         self.history.append(f"User: {user_input}")
         
+        # Capital/period/language-only follow-ups re-run the accepted code
+        if self.baseline and self.phase in ("complete", "implementation"):
+            rerun = self._incremental_rerun(user_input)
+            if rerun is not None:
+                self.history.append(f"Agent: {rerun}")
+                return rerun
+        
         # Check if user wants to change requirements during implementation
         if self.phase == "implementation" and any(word in user_input.lower() for word in ["sorry", "actually", "i mean", "change"]):
             # Go back to understanding phase
@@ -99,6 +192,12 @@ class ReflectionEngine:
     def _phase1_understanding(self, user_input: str, from_confirmation: bool = False) -> str:
         """Phase 1: Gather requirements until LLM says READY."""
         
+        # One structured call per turn; fall back to the multi-call path
+        if os.getenv("NLBT_COMBINED_TURN", "1").lower() not in ("0", "false", "no"):
+            turn = self._combined_turn(user_input)
+            if turn is not None:
+                return self._apply_combined_turn(turn, from_confirmation)
+        
         # First, try to extract requirements from the conversation
         self._update_requirements_from_conversation(user_input)
         
@@ -167,24 +266,7 @@ RESPOND ONLY to the current user message. Do NOT create fake conversations."""
                 self.phase = "implementation"
                 return self._phase2_implementation()
             else:
-                clar = validation.get("clarifications") or []
-                # Synthesize concrete clarifications if missing
-                if not clar:
-                    missing = []
-                    for k in ["ticker", "period", "capital", "strategy"]:
-                        if not self.requirements.get(k):
-                            missing.append(k)
-                    for k in missing:
-                        if k == "ticker":
-                            clar.append("Specify a single ticker (e.g., AAPL or RELIANCE.NS)")
-                        elif k == "period":
-                            clar.append("Provide a concrete period (e.g., 2023 or 2020-2024)")
-                        elif k == "capital":
-                            clar.append("Provide initial capital with currency (e.g., $10,000 or ₹10,00,000)")
-                        elif k == "strategy":
-                            clar.append("Describe entry and exit rules with numeric thresholds")
-                clar_block = "\n".join([f"- {c}" for c in clar]) if clar else "- Please clarify missing or vague details so I can proceed."
-                return f"""⚠️ Before I can proceed, I need a few clarifications to ensure this strategy is implementable with the current system:\n{clar_block}\n\nPlease answer these in one message."""
+                return self._clarification_message(validation.get("clarifications"))
 
         # Check if LLM says READY
         if "STATUS: READY" in response:
@@ -196,26 +278,96 @@ RESPOND ONLY to the current user message. Do NOT create fake conversations."""
                 self.phase = "implementation"
                 return self._phase2_implementation()
             else:
-                clar = validation.get("clarifications") or []
-                if not clar:
-                    missing = []
-                    for k in ["ticker", "period", "capital", "strategy"]:
-                        if not self.requirements.get(k):
-                            missing.append(k)
-                    for k in missing:
-                        if k == "ticker":
-                            clar.append("Specify a single ticker (e.g., AAPL or RELIANCE.NS)")
-                        elif k == "period":
-                            clar.append("Provide a concrete period (e.g., 2023 or 2020-2024)")
-                        elif k == "capital":
-                            clar.append("Provide initial capital with currency (e.g., $10,000 or ₹10,00,000)")
-                        elif k == "strategy":
-                            clar.append("Describe entry and exit rules with numeric thresholds")
-                clar_block = "\n".join([f"- {c}" for c in clar]) if clar else "- Please clarify missing or vague details so I can proceed."
-                return f"""⚠️ Before I can proceed, I need a few clarifications to ensure this strategy is implementable with the current system:\n{clar_block}\n\nPlease answer these in one message."""
+                return self._clarification_message(validation.get("clarifications"))
         
         return response
     
+    def _combined_turn(self, user_input: str):
+        """Extraction, reply and validation for one user turn in a single LLM call.
+
+        Returns the parsed JSON dict, or None if the response is unusable.
+        """
+        prompt = (
+            "You are helping gather backtesting requirements. Have a natural conversation.\n"
+            "In ONE JSON response: update the requirements, reply to the user, and judge\n"
+            "whether the strategy is implementable with this scaffold.\n\n"
+            f"CONVERSATION HISTORY:\n{self._get_history()}\n\n"
+            f"CURRENT USER MESSAGE: {user_input}\n\n"
+            f"CURRENT REQUIREMENTS (JSON): {json.dumps(self.requirements, ensure_ascii=False)}\n\n"
+            f"SCAFFOLD:\n{self._get_scaffold_context()}\n\n"
+            + VALIDATION_RULES
+            + DECISION_LOGIC +
+            "INSTRUCTIONS:\n"
+            "- requirements: the full, updated set after this message (apply changes like 'use 2023 instead'); null if unknown\n"
+            "- ticker (e.g. AAPL, RELIANCE.NS, ^NSEI), period (e.g. 2024, 2020-2024), capital with currency (e.g. $10000, ₹500000),\n"
+            "  strategy (trading rules), lang (report language, e.g. Spanish; null if not mentioned)\n"
+            "- reply: natural, conversational; acknowledge what you have and ask only for what is missing.\n"
+            "  NEVER invent user messages.\n"
+            "- implementable: true/false once ticker, period, capital and strategy are all known, else null\n"
+            "- clarifications: if not implementable, up to 5 concrete questions (suggest defaults when helpful)\n\n"
+            "Output ONLY valid JSON:\n"
+            '{"requirements": {"ticker": null, "period": null, "capital": null, "strategy": null, "lang": null}, '
+            '"reply": "...", "implementable": null, "clarifications": []}'
+        )
+        try:
+            response = self.llm.ask(prompt).strip()
+            if response.startswith('```'):
+                response = response.split('```')[1].strip()
+                if response.startswith('json'):
+                    response = response[4:].strip()
+            data = json.loads(response)
+            if not isinstance(data, dict) or not isinstance(data.get("requirements"), dict) or not data.get("reply"):
+                return None
+            data["raw"] = response
+            return data
+        except Exception:
+            return None
+
+    def _apply_combined_turn(self, turn: dict, from_confirmation: bool) -> str:
+        """Apply a combined-turn result: update requirements, then reply or proceed."""
+        for key, value in turn["requirements"].items():
+            if key in ("ticker", "period", "capital", "strategy", "lang") and value:
+                self.requirements[key] = str(value).strip()
+        self._prefetch_data()
+        
+        reply = turn["reply"].strip()
+        complete = all(self.requirements.get(k) for k in ["ticker", "period", "capital", "strategy"])
+        if not complete or from_confirmation:
+            return reply
+        
+        clarifications = [str(c).strip() for c in (turn.get("clarifications") or []) if str(c).strip()][:5]
+        self.last_validation = {
+            "implementable": bool(turn.get("implementable")),
+            "clarifications": clarifications,
+            "raw": turn.get("raw", ""),
+        }
+        if turn.get("implementable"):
+            # Auto-proceed immediately (agentic flow)
+            self.phase = "implementation"
+            return self._phase2_implementation()
+        return self._clarification_message(clarifications)
+
+    def _clarification_message(self, clar: list) -> str:
+        """Ask for the clarifications the validator needs before implementing."""
+        clar = list(clar or [])
+        # Synthesize concrete clarifications if missing
+        if not clar:
+            missing = []
+            for k in ["ticker", "period", "capital", "strategy"]:
+                if not self.requirements.get(k):
+                    missing.append(k)
+            for k in missing:
+                if k == "ticker":
+                    clar.append("Specify a single ticker (e.g., AAPL or RELIANCE.NS)")
+                elif k == "period":
+                    clar.append("Provide a concrete period (e.g., 2023 or 2020-2024)")
+                elif k == "capital":
+                    clar.append("Provide initial capital with currency (e.g., $10,000 or ₹10,00,000)")
+                elif k == "strategy":
+                    clar.append("Describe entry and exit rules with numeric thresholds")
+        clar_block = "\n".join([f"- {c}" for c in clar]) if clar else "- Please clarify missing or vague details so I can proceed."
+        return f"""⚠️ Before I can proceed, I need a few clarifications to ensure this strategy is implementable with the current system:\n{clar_block}\n\nPlease answer these in one message."""
+
     def _handle_implementation_confirmation(self, user_input: str) -> str:
         """Handle user confirmation before starting implementation."""
         # Use LLM to determine if user wants to proceed
@@ -236,23 +388,72 @@ RESPOND ONLY to the current user message. Do NOT create fake conversations."""
         return "Got it! Let me help you with that.\n\n" + self._phase1_understanding(user_input, from_confirmation=True)
     
     def _phase2_implementation(self, attempt: int = 1) -> str:
-        """Phase 2: Producer generates, Critic evaluates."""
-        if attempt > 3:
-            if self.debug_logger:
-                self.debug_logger.info(f"Failed after 3 attempts. Last error: {self.last_error}")
-            
-            # Return to understanding phase with full context
-            self.phase = "understanding"
-            error_msg = f"❌ Failed after 3 attempts.\n\nLast error:\n{self.last_error}\n\nLet's try a different approach."
-            return error_msg + "\n\n" + self._phase1_understanding("I need help fixing this strategy", from_confirmation=True)
+        """Phase 2: Producer generates, Critic evaluates (see pipeline.py)."""
+        self.pipeline = Phase2Pipeline(self, attempt=attempt)
+        message = self.pipeline.run()
+        if self.pipeline.state == "done":
+            self.baseline = {"requirements": dict(self.requirements), "code": self.code}
+            return message
         
-        print(f"🔄 Attempt {attempt}/3 - Generating/Testing/Executing...")
         if self.debug_logger:
-            self.debug_logger.info(f"Attempt {attempt}/3 - Generating/Testing/Executing...")
+            self.debug_logger.info(f"Failed after {MAX_ATTEMPTS} attempts. Last error: {self.last_error}")
         
-        # Producer: Generate code with BULLETPROOF template
-        if attempt == 1:
-            code_prompt = f"""Generate complete Python backtesting code. Copy this EXACT pattern:
+        # Back to understanding; the user's next message picks up from here
+        self.phase = "understanding"
+        error_msg = f"❌ Failed after {MAX_ATTEMPTS} attempts.\n\nLast error:\n{self.last_error}\n\nLet's try a different approach."
+        if not self.interactive:
+            return error_msg
+        return error_msg + (
+            "\n\nTell me what to change (entry/exit rules, indicators, ticker or period) "
+            "and I'll generate the strategy again."
+        )
+    
+    def _incremental_rerun(self, user_input: str):
+        """Patch and re-execute the accepted code when only capital, period or
+        language changed; None when the message needs the full flow."""
+        if not mentions_parameters(user_input):
+            return None
+        accepted = self.baseline["requirements"]
+        changes = parameter_changes(accepted, self._extract_requirements_llm(user_input))
+        if not changes:
+            return None
+        changed = ", ".join(f"{k}: {v}" for k, v in changes.items())
+        if set(changes) == {"lang"}:
+            # Same numbers, different report language: no need to execute again
+            self.requirements = {**accepted, **changes}
+            self.baseline = {"requirements": dict(self.requirements), "code": self.baseline["code"]}
+            return f"♻️ Re-reporting the accepted strategy with {changed}\n" + self._report_summary()
+        try:
+            code, notes = patch_code(self.baseline["code"], accepted, changes)
+        except (ValueError, SyntaxError):
+            return None
+        
+        self.requirements = {**accepted, **changes}
+        code, result = self._precheck_and_run(code)
+        if not result["success"] or review(self.requirements, result)[0] == RETRY:
+            # The patched script doesn't fit the new parameters: regenerate
+            self.phase = "implementation"
+            return self._phase2_implementation()
+        
+        self.code = code
+        self.results = result["output"]
+        self.artifacts = result.get("artifacts")
+        self.results_digest = build_digest(self.artifacts, self.results)
+        self.baseline = {"requirements": dict(self.requirements), "code": self.code}
+        patched = f" ({'; '.join(notes)})" if notes else ""
+        return f"♻️ Re-ran the accepted strategy with {changed}{patched}\n" + self._report_summary()
+    
+    def _report_summary(self) -> str:
+        """Run Phase 3 and return the compact CLI message (TL;DR + folder)."""
+        self.phase = "reporting"
+        # Keep CLI output minimal; the TL;DR is computed once inside reporting
+        report_msg = self._phase3_reporting()
+        folder_line = next((ln for ln in report_msg.splitlines() if ln.startswith("📄 REPORT FOLDER:")), "")
+        return f"🧾 {self.tldr or 'Summary unavailable'}\n{folder_line}"
+    
+    def _generation_prompt(self) -> str:
+        """First-attempt code generation prompt (template + requirements)."""
+        return f"""Generate complete Python backtesting code. Copy this EXACT pattern:
 
 REQUIREMENTS:
 {self._format_requirements()}
@@ -266,16 +467,14 @@ from backtesting import Backtest, Strategy
 data = get_ohlcv_data('TICKER', 'START_DATE', 'END_DATE')
 
 class MyStrategy(Strategy):
+    # Tunable parameters as class attributes (enables parameter sweeps), e.g.:
+    # rsi_period = 14
+    # rsi_low = 30
+    
     def init(self):
-        # For indicators, use this EXACT pattern:
-        # Step 1: Define helper that returns numpy array
-        def sma(values, n):
-            import pandas as pd
-            return pd.Series(values).rolling(n).mean().to_numpy()
-        
-        # Step 2: Wrap with self.I
-        # self.sma20 = self.I(sma, self.data.Close, 20)
-        # self.sma50 = self.I(sma, self.data.Close, 50)
+        # Indicators: use the built-in `ind` library (cached, returns numpy arrays)
+        # self.sma20 = self.I(ind.sma, self.data.Close, 20)
+        # self.sma50 = self.I(ind.sma, self.data.Close, 50)
         
         pass
     
@@ -288,86 +487,40 @@ bt = Backtest(data, MyStrategy, cash=CASH_NUMBER)
 stats = bt.run()
 print(stats)
 
-# Emit structured artifacts for reporting
-import json
-try:
-    # Trades preview table
-    import pandas as pd
-    print("TRADES_TABLE")
-    print(stats._trades.head(50).to_markdown(index=False))
-except Exception:
-    pass
-
-# Full CSVs for optional charts/tables
-try:
-    import pandas as pd
-    print("TRADES_CSV"); print(stats._trades.to_csv(index=False))
-    print("EQUITY_CSV"); print(stats._equity_curve.to_csv(index=False))
-except Exception:
-    pass
-
-# Compact summary for TL;DR
-try:
-    end_date = str(stats.get('End', '')) or (str(data.index[-1].date()) if hasattr(data, 'index') and len(data.index) else '')
-    equity_final = float(stats.get('Equity Final [$]', 0))
-    initial_cap = float(CASH_NUMBER)
-    pnl_abs = equity_final - initial_cap
-    pnl_pct = float(stats.get('Return [%]', 0))
-    print("SUMMARY_JSON"); print(json.dumps(dict(
-        end=end_date,
-        initial=initial_cap,
-        equity_final=equity_final,
-        portfolio_final=equity_final,
-        pnl_abs=pnl_abs,
-        pnl_pct=pnl_pct
-    )))
-except Exception:
-    pass
+# Hand stats, trades and equity curve back to the engine (no printing needed)
+emit_result(stats)
 ```
 
-PATTERN FOR INDICATORS (copy exactly):
-
-RSI:
+BUILT-IN INDICATORS (`ind` is already available - do NOT import or redefine it):
 ```
-def rsi(values, n=14):
-    import pandas as pd
-    import numpy as np
-    delta = pd.Series(values).diff()
-    gain = (delta.where(delta > 0, 0)).rolling(n).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(n).mean()
-    rs = gain / loss
-    return (100 - (100 / (1 + rs))).to_numpy()
-
-self.rsi = self.I(rsi, self.data.Close, 14)
+self.sma20 = self.I(ind.sma, self.data.Close, 20)
+self.ema12 = self.I(ind.ema, self.data.Close, 12)
+self.rsi = self.I(ind.rsi, self.data.Close, 14)
+self.macd = self.I(ind.macd, self.data.Close, 12, 26)
+self.macd_signal = self.I(ind.macd_signal, self.data.Close, 12, 26, 9)
+self.macd_hist = self.I(ind.macd_hist, self.data.Close, 12, 26, 9)
+self.bb_upper, self.bb_mid, self.bb_lower = self.I(ind.bbands, self.data.Close, 20, 2.0)
+self.roc = self.I(ind.roc, self.data.Close, 10)
+self.atr = self.I(ind.atr, self.data.High, self.data.Low, self.data.Close, 14)
+self.stoch_k, self.stoch_d = self.I(ind.stoch, self.data.High, self.data.Low, self.data.Close, 14, 3)
 ```
 
-SMA:
+ANY OTHER INDICATOR (helper that returns a numpy array, wrapped with self.I):
 ```
-def sma(values, n):
-    import pandas as pd
-    return pd.Series(values).rolling(n).mean().to_numpy()
+def obv(close, volume):
+    import numpy as np
+    return np.cumsum(np.sign(np.diff(close, prepend=close[0])) * volume)
 
-self.sma20 = self.I(sma, self.data.Close, 20)
+self.obv = self.I(obv, self.data.Close, self.data.Volume)
 ```
 
-MACD:
+PURE SIGNAL RULES (optional fast path: enter on X, exit on Y; no stops, sizing or tunable parameters):
 ```
-def ema(values, n):
-    import pandas as pd
-    return pd.Series(values).ewm(span=n, adjust=False).mean().to_numpy()
-
-def macd(values):
-    ema12 = ema(values, 12)
-    ema26 = ema(values, 26)
-    return ema12 - ema26
-
-def macd_signal(values):
-    import pandas as pd
-    macd_line = macd(values)
-    return pd.Series(macd_line).ewm(span=9, adjust=False).mean().to_numpy()
-
-self.macd = self.I(macd, self.data.Close)
-self.macd_signal = self.I(macd_signal, self.data.Close)
+close = data['Close'].to_numpy()
+sma20, sma50 = ind.sma(close, 20), ind.sma(close, 50)
+stats = run_signals(data, entries=sma20 > sma50, exits=sma20 < sma50, cash=CASH_NUMBER,
+                    indicators={{'sma20': sma20, 'sma50': sma50}})  # short=True flips long/short
+emit_result(stats)
 ```
 
 CROSSOVER (for MA strategies):
@@ -385,103 +538,14 @@ YOUR TASK:
    Example: For "2023-2024", use '2022-01-01' to '2024-12-31' to ensure 200-day SMA has data.
 3. Replace CASH_NUMBER with a pure number (e.g., 10000). If capital is given as text like '₹10,00,000' or '$10,000', convert to number.
 4. Implement strategy: {self.requirements.get('strategy', 'buy and hold')}
-5. Use indicator patterns above if needed
+5. Use the built-in `ind` indicators above; write a helper only for indicators `ind` lacks
+6. Put every numeric strategy parameter (windows, thresholds) in MyStrategy class attributes and use them as self.<name>
 
 Write ONLY the complete code (no markdown, no explanations):"""
-            
-            response = self.code_llm.ask(code_prompt)
-            if "```python" in response:
-                self.code = response.split("```python")[1].split("```")[0].strip()
-            else:
-                self.code = response.strip()
-        
-        # Execute
-        result = self.sandbox.run(self.code)
-        
-        if self.debug_logger:
-            self.debug_logger.info(f"Execution result: {'SUCCESS' if result['success'] else 'FAILED'}")
-            if result["success"]:
-                self.debug_logger.info(f"Output:\n{result['output']}")
-            else:
-                self.debug_logger.info(f"Error:\n{result['error']}")
-        
-        if not result["success"]:
-            self.last_error = result["error"]
-            
-            # Fix prompt with LLM-generated diagnosis
-            fix_prompt = self._generate_error_fix_prompt(result['error'], self.code)
-            
-            
-            response = self.code_llm.ask(fix_prompt)
-            if "```python" in response:
-                self.code = response.split("```python")[1].split("```")[0].strip()
-            else:
-                self.code = response.strip()
-            
-            return self._phase2_implementation(attempt + 1)
-        
-        # Critic: Evaluate
-        self.results = result["output"]
-        
-        critique_prompt = f"""Evaluate: Did the backtest run successfully?
-
-Requirements: {self._format_requirements()}
-Results: {self.results}
-
-PASS if: 
-- Shows stats (Return %, Equity Final, etc.)
-- Uses correct ticker/period/capital
-- No crashes or errors
-- Even if # Trades = 0 (strategy may not trigger signals in this period)
-
-FAIL if: 
-- Crashed with errors
-- Wrong ticker/period/capital
-- No stats shown
-
-DECISION: [PROCEED or RETRY]"""
-
-        critique = self.code_llm.ask(critique_prompt)
-        
-        if self.debug_logger:
-            self.debug_logger.info(f"Critic decision: {'PROCEED' if 'PROCEED' in critique.upper() else 'RETRY'}")
-        
-        if "PROCEED" in critique.upper():
-            self.phase = "reporting"
-            # Lightweight LLM TL;DR from stats
-            summary_line = self._llm_tldr(self.results)
-            # Generate report but keep CLI output minimal
-            report_msg = self._phase3_reporting()
-            # Extract folder path line for concise echo
-            folder_line = ""
-            for ln in report_msg.splitlines():
-                if ln.startswith("📄 REPORT FOLDER:"):
-                    folder_line = ln
-                    break
-            return f"🧾 {summary_line}\n{folder_line}"
-        else:
-            return self._phase2_implementation(attempt + 1)
     
     def _get_scaffold_context(self) -> str:
-        """Assemble minimal scaffold context for validator prompt."""
-        import os
-        base_dir = os.path.dirname(__file__)
-        parts = []
-        # sandbox.py (short, safe to include entirely)
-        try:
-            with open(os.path.join(base_dir, 'sandbox.py'), 'r', encoding='utf-8') as f:
-                parts.append("SANDBOX.PY:\n" + f.read())
-        except Exception:
-            pass
-        # reflection head and _test_code_components
-        try:
-            with open(os.path.join(base_dir, 'reflection.py'), 'r', encoding='utf-8') as f:
-                refl = f.read()
-            head = "\n".join(refl.splitlines()[:150])
-            parts.append("REFLECTION.PY (HEAD):\n" + head)
-        except Exception:
-            pass
-        return "\n\n".join(parts)
+        """Versioned capability manifest for validator prompts (cached per process)."""
+        return scaffold_digest()
 
     def _validate_requirements_with_codebase(self) -> dict:
         """Use LLM to validate whether current requirements are implementable.
@@ -493,36 +557,10 @@ DECISION: [PROCEED or RETRY]"""
         prompt = (
             "You are validating if the strategy is implementable using this scaffold.\n"
             "Respond concisely with deterministic headers.\n\n"
-            "# VALIDATION RULES (code-like, hard constraints)\n"
-            "supports_single_ticker = True\n"
-            "supports_multi_asset = False\n"
-            "supports_options = False\n"
-            "requires_numeric_thresholds = True  # e.g. 'dips' must include % or window\n\n"
-            "# Heuristics (pseudo)\n"
-            "def contains_multiple_tickers(text):\n"
-            "    import re\n"
-            "    # two distinct tickers like 'GLD and SPY'\n"
-            "    return bool(re.search(r'\\b[A-Z]{2,5}\\b.*\\b[A-Z]{2,5}\\b', text)) and (' & ' in text or ' and ' in text or ',' in text)\n\n"
-            "def mentions_options(text):\n"
-            "    t = text.lower()\n"
-            "    return any(w in t for w in ['option', 'iron condor', 'straddle', 'strangle', 'call', 'put', 'spread'])\n\n"
-            "def vague_without_numbers(text):\n"
-            "    import re\n"
-            "    t = text.lower()\n"
-            "    vague_terms = ['dip', 'dips', 'momentum', 'breakout', 'retrace', 'bounce']\n"
-            "    has_vague = any(v in t for v in vague_terms)\n"
-            "    has_numbers = bool(re.search(r'\\d+\\s*%|\\d+\\s*(day|bar|period|window)', t))\n"
-            "    return has_vague and not has_numbers\n\n"
-            "def clearly_numeric_strategy(text):\n"
-            "    t = text.lower()\n"
-            "    # Examples: 'RSI < 30 and > 70', 'EMA 10 crosses 20', '5% drop'\n"
-            "    return any(k in t for k in ['rsi', 'ema', 'sma', '%'])\n\n"
+            + VALIDATION_RULES +
             f"REQUIREMENTS:\n{req}\n\n"
             f"SCAFFOLD:\n{scaffold}\n\n"
-            "# DECISION LOGIC\n"
-            "# If multi-asset or options mentioned → IMPLEMENTABLE: NO\n"
-            "# If vague triggers without numeric thresholds → IMPLEMENTABLE: NO, but suggest concrete defaults\n"
-            "# If single ticker and rules are clearly numeric/precise → IMPLEMENTABLE: YES\n\n"
+            + DECISION_LOGIC +
             "Output exactly this format:\n"
             "IMPLEMENTABLE: YES|NO\n"
             "If NO, then follow with:\n"
@@ -586,8 +624,8 @@ Consider:
 Respond only: STOP or CONTINUE"""
         
         try:
-            decision_llm = LLM("gpt-4o-mini")
-            response = decision_llm.ask(prompt).strip().upper()
+            decision_llm = self.fast_llm
+            response = decision_llm.ask(prompt, cache=True).strip().upper()
             return "STOP" in response
         except Exception:
             # Fallback to original logic
@@ -615,12 +653,16 @@ Provide a fix prompt with:
 Format as a clear fix prompt for another LLM to follow."""
         
         try:
-            diagnosis_llm = LLM("gpt-4o-mini")
+            diagnosis_llm = self.fast_llm
             custom_fix_prompt = diagnosis_llm.ask(diagnosis_prompt)
             return custom_fix_prompt
         except Exception:
             # Fallback to original hardcoded prompt
-            return f"""Fix this error. Use the indicator patterns from before.
+            return self._static_fix_prompt(error, code)
+
+    def _static_fix_prompt(self, error: str, code: str) -> str:
+        """Hardcoded fix prompt listing the common fixes (no diagnosis call)."""
+        return f"""Fix this error. Use the indicator patterns from before.
 
 ERROR:
 {error}
@@ -635,13 +677,164 @@ CRITICAL FIXES:
 1. NEVER redefine get_ohlcv_data - it exists!
 2. cash must be a number: cash=10000 NOT cash='$10,000'
 3. Dates: '2024-01-01' format
-4. For indicators, use the helper function pattern shown earlier
-5. All indicators must return .to_numpy()
-6. At the end, print TRADES_CSV and EQUITY_CSV exactly as shown:
-   print("TRADES_CSV"); print(stats._trades.to_csv(index=False)); print("EQUITY_CSV"); print(stats._equity_curve.to_csv(index=False))
+4. For indicators, use the built-in `ind` library: self.I(ind.rsi, self.data.Close, 14), self.I(ind.sma, self.data.Close, 20), ...
+5. Custom indicator helpers must return .to_numpy()
+6. At the end, print(stats) and then call emit_result(stats) exactly once
 
 Write the COMPLETE fixed code:"""
     
+    @staticmethod
+    def _extract_code(response: str) -> str:
+        """Strip a ```python fence from a code-generation response."""
+        if "```python" in response:
+            return response.split("```python")[1].split("```")[0].strip()
+        return response.strip()
+
+    def _critic_decision(self, result: dict) -> str:
+        """Decide PROCEED/RETRY for a successful run.
+
+        The rule-based critic settles most runs locally; only cases it can't
+        decide (unparseable period, printed-only stats, ...) go to the LLM.
+        """
+        decision, reasons = review(self.requirements, result)
+        if self.debug_logger:
+            self.debug_logger.info(f"Rule critic: {decision or 'UNDECIDED'} - {'; '.join(reasons)}")
+        if decision:
+            return f"DECISION: {decision}\n" + "\n".join(f"- {r}" for r in reasons)
+        critique_prompt = f"""Evaluate: Did the backtest run successfully?
+
+Requirements: {self._format_requirements()}
+Results: {build_digest(result.get('artifacts'), result['output'])}
+
+PASS if: 
+- Shows stats (Return %, Equity Final, etc.)
+- Uses correct ticker/period/capital
+- No crashes or errors
+- Even if # Trades = 0 (strategy may not trigger signals in this period)
+
+FAIL if: 
+- Crashed with errors
+- Wrong ticker/period/capital
+- No stats shown
+
+DECISION: [PROCEED or RETRY]"""
+
+        return self.code_llm.ask(critique_prompt)
+
+    def _speculative_candidates(self) -> list:
+        """(llm, temperature) pairs for speculative generation; one means off.
+
+        NLBT_SPECULATIVE sets how many candidates are generated at once and
+        NLBT_SPECULATIVE_MODELS (comma list) spreads them over several models;
+        temperatures fan out as default, 0.3, 0.6, ... up to 1.0.
+        """
+        try:
+            count = max(1, int(os.getenv("NLBT_SPECULATIVE", "1")))
+        except ValueError:
+            count = 1
+        names = [m.strip() for m in os.getenv("NLBT_SPECULATIVE_MODELS", "").split(",") if m.strip()]
+        llms = [self.models.get("code", name) for name in names] if count > 1 and names else [self.code_llm]
+        return [
+            (llms[i % len(llms)], None if i == 0 else min(1.0, round(0.3 * i, 1)))
+            for i in range(count)
+        ]
+
+    def _speculate(self, code_prompt: str, candidates: list):
+        """Generate and run candidates concurrently; the first the critic accepts wins.
+
+        Returns (code, result, critique). If no candidate is accepted, the
+        first one that ran (critic said RETRY) or else the first that failed
+        is returned so the serial fix loop carries on from it; None if no
+        candidate could even be generated. Losers are cancelled: pending ones
+        never start, running ones skip execution and critique.
+        """
+        print(f"⚡ Generating {len(candidates)} candidates in parallel...")
+        stop = threading.Event()
+
+        def run_candidate(llm, temperature):
+            try:
+                response = llm.ask(code_prompt, temperature=temperature)
+            except RuntimeError:
+                if temperature is None:
+                    raise
+                # Model rejects the temperature option: take its default
+                response = llm.ask(code_prompt)
+            code = self._extract_code(response)
+            if stop.is_set():
+                return code, None, None
+            code, result = self._precheck_and_run(code)
+            if not result["success"] or stop.is_set():
+                return code, result, None
+            return code, result, self._critic_decision(result)
+
+        pool = ThreadPoolExecutor(max_workers=len(candidates))
+        futures = [pool.submit(run_candidate, llm, temperature) for llm, temperature in candidates]
+        ran = None
+        failed = None
+        try:
+            for future in as_completed(futures):
+                try:
+                    code, result, critique = future.result()
+                except Exception as e:
+                    if self.debug_logger:
+                        self.debug_logger.info(f"Speculative candidate failed to generate: {e}")
+                    continue
+                if critique is not None and "PROCEED" in critique.upper():
+                    return code, result, critique
+                if critique is not None and ran is None:
+                    ran = (code, result, critique)
+                elif result is not None and failed is None:
+                    failed = (code, result, None)
+        finally:
+            stop.set()
+            for future in futures:
+                future.cancel()
+            pool.shutdown(wait=False)
+        return ran or failed
+
+    def _precheck_and_run(self, code: str):
+        """Apply static auto-fixes, then execute; returns (code, result).
+
+        Problems the precheck can't fix come back as a failed result marked
+        with "precheck" without running anything.
+        """
+        code, fixes, errors = precheck(code)
+        self._await_prefetch()
+        if fixes and self.debug_logger:
+            self.debug_logger.info("Precheck fixes:\n" + "\n".join(fixes))
+        if errors:
+            return code, {
+                "success": False,
+                "output": "",
+                "error": "PrecheckError:\n" + "\n".join(f"- {e}" for e in errors),
+                "artifacts": None,
+                "precheck": True,
+            }
+        return code, self.sandbox.run(code)
+
+    def _prefetch_data(self):
+        """Start downloading the data in the background once ticker and period are known."""
+        if os.getenv("NLBT_PREFETCH", "1").lower() in ("0", "false", "no"):
+            return
+        ticker, period = self.requirements.get("ticker"), self.requirements.get("period")
+        if not (ticker and period):
+            return
+        key = (ticker.strip().upper(), period.strip())
+        if self.prefetched and self.prefetched[0] == key:
+            return
+        self.prefetched = (key, prefetch(self.sandbox.cache, ticker, period))
+
+    def _await_prefetch(self):
+        """Let a running download finish so worker processes find the data on disk."""
+        future = self.prefetched[1] if self.prefetched else None
+        if future is None:
+            return
+        try:
+            future.result(timeout=PREFETCH_WAIT)
+        except Exception:
+            # The sandbox fetches (and reports errors) on its own
+            pass
+
     def _execute_backtest(self, code: str) -> dict:
         """Execute the backtest code."""
         # Execute code in sandbox and return raw result
@@ -657,13 +850,13 @@ Write the COMPLETE fixed code:"""
 
 REQUIREMENTS: {self._format_requirements()}
 CODE: {self.code}
-OUTPUT: {result['output']}
+OUTPUT: {build_digest(result.get('artifacts'), result['output'])}
 
 Is this backtest ACCEPTABLE? Respond only with JSON:
 {{"acceptable": true/false, "reason": "brief explanation"}}"""
         
         try:
-            validation_llm = LLM("gpt-4o-mini")
+            validation_llm = self.fast_llm
             response = validation_llm.ask(prompt).strip()
             
             # Extract JSON
@@ -684,79 +877,63 @@ Is this backtest ACCEPTABLE? Respond only with JSON:
     
     def _phase3_reporting(self) -> str:
         """Phase 3: Plan, write, refine report."""
-        # Try to extract structured outputs from results
-        trades_csv = None
-        equity_csv = None
-        summary_json = None
-        if isinstance(self.results, str):
-            text = self.results
-            if "SUMMARY_JSON" in text:
-                try:
-                    summary_json = text.split("SUMMARY_JSON", 1)[1].strip().splitlines()[0]
-                except Exception:
-                    pass
-            if "TRADES_CSV" in text:
-                try:
-                    trades_csv = text.split("TRADES_CSV", 1)[1].strip()
-                    # Keep until next marker if present
-                    if "EQUITY_CSV" in trades_csv:
-                        trades_csv = trades_csv.split("EQUITY_CSV", 1)[0].strip()
-                except Exception:
-                    pass
-            if "EQUITY_CSV" in text:
-                try:
-                    equity_csv = text.split("EQUITY_CSV", 1)[1].strip()
-                except Exception:
-                    pass
+        # Prefer structured results from emit_result(); fall back to stdout
+        # markers for scripts written against the older print-based template
+        trades_df = None
+        equity_df = None
+        if self.artifacts:
+            trades_df = self.artifacts.get("trades")
+            equity_df = self.artifacts.get("equity")
+        elif isinstance(self.results, str):
+            trades_df, equity_df = self._parse_legacy_markers(self.results)
 
         # Save assets folder
         import os
         from datetime import datetime
-        os.makedirs("reports", exist_ok=True)
-        ticker_slug = (self.requirements.get('ticker') or 'TICKER').replace('^','').replace('.','_')
-        period_slug = (self.requirements.get('period') or 'PERIOD').replace(' ','').replace(':','-')
-        run_dir = f"reports/{ticker_slug}_{period_slug}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        os.makedirs(run_dir, exist_ok=True)
+        run_dir = self._make_run_dir()
+        self.run_dir = run_dir
         
-        # Setup logging for this run
-        self.debug_logger, self.agent_logger = setup_run_logging(run_dir)
+        # Setup logging for this run; files are closed once the report is out
+        self.run_log = setup_run_logging(run_dir)
+        self.debug_logger, self.agent_logger = self.run_log.debug, self.run_log.agent
+        self.run_log.event("report_started", requirements=self.requirements)
+        # Phase 2 ran before this folder existed; persist its per-state timings
+        if self.pipeline is not None and self.pipeline.state == "report":
+            self.pipeline.log_timings(self.run_log)
+        try:
+            return self._write_report(run_dir, trades_df, equity_df)
+        except KeyboardInterrupt:
+            # Streaming lets the user stop a runaway generation; the partial
+            # draft stays in report.md and the next message regenerates it
+            self.run_log.event("report_aborted")
+            raise
+        except Exception as e:
+            self.run_log.event("report_failed", error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            self._close_run_logging()
+
+    def _close_run_logging(self):
+        """Flush and close the current run's log files."""
+        if self.run_log:
+            self.run_log.close()
+        self.run_log = None
+        self.debug_logger = None
+        self.agent_logger = None
 
-        # Try generating charts using matplotlib if equity CSV exists
-        equity_png = None
+    def _write_report(self, run_dir, trades_df, equity_df) -> str:
+        """Plan, write and save report.md, strategy.py, logs and the PDF."""
         trades_table_md = None
-        try:
-            import pandas as pd  # type: ignore
-            import matplotlib.pyplot as plt  # type: ignore
-            if equity_csv:
-                from io import StringIO
-                eq_df = pd.read_csv(StringIO(equity_csv))
-                # Find best equity column via LLM
-                ycol = self._find_best_column(list(eq_df.columns), "equity")
-                x = eq_df.index if 'index' in eq_df.columns else range(len(eq_df))
-                plt.figure(figsize=(8,4))
-                plt.plot(eq_df[ycol])
-                plt.title('Equity Curve')
-                plt.grid(True, alpha=0.3)
-                equity_png = os.path.join(run_dir, 'equity.png')
-                plt.tight_layout()
-                plt.savefig(equity_png, dpi=150)
-                plt.close()
-            if trades_csv:
-                from io import StringIO
-                tr_df = pd.read_csv(StringIO(trades_csv))
-                # Build a compact markdown table of first 20 trades
-                cols = [c for c in tr_df.columns]
-                head = tr_df.head(50)
-                trades_table_md = "| " + " | ".join(cols) + " |\n" + "|" + "---|"*len(cols) + "\n"
-                for _, row in head.iterrows():
-                    trades_table_md += "| " + " | ".join(str(row[c]) for c in cols) + " |\n"
-        except Exception:
-            pass
+        if trades_df is not None and len(trades_df):
+            trades_table_md = self._markdown_table(trades_df, limit=50)
+        if equity_df is not None and not len(equity_df):
+            equity_df = None
+
         # Plan
         plan_prompt = f"""Plan a backtest report structure:
 
 Results:
-{self.results}
+{self._results_digest()}
 
 Code:
 {self.code}
@@ -768,17 +945,37 @@ Create outline with sections:
 4. Insights
 5. Code"""
 
-        plan = self.llm.ask(plan_prompt)
-        
         # Write
         selected_language = (self.requirements.get('lang') or 'English').strip()
-        write_prompt = f"""Write a professional backtest report following this plan:
+        lang = self.requirements.get('lang', 'English')
+        results_text = self._results_digest()
+
+        # Title, TL;DR, headings and the equity column don't depend on the
+        # draft, so they run concurrently with the plan → write critical path.
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            title_future = pool.submit(self._generate_title)
+            # Compute TL;DR via LLM so it follows the selected language
+            tldr_future = pool.submit(self._llm_tldr, results_text)
+            trades_heading_future = (
+                pool.submit(self._generate_section_name, "trades", lang) if trades_table_md else None
+            )
+            equity_heading_future = (
+                pool.submit(self._generate_section_name, "equity_curve", lang) if equity_df is not None else None
+            )
+            # Find best equity column via LLM
+            column_future = (
+                pool.submit(self._find_best_column, list(equity_df.columns), "equity") if equity_df is not None else None
+            )
+
+            plan = self._stream_text(plan_prompt, "plan")
+
+            write_prompt = f"""Write a professional backtest report following this plan:
 
 Plan:
 {plan}
 
 Results:
-{self.results}
+{results_text}
 
 Code:
 {self.code}
@@ -799,24 +996,40 @@ CRITICAL INSTRUCTIONS:
 
 Write the complete report now:"""
 
-        draft = self.llm.ask(write_prompt)
-        
-        # Generate title via LLM (with fallback to f-string)
-        title = self._generate_title()
-        summary_title = title
+            draft = self._stream_text(write_prompt, "report", os.path.join(run_dir, 'report.md'))
 
-        # Compute TL;DR via LLM so it follows the selected language
-        tldr_line = self._llm_tldr(self.results if isinstance(self.results, str) else str(self.results))
-        final_md = f"# {summary_title}\n\n**{tldr_line}**\n\n" + draft
-        
-        # Generate section headings via LLM
-        lang = self.requirements.get('lang', 'English')
-        if trades_table_md:
-            trades_heading = self._generate_section_name("trades", lang)
-            final_md += f"\n\n## {trades_heading}\n\n" + trades_table_md
-        if equity_png:
-            equity_heading = self._generate_section_name("equity_curve", lang)
-            final_md += f"\n\n## {equity_heading}\n\n![]({os.path.basename(equity_png)})\n"
+            # Render the equity chart on this thread (pyplot is not thread-safe)
+            equity_png = None
+            if column_future is not None:
+                try:
+                    import matplotlib.pyplot as plt  # type: ignore
+                    ycol = column_future.result()
+                    plt.figure(figsize=(8,4))
+                    plt.plot(equity_df[ycol])
+                    plt.title('Equity Curve')
+                    plt.grid(True, alpha=0.3)
+                    equity_png = os.path.join(run_dir, 'equity.png')
+                    plt.tight_layout()
+                    plt.savefig(equity_png, dpi=150)
+                    plt.close()
+                except Exception:
+                    equity_png = None
+
+            # Generate title via LLM (with fallback to f-string)
+            ticker, period = self.requirements.get('ticker', 'Unknown'), self.requirements.get('period', 'Unknown')
+            title = _result_or(title_future, f"{ticker} {period} Trading Strategy")
+            summary_title = title
+            tldr_line = _result_or(tldr_future, "Summary unavailable")
+            self.tldr = tldr_line
+            final_md = f"# {summary_title}\n\n**{tldr_line}**\n\n" + draft
+
+            # Generate section headings via LLM
+            if trades_table_md:
+                trades_heading = _result_or(trades_heading_future, "Trades (first 50)")
+                final_md += f"\n\n## {trades_heading}\n\n" + trades_table_md
+            if equity_png:
+                equity_heading = _result_or(equity_heading_future, "Equity Curve")
+                final_md += f"\n\n## {equity_heading}\n\n![]({os.path.basename(equity_png)})\n"
 
         # Save markdown and assets into run directory
         md_path = os.path.join(run_dir, 'report.md')
@@ -836,27 +1049,21 @@ Write the complete report now:"""
             self.agent_logger.info("=== METADATA ===")
             self.agent_logger.info(f"timestamp: {datetime.now()}")
             self.agent_logger.info(f"run_dir: {run_dir}")
-            try:
-                import subprocess
-                git_sha = subprocess.check_output(['git', 'rev-parse', 'HEAD'], text=True).strip()
-                self.agent_logger.info(f"git_sha: {git_sha}")
-            except:
-                pass
+            git_head = git_sha()
+            if git_head:
+                self.agent_logger.info(f"git_sha: {git_head}")
             self.agent_logger.info("")
-            
-            # Codebase snapshot
+
+            # Codebase snapshot: stored once per distinct content, referenced by id
             self.agent_logger.info("=== CODEBASE ===")
-            base_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-            for pattern in ["src/**/*.py", "*.toml", "README.md"]:
-                for file_path in glob.glob(os.path.join(base_dir, pattern), recursive=True):
-                    rel_path = os.path.relpath(file_path, base_dir)
-                    self.agent_logger.info(f"--- {rel_path} ---")
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            self.agent_logger.info(f.read())
-                    except:
-                        self.agent_logger.info("[Could not read file]")
-                    self.agent_logger.info("")
+            snapshot_dir = os.path.join(self.reports_dir, "snapshots")
+            try:
+                snapshot_id = snapshot_codebase(snapshot_dir)
+                self.agent_logger.info(f"snapshot: {snapshot_id}")
+                self.agent_logger.info(f"path: {os.path.join(snapshot_dir, snapshot_id + '.txt')}")
+            except Exception as e:
+                self.agent_logger.info(f"[Could not snapshot codebase: {e}]")
+            self.agent_logger.info("")
             
             # Conversation history
             self.agent_logger.info("=== CONVERSATION ===")
@@ -944,12 +1151,16 @@ Write the complete report now:"""
                     pdf.savefig()
                     plt.close()
         
+        self.run_log.event(
+            "report_saved", run_dir=run_dir, title=title, tldr=self.tldr,
+            summary=(self.artifacts or {}).get("summary"),
+        )
         self.phase = "complete"
         return f"""🎉 COMPLETE! All 3 phases finished successfully.
 
 📄 REPORT FOLDER: {run_dir}
 • User report: report.md, report.pdf
-• Developer trace: debug.log, strategy.py
+• Developer trace: debug.log, events.jsonl, strategy.py
 • Agent context: agent.log
 
 📈 WHAT YOU GOT:
@@ -966,6 +1177,116 @@ Write the complete report now:"""
 
 ✨ Thanks for using the Reflection Backtesting Assistant!"""
 
+    def _stream_text(self, prompt: str, stage: str, path: str = None) -> str:
+        """Ask the chat model, streaming chunks to `stream_sink` and `path` if set.
+
+        Without a sink (batch mode) this is a plain blocking ask.
+        """
+        if self.stream_sink is None:
+            return self.llm.ask(prompt)
+        parts = []
+        out = open(path, 'w', encoding='utf-8') if path else None
+        chunks = self.llm.stream(prompt)
+        try:
+            for chunk in chunks:
+                parts.append(chunk)
+                if out:
+                    out.write(chunk)
+                    out.flush()
+                self.stream_sink(stage, chunk)
+        finally:
+            chunks.close()
+            if out:
+                out.close()
+        return "".join(parts).strip()
+
+    def _make_run_dir(self, kind: str = "") -> str:
+        """Create a fresh reports/<TICKER>_<PERIOD>[_kind]_<timestamp> folder."""
+        os.makedirs(self.reports_dir, exist_ok=True)
+        ticker_slug = (self.requirements.get('ticker') or 'TICKER').replace('^','').replace('.','_')
+        period_slug = (self.requirements.get('period') or 'PERIOD').replace(' ','').replace(':','-')
+        kind_slug = f"_{kind}" if kind else ""
+        base_dir = f"{self.reports_dir}/{ticker_slug}_{period_slug}{kind_slug}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        # Concurrent runs of the same ticker/period can land in the same second
+        run_dir = base_dir
+        suffix = 1
+        while True:
+            try:
+                os.makedirs(run_dir)
+                return run_dir
+            except FileExistsError:
+                suffix += 1
+                run_dir = f"{base_dir}_{suffix}"
+
+    def sweep(self, grid, maximize: str = "Return [%]", top_k: int = 5) -> str:
+        """Re-run the current strategy over a parameter grid without new LLM calls.
+
+        `grid` is a dict of value lists or text like "rsi_low=25,30 rsi_high=70,75".
+        """
+        if not self.code:
+            return "⚠️ No strategy code yet. Run a backtest first, then sweep its parameters."
+        params = strategy_parameters(self.code)
+        try:
+            if isinstance(grid, str):
+                grid = parse_grid(grid)
+        except ValueError as e:
+            return f"❌ {e}"
+        if not grid:
+            if not params:
+                return "⚠️ This strategy exposes no numeric class attributes to sweep."
+            listing = "\n".join(f"• {k} = {v}" for k, v in params.items())
+            return f"🧪 Sweepable parameters (current values):\n{listing}\n\nExample: sweep {next(iter(params))}=10,20,30"
+
+        result = run_sweep(self.sandbox, self.code, grid, maximize, top_k)
+        if not result["success"]:
+            return f"❌ Sweep failed: {result['error']}"
+        run_dir = self.run_dir or self._make_run_dir("sweep")
+        md_path = write_sweep_report(result, run_dir, maximize)
+        best = ", ".join(f"{k}={v}" for k, v in result["best_params"].items())
+        best_score = result["top"][maximize].iloc[0]
+        return (
+            f"🧪 Sweep: {len(result['heatmap'])} configurations\n"
+            f"🏆 Best: {best} ({maximize} {best_score:.2f})\n"
+            f"📄 SWEEP REPORT: {md_path}"
+        )
+
+    def _results_digest(self) -> str:
+        """Compact, token-bounded view of the last results for prompts."""
+        if not self.results_digest:
+            results = self.results if isinstance(self.results, str) else str(self.results)
+            self.results_digest = build_digest(self.artifacts, results)
+        return self.results_digest
+
+    def _parse_legacy_markers(self, text: str):
+        """Parse TRADES_CSV/EQUITY_CSV blocks printed by older generated code."""
+        trades_df = None
+        equity_df = None
+        try:
+            import pandas as pd  # type: ignore
+            from io import StringIO
+            if "TRADES_CSV" in text:
+                trades_csv = text.split("TRADES_CSV", 1)[1].strip()
+                # Keep until next marker if present
+                if "EQUITY_CSV" in trades_csv:
+                    trades_csv = trades_csv.split("EQUITY_CSV", 1)[0].strip()
+                trades_df = pd.read_csv(StringIO(trades_csv))
+            if "EQUITY_CSV" in text:
+                equity_csv = text.split("EQUITY_CSV", 1)[1].strip()
+                if "SUMMARY_JSON" in equity_csv:
+                    equity_csv = equity_csv.split("SUMMARY_JSON", 1)[0].strip()
+                equity_df = pd.read_csv(StringIO(equity_csv))
+        except Exception:
+            pass
+        return trades_df, equity_df
+
+    def _markdown_table(self, df, limit: int = 50) -> str:
+        """Render the first `limit` rows of a DataFrame as a markdown table."""
+        cols = [c for c in df.columns]
+        table = "| " + " | ".join(str(c) for c in cols) + " |\n" + "|" + "---|"*len(cols) + "\n"
+        for _, row in df.head(limit).iterrows():
+            table += "| " + " | ".join(str(row[c]) for c in cols) + " |\n"
+        return table
+
     def _llm_tldr(self, results_text: str) -> str:
         """Produce a single-line summary: strategy, end date, cash, equity, portfolio."""
         strategy = (self.requirements.get('strategy') or '').strip()
@@ -1011,8 +1332,8 @@ Output only the title, no quotes or punctuation at end."""
         
         try:
             # Use fast model (gpt-4o-mini for speed)
-            title_llm = LLM("gpt-4o-mini")
-            title = title_llm.ask(prompt).strip().strip('"\'.')
+            title_llm = self.fast_llm
+            title = title_llm.ask(prompt, cache=True).strip().strip('"\'.')
             if title and len(title) < 100:
                 return title
         except Exception as e:
@@ -1036,8 +1357,8 @@ Answer:"""
         
         try:
             # Use fast model
-            proceed_llm = LLM("gpt-4o-mini")
-            response = proceed_llm.ask(prompt).strip().upper()
+            proceed_llm = self.fast_llm
+            response = proceed_llm.ask(prompt, cache=True).strip().upper()
             return "YES" in response and "NO" not in response
         except:
             # Simple fallback
@@ -1052,8 +1373,8 @@ Language: {language}
 Output only the heading text (2-4 words), no markdown ##, no punctuation at end."""
         
         try:
-            section_llm = LLM("gpt-4o-mini")
-            heading = section_llm.ask(prompt).strip().strip('#').strip()
+            section_llm = self.fast_llm
+            heading = section_llm.ask(prompt, cache=True).strip().strip('#').strip()
             if heading and len(heading) < 50:
                 return heading
         except:
@@ -1076,8 +1397,8 @@ Which column likely contains {target_type} data? Answer with ONLY the exact colu
 {target_type} typically contains values like equity, portfolio value, or account balance over time."""
         
         try:
-            col_llm = LLM("gpt-4o-mini")
-            response = col_llm.ask(prompt).strip().strip('"\'')
+            col_llm = self.fast_llm
+            response = col_llm.ask(prompt, cache=True).strip().strip('"\'')
             if response in df_columns:
                 return response
         except:
@@ -1130,8 +1451,8 @@ Examples:
 JSON:"""
         
         try:
-            extract_llm = LLM("gpt-4o-mini")
-            response = extract_llm.ask(prompt).strip()
+            extract_llm = self.fast_llm
+            response = extract_llm.ask(prompt, cache=True).strip()
             
             # Extract JSON from response
             import json
@@ -1158,6 +1479,7 @@ JSON:"""
         # Simple fallback if all LLM extraction fails
         if not self.requirements.get("ticker") or not self.requirements.get("period") or not self.requirements.get("capital") or not self.requirements.get("strategy"):
             self._basic_regex_extraction(user_input)
+        self._prefetch_data()
     
     def _basic_regex_extraction(self, user_input: str):
         """Minimal regex extraction for critical fields only."""
@@ -1210,6 +1532,7 @@ JSON:"""
                 self.requirements["capital"] = line.split("CAPITAL:")[1].strip()
             elif "STRATEGY:" in line and "MISSING" not in line and "?" not in line:
                 self.requirements["strategy"] = line.split("STRATEGY:")[1].strip()
+        self._prefetch_data()
     
     def _format_requirements(self) -> str:
         """Format current requirements for display with better context."""
@@ -0,0 +1,144 @@
+"""Re-run an accepted strategy when only capital, period or language change.
+
+Follow-ups like "actually make it $50000" or "use 2022 instead" don't need
+new code: the cash amount and date strings of the accepted script are
+patched in place (via the AST) and the script is executed again, without
+code generation, diagnosis or LLM critic calls.
+"""
+
+import ast
+import re
+
+from .critic import parse_period
+from .precheck import _Source, _called_name, _calls, parse_cash
+
+# Requirements a re-run can absorb without touching the strategy logic
+PARAMETERS = ("capital", "period", "lang")
+
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+# Cheap gate before the extraction call: amounts, dates or a language
+_MENTIONS = re.compile(
+    r"[$₹€£¥]|\d{3,}|\d\s*(?:k|m|mn|lakhs?|crores?)\b"
+    r"|\b(?:capital|cash|money|budget|invest\w*|amount)\b"
+    r"|\b(?:year|month|week|day|period|date|since|until|through|ytd)s?\b"
+    r"|\b(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+    r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\b"
+    r"|\b(?:lang|language|translat\w*|english|spanish|french|german|italian|portuguese"
+    r"|hindi|chinese|mandarin|japanese|korean|russian|arabic|dutch|turkish)\b",
+    re.IGNORECASE,
+)
+
+
+def _same(key: str, new: str, old) -> bool:
+    old = str(old or "").strip()
+    if key == "capital":
+        amount = parse_cash(new)
+        return amount is not None and amount == parse_cash(old)
+    if key == "period":
+        parsed = parse_period(new)
+        return (parsed is not None and parsed == parse_period(old)) or new.lower() == old.lower()
+    return " ".join(new.lower().split()) == " ".join(old.lower().split())
+
+
+def mentions_parameters(text: str) -> bool:
+    """Whether `text` could be changing capital, period or language.
+
+    False means the message is certainly something else (a question, a
+    new rule), so the extraction call can be skipped.
+    """
+    return bool(_MENTIONS.search(text or ""))
+
+
+def parameter_changes(current: dict, mentioned: dict):
+    """Fields of `mentioned` that differ from `current`.
+
+    Returns None when anything besides capital, period or lang changed
+    (a new ticker or different rules need new code), {} when nothing did.
+    """
+    changes = {}
+    for key, value in (mentioned or {}).items():
+        if not value or not str(value).strip():
+            continue
+        value = str(value).strip()
+        if _same(key, value, current.get(key)):
+            continue
+        if key not in PARAMETERS:
+            return None
+        changes[key] = value
+    return changes
+
+
+def _patch_cash(tree, source, amount, notes):
+    assignments = {}
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name)):
+            assignments[node.targets[0].id] = node.value
+    patched = set()
+    for call in _calls(tree):
+        if _called_name(call) not in ("Backtest", "run_signals"):
+            continue
+        for kw in call.keywords:
+            if kw.arg != "cash":
+                continue
+            value = kw.value
+            if isinstance(value, ast.Name):
+                value = assignments.get(value.id)
+            if not (isinstance(value, ast.Constant) and isinstance(value.value, (int, float, str))):
+                raise ValueError(f"line {kw.value.lineno}: cash is not a literal")
+            start, end = source.span(value)
+            if (start, end) not in patched:
+                source.replace(start, end, repr(amount))
+                notes.append(f"cash {value.value!r} → {amount}")
+                patched.add((start, end))
+    if not patched:
+        raise ValueError("no cash= argument to patch")
+
+
+def _patch_dates(tree, source, old_period, new_period, notes):
+    import pandas as pd
+
+    (old_start, old_end), (new_start, new_end) = old_period, new_period
+    shifted = {}
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Constant) and isinstance(node.value, str)
+                and _ISO_DATE.fullmatch(node.value)):
+            continue
+        day = pd.Timestamp(node.value)
+        # Keep each date's distance to the nearer period edge (warmup, end slack)
+        if abs(day - old_start) <= abs(day - old_end):
+            moved = day + (new_start - old_start)
+        else:
+            moved = day + (new_end - old_end)
+        text = moved.strftime("%Y-%m-%d")
+        start, end = source.span(node)
+        source.replace(start, end, source.text(node).replace(node.value, text))
+        shifted[node.value] = text
+    fetches = [c for c in _calls(tree) if _called_name(c) == "get_ohlcv_data"]
+    if not any(isinstance(a, ast.Constant) and a.value in shifted for c in fetches for a in c.args):
+        raise ValueError("get_ohlcv_data dates are not literals")
+    notes.extend(f"{old} → {new}" for old, new in shifted.items())
+
+
+def patch_code(code: str, current: dict, changes: dict):
+    """Apply capital/period changes to `code`; returns (code, notes).
+
+    Raises ValueError when the script doesn't expose them as literals (or
+    a period isn't a fixed date range); the caller then takes the normal
+    conversation path.
+    """
+    tree = ast.parse(code)
+    source = _Source(code)
+    notes = []
+    if "capital" in changes:
+        amount = parse_cash(changes["capital"])
+        if amount is None:
+            raise ValueError(f"capital '{changes['capital']}' is not a number")
+        _patch_cash(tree, source, amount, notes)
+    if "period" in changes:
+        old_period, new_period = parse_period(current.get("period")), parse_period(changes["period"])
+        if old_period is None or new_period is None:
+            raise ValueError("period is not a fixed date range")
+        _patch_dates(tree, source, old_period, new_period, notes)
+    return source.result(), notes
@@ -0,0 +1,203 @@
+"""Memoized sandbox results keyed on code, data and library versions.
+
+Re-running an unchanged strategy (a retried report, a restored pipeline, a
+batch job over the same strategy.py) returns the stored result instead of
+executing the backtest again.
+"""
+
+import hashlib
+import io
+import json
+import os
+import pickle
+import shutil
+import sys
+import threading
+import time
+import tokenize
+
+# Libraries whose version changes can change a backtest's numbers
+VERSIONED_LIBRARIES = ["backtesting", "pandas", "numpy", "ta"]
+# Sandbox-facing modules whose source changes can too
+_SOURCES = ("sandbox.py", "indicators.py", "vectorized.py")
+# Artifacts stored as Parquet; other emitted artifacts are pickled
+_FRAMES = ("stats", "trades", "equity")
+
+_ENVIRONMENT = None
+
+
+def normalize_code(code: str) -> str:
+    """Code with comments, blank lines and spacing normalized away (via tokenize)."""
+    try:
+        tokens = tokenize.generate_tokens(io.StringIO(code).readline)
+        kept = [(tok.type, tok.string) for tok in tokens if tok.type not in (tokenize.COMMENT, tokenize.NL)]
+        return tokenize.untokenize(kept)
+    except (tokenize.TokenError, SyntaxError):
+        return code
+
+
+def environment_fingerprint() -> str:
+    """Python and library versions plus the sandbox sources (once per process)."""
+    global _ENVIRONMENT
+    if _ENVIRONMENT is None:
+        from importlib import metadata
+
+        digest = hashlib.sha256(sys.version.split()[0].encode("ascii"))
+        for name in VERSIONED_LIBRARIES:
+            try:
+                version = metadata.version(name)
+            except metadata.PackageNotFoundError:
+                version = "missing"
+            digest.update(f"\0{name}=={version}".encode("utf-8"))
+        base_dir = os.path.dirname(__file__)
+        for name in _SOURCES:
+            try:
+                with open(os.path.join(base_dir, name), "rb") as f:
+                    digest.update(f.read())
+            except OSError:
+                pass
+        _ENVIRONMENT = digest.hexdigest()
+    return _ENVIRONMENT
+
+
+def data_fingerprint(frame) -> str:
+    """Content hash of an OHLCV frame (index, columns and values)."""
+    import pandas as pd
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(list(frame.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Successful sandbox results under `$CACHE_DIR/results/<key>/`.
+
+    The key hashes the normalized code and `environment_fingerprint()`.
+    Each entry also records the data the run requested, with a fingerprint
+    of every frame it got back. A lookup re-reads those frames through the
+    OHLCV cache and returns the stored result only if every fingerprint
+    still matches, so refreshed data invalidates the entry. Stats, trades
+    and equity are stored as Parquet, the rest as JSON or pickle. Once
+    there are more than `max_entries` entries, the least recently used are
+    pruned.
+    """
+
+    def __init__(self, root: str = None, max_entries: int = None):
+        self.root = root or os.path.join(os.getenv("CACHE_DIR") or ".cache", "results")
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("NLBT_RESULT_CACHE_MAX_ENTRIES", 500))
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(code: str) -> str:
+        text = f"{normalize_code(code)}\0{environment_fingerprint()}"
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, code: str, data_source):
+        """Stored result for `code` if its data is unchanged, else None."""
+        try:
+            path = os.path.join(self.root, self.key(code))
+            with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            for request in meta["data_requests"]:
+                frame = data_source.get(request["ticker"], request["start"], request["end"])
+                if data_fingerprint(frame) != request["fingerprint"]:
+                    shutil.rmtree(path, ignore_errors=True)
+                    self.misses += 1
+                    return None
+            result = self._load(path, meta)
+            os.utime(path)
+        except Exception:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def put(self, code: str, result: dict):
+        """Store a successful result whose data all came from get_ohlcv_data."""
+        requests = result.get("data_requests") or []
+        if not result.get("success") or not requests or not all(r.get("fingerprint") for r in requests):
+            return
+        tmp = None
+        try:
+            path = os.path.join(self.root, self.key(code))
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            os.makedirs(tmp, exist_ok=True)
+            self._save(tmp, result)
+            with self._lock:
+                shutil.rmtree(path, ignore_errors=True)
+                os.replace(tmp, path)
+        except Exception:
+            # Unstorable artifacts just mean no memoization for this run
+            if tmp:
+                shutil.rmtree(tmp, ignore_errors=True)
+            return
+        self._prune()
+
+    def _save(self, path: str, result: dict):
+        import pandas as pd
+
+        artifacts = dict(result.get("artifacts") or {})
+        stored = []
+        for name in _FRAMES:
+            value = artifacts.pop(name, None)
+            if value is None:
+                continue
+            frame = pd.DataFrame([value.to_dict()]) if name == "stats" else value
+            frame.to_parquet(os.path.join(path, f"{name}.parquet"))
+            stored.append(name)
+        summary = artifacts.pop("summary", None)
+        if artifacts:
+            with open(os.path.join(path, "artifacts.pkl"), "wb") as f:
+                pickle.dump(artifacts, f)
+        meta = {
+            "created": time.time(),
+            "output": result.get("output", ""),
+            "frames": stored,
+            "summary": summary,
+            "data_requests": result["data_requests"],
+        }
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    def _load(self, path: str, meta: dict) -> dict:
+        import pandas as pd
+
+        artifacts = {}
+        for name in meta["frames"]:
+            frame = pd.read_parquet(os.path.join(path, f"{name}.parquet"))
+            artifacts[name] = frame.iloc[0].rename(None) if name == "stats" else frame
+        if meta.get("summary") is not None:
+            artifacts["summary"] = meta["summary"]
+        extra = os.path.join(path, "artifacts.pkl")
+        if os.path.exists(extra):
+            with open(extra, "rb") as f:
+                artifacts.update(pickle.load(f))
+        return {
+            "success": True,
+            "output": meta["output"],
+            "error": None,
+            "artifacts": artifacts or None,
+            "data_requests": meta["data_requests"],
+            "memoized": True,
+        }
+
+    def _prune(self):
+        try:
+            entries = [e for e in os.scandir(self.root) if e.is_dir() and not e.name.endswith(".tmp")]
+        except OSError:
+            return
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_entries]:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def default_result_cache():
+    """ResultCache unless NLBT_RESULT_CACHE=0."""
+    if os.getenv("NLBT_RESULT_CACHE", "1").lower() in ("0", "false", "no"):
+        return None
+    return ResultCache()
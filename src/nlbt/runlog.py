@@ -0,0 +1,131 @@
+"""Per-run log files written by one shared background thread.
+
+Every run gets debug.log, agent.log and events.jsonl in its report folder.
+Loggers only enqueue records (QueueHandler); a single process-wide
+QueueListener routes them to the run's file handlers. `RunLog.close()`
+flushes the run's pending records, closes its files and forgets its
+loggers, so long-lived processes don't accumulate descriptors.
+"""
+
+import atexit
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from datetime import datetime
+
+_queue = queue.Queue()
+_listener = None
+_lock = threading.Lock()
+_ids = itertools.count(1)
+_NAME_PREFIX = "nlbt.run."
+
+
+class _JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, event, then the event's fields."""
+
+    def format(self, record):
+        payload = {"ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds")}
+        payload.update(getattr(record, "event", None) or {"event": record.getMessage()})
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class _Router(logging.Handler):
+    """Listener-side handler: dispatch each record to its run's file handler."""
+
+    def __init__(self):
+        super().__init__()
+        self.routes = {}
+
+    def handle(self, record):
+        done = getattr(record, "close_run", None)
+        if done is not None:
+            for handler in self.routes.pop(record.name, {}).values():
+                handler.close()
+            done.set()
+            return True
+        run_name, _, stream = record.name.rpartition(".")
+        handler = self.routes.get(run_name, {}).get(stream)
+        if handler is not None:
+            handler.handle(record)
+        return True
+
+
+_router = _Router()
+
+
+def _ensure_listener():
+    global _listener
+    with _lock:
+        if _listener is None:
+            _listener = logging.handlers.QueueListener(_queue, _router)
+            _listener.start()
+            atexit.register(_listener.stop)
+
+
+class RunLog:
+    """Loggers for one report folder: `debug`, `agent` and `event(...)`."""
+
+    STREAMS = {"debug": "debug.log", "agent": "agent.log", "events": "events.jsonl"}
+
+    def __init__(self, run_dir: str):
+        _ensure_listener()
+        self.run_dir = run_dir
+        self.name = f"{_NAME_PREFIX}{next(_ids)}"
+        handlers = {}
+        for stream, filename in self.STREAMS.items():
+            handler = logging.FileHandler(os.path.join(run_dir, filename), encoding="utf-8")
+            if stream == "events":
+                handler.setFormatter(_JsonFormatter())
+            handlers[stream] = handler
+        _router.routes[self.name] = handlers
+
+        self._loggers = {}
+        for stream in self.STREAMS:
+            logger = logging.getLogger(f"{self.name}.{stream}")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            logger.addHandler(logging.handlers.QueueHandler(_queue))
+            self._loggers[stream] = logger
+        self.debug = self._loggers["debug"]
+        self.agent = self._loggers["agent"]
+        self.closed = False
+
+    def event(self, name: str, **fields):
+        """Append a structured record to events.jsonl."""
+        if not self.closed:
+            self._loggers["events"].info(name, extra={"event": {"event": name, **fields}})
+
+    def close(self, timeout: float = 10.0):
+        """Flush pending records, close the files and drop the loggers."""
+        if self.closed:
+            return
+        self.closed = True
+        done = threading.Event()
+        marker = logging.LogRecord(self.name, logging.INFO, __file__, 0, "close", None, None)
+        marker.close_run = done
+        _queue.put(marker)
+        done.wait(timeout)
+        manager = logging.Logger.manager
+        for logger in self._loggers.values():
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+            manager.loggerDict.pop(logger.name, None)
+        manager.loggerDict.pop(self.name, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_run_files() -> int:
+    """Number of run log files currently held open (for diagnostics/tests)."""
+    return sum(
+        1 for handlers in list(_router.routes.values()) for h in handlers.values()
+        if h.stream is not None
+    )
@@ -1,74 +1,226 @@
 """Minimal sandbox for code execution."""
 
 import io
+import os
 import sys
+import threading
+import types
 from contextlib import redirect_stdout, redirect_stderr
 
+from .data import OHLCVCache
+from .results import data_fingerprint, default_result_cache
+
+# redirect_stdout swaps the process-wide sys.stdout, so in-process runs
+# must not overlap; use the "pool" backend for parallel execution.
+_EXEC_LOCK = threading.Lock()
+
+# Module name generated code executes under
+STRATEGY_MODULE = "nlbt_strategy"
+
+# What generated code can rely on; summarized for the validator prompt
+LIBRARIES = ["pandas", "numpy", "backtesting", "ta"]
+HELPERS = {
+    "get_ohlcv_data(ticker, start, end)": "daily Open/High/Low/Close/Volume DataFrame from Yahoo Finance, end exclusive, disk-cached",
+    "emit_result(stats)": "hand the bt.run() stats, trades and equity curve back to the engine",
+    "emit_artifact(name, value)": "return any other picklable object",
+    "ind.<name>": "cached vectorized indicators for self.I: sma, ema, rsi, macd, macd_signal, macd_hist, bbands, roc, atr, stoch",
+    "run_signals(data, entries, exits, cash, short=False, indicators=None)": "vectorized backtest of a pure entry/exit signal rule; same stats as bt.run()",
+}
+CONSTRAINTS = [
+    "one ticker per backtest (no multi-asset portfolios, pairs or spreads)",
+    "stocks, ETFs, indices and crypto pairs as Yahoo symbols (e.g. AAPL, RELIANCE.NS, ^NSEI, BTC-USD); no options or futures chains",
+    "daily bars only; intraday or tick data is not available",
+    "backtesting.py Strategy with init()/next(); long and short positions, market/limit/stop orders, sl/tp",
+    "indicators computed in init() via self.I(func, ...) returning numpy arrays (ind.* first, else hand-rolled pandas or the ta library)",
+    "numeric capital; commission optional; no external data or network besides get_ohlcv_data",
+]
+
+
+def capability_manifest() -> str:
+    """Compact description of the sandbox for prompts (replaces raw source)."""
+    lines = ["LIBRARIES: " + ", ".join(LIBRARIES), "HELPERS:"]
+    lines += [f"- {name}: {desc}" for name, desc in HELPERS.items()]
+    lines.append("CONSTRAINTS:")
+    lines += [f"- {c}" for c in CONSTRAINTS]
+    return "\n".join(lines)
+
 
 class Sandbox:
-    """Execute code safely."""
+    """Execute code safely.
+    
+    backend="inprocess" runs code via exec in this process; backend="pool"
+    sends it to a warm worker process (see workers.py) with a timeout and
+    memory limit. Defaults to NLBT_SANDBOX_BACKEND, then "inprocess".
+    Successful runs are memoized in `results` (a ResultCache; the default
+    unless NLBT_RESULT_CACHE=0, pass False to disable).
+    """
+    
+    def __init__(self, cache: OHLCVCache = None, backend: str = None, results=None):
+        self.cache = cache or OHLCVCache()
+        self.backend = (backend or os.getenv("NLBT_SANDBOX_BACKEND") or "inprocess").lower()
+        self.results = default_result_cache() if results is None else (results or None)
     
     def run(self, code: str) -> dict:
-        """Execute Python code, return results."""
+        """Execute Python code, return results (a memoized result has "memoized": True)."""
+        if self.results is not None:
+            hit = self.results.get(code, self.cache)
+            if hit is not None:
+                return hit
+        if self.backend == "pool":
+            from .workers import get_worker_pool
+            result = get_worker_pool().run(code)
+        else:
+            with _EXEC_LOCK:
+                result = self._run_inprocess(code)
+        if self.results is not None:
+            self.results.put(code, result)
+        return result
+    
+    def _run_inprocess(self, code: str) -> dict:
+        """Execute Python code in this process, return results.
+
+        Results emitted via `emit_result(stats)` come back under "artifacts"
+        as objects: "stats" (scalar Series), "trades" and "equity"
+        (DataFrames) and "summary" (dict). If the code never calls it, a
+        top-level `stats` from `bt.run()` is picked up instead. Any other
+        picklable object can be returned with `emit_artifact(name, value)`.
+        Every get_ohlcv_data call is recorded under "data_requests".
+        """
         stdout_capture = io.StringIO()
         stderr_capture = io.StringIO()
         
         # Build safe globals with required libraries
         safe_globals = self._get_globals()
+        artifacts = {}
+        safe_globals["emit_result"] = lambda stats: artifacts.update(extract_artifacts(stats))
+        safe_globals["emit_artifact"] = lambda name, value: artifacts.__setitem__(name, value)
+        data_requests = []
+        safe_globals["get_ohlcv_data"] = self._recording_fetch(data_requests)
+        
+        # Run as an importable module so classes defined by the strategy can
+        # be pickled by reference (Backtest.optimize forks worker processes)
+        module = types.ModuleType(STRATEGY_MODULE)
+        module.__dict__.update(safe_globals)
+        safe_globals = module.__dict__
+        sys.modules[STRATEGY_MODULE] = module
         
         try:
             with redirect_stdout(stdout_capture), redirect_stderr(stderr_capture):
                 exec(code, safe_globals)
             
+            if "stats" not in artifacts and _is_stats(safe_globals.get("stats")):
+                try:
+                    artifacts.update(extract_artifacts(safe_globals["stats"]))
+                except Exception:
+                    pass
+            
             return {
                 "success": True,
                 "output": stdout_capture.getvalue(),
-                "error": None
+                "error": None,
+                "artifacts": artifacts or None,
+                "data_requests": data_requests,
             }
         except Exception as e:
             return {
                 "success": False,
                 "output": stdout_capture.getvalue(),
-                "error": f"{type(e).__name__}: {str(e)}\n{stderr_capture.getvalue()}"
+                "error": f"{type(e).__name__}: {str(e)}\n{stderr_capture.getvalue()}",
+                "artifacts": None,
+                "data_requests": data_requests,
             }
+        finally:
+            sys.modules.pop(STRATEGY_MODULE, None)
     
     def _get_globals(self) -> dict:
         """Get safe global namespace with libraries."""
-        import importlib
-        
         globals_dict = {"__builtins__": __builtins__}
         
-        # Allow these libraries
-        for lib in ["pandas", "numpy", "backtesting", "ta"]:
-            try:
-                globals_dict[lib] = importlib.import_module(lib)
-            except ImportError:
-                pass
+        # Allow these libraries (resolved once per process)
+        globals_dict.update(_libraries())
         
         # Add helper function
         globals_dict["get_ohlcv_data"] = self._get_data
         
-        # Intentionally no indicator fallbacks — coding agent must use libraries (ta, etc.)
+        # Cached indicator library (self.I(ind.rsi, self.data.Close, 14))
+        from . import indicators
+        globals_dict["ind"] = indicators
+        
+        # Vectorized kernel for pure signal rules (no per-bar loop)
+        from .vectorized import run_signals
+        globals_dict["run_signals"] = run_signals
         
         return globals_dict
     
+    def _recording_fetch(self, log: list):
+        """get_ohlcv_data that also notes what was asked for and returned."""
+        def get_ohlcv_data(ticker: str, start: str, end: str):
+            data = self._get_data(ticker, start, end)
+            entry = {"ticker": str(ticker), "start": str(start), "end": str(end), "rows": len(data)}
+            if len(data):
+                entry["first"] = str(data.index[0].date())
+                entry["last"] = str(data.index[-1].date())
+            try:
+                entry["fingerprint"] = data_fingerprint(data)
+            except Exception:
+                pass
+            log.append(entry)
+            return data
+        return get_ohlcv_data
+
     def _get_data(self, ticker: str, start: str, end: str):
-        """Helper to fetch OHLCV data for backtesting.py library."""
-        import yfinance as yf
-        import pandas as pd
-        
-        # Download data
-        data = yf.download(ticker, start=start, end=end, progress=False)
-        
-        # Remove timezone if present
-        if data.index.tz:
-            data = data.tz_localize(None)
-        
-        # Handle MultiIndex columns (yfinance returns (column_name, ticker))
-        # We need to keep just the column names: Open, High, Low, Close, Volume
-        if isinstance(data.columns, pd.MultiIndex):
-            # Drop the ticker level (level 1), keep column names (level 0)
-            data.columns = data.columns.droplevel(1)
-        
-        return data
+        """Helper to fetch OHLCV data for backtesting.py library (disk-cached)."""
+        return self.cache.get(ticker, start, end)
+
+
+_LIBS = None
 
+
+def _libraries() -> dict:
+    """Import the allowed libraries once and reuse the module objects."""
+    global _LIBS
+    if _LIBS is None:
+        import importlib
+        libs = {}
+        for lib in LIBRARIES:
+            try:
+                libs[lib] = importlib.import_module(lib)
+            except ImportError:
+                pass
+        _LIBS = libs
+    return _LIBS
+
+
+def _is_stats(obj) -> bool:
+    """True for a backtesting.py stats Series (has trades and equity curve)."""
+    try:
+        return "_equity_curve" in obj.index and "_trades" in obj.index
+    except Exception:
+        return False
+
+
+def extract_artifacts(stats) -> dict:
+    """Split a backtesting.py stats Series into picklable result objects."""
+    import pandas as pd
+    
+    trades = stats.get("_trades")
+    equity = stats.get("_equity_curve")
+    # Drop private entries (_strategy holds user classes, frames travel separately)
+    scalars = stats[[k for k in stats.index if not str(k).startswith("_")]]
+    
+    end = stats.get("End", "")
+    try:
+        end = str(pd.Timestamp(end).date())
+    except Exception:
+        end = str(end)
+    equity_final = float(stats.get("Equity Final [$]", 0))
+    initial = float(equity["Equity"].iloc[0]) if equity is not None and len(equity) else None
+    summary = dict(
+        end=end,
+        initial=initial,
+        equity_final=equity_final,
+        portfolio_final=equity_final,
+        pnl_abs=equity_final - initial if initial is not None else None,
+        pnl_pct=float(stats.get("Return [%]", 0)),
+    )
+    return {"stats": scalars, "trades": trades, "equity": equity, "summary": summary}
@@ -0,0 +1,85 @@
+"""Content-addressed snapshots of the nlbt sources for agent.log."""
+
+import glob
+import hashlib
+import os
+import subprocess
+import threading
+
+# Project root (src/nlbt/snapshots.py → repo)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SNAPSHOT_PATTERNS = ["src/**/*.py", "*.toml", "README.md"]
+
+_lock = threading.Lock()
+_git_sha = None
+_snapshot = {"key": None, "id": None, "text": ""}
+
+
+def git_sha() -> str:
+    """HEAD of the checkout, resolved once per process ('' outside git)."""
+    global _git_sha
+    with _lock:
+        if _git_sha is None:
+            try:
+                _git_sha = subprocess.check_output(
+                    ["git", "rev-parse", "HEAD"], cwd=BASE_DIR, text=True,
+                    stderr=subprocess.DEVNULL, timeout=10,
+                ).strip()
+            except Exception:
+                _git_sha = ""
+        return _git_sha
+
+
+def _source_files(base_dir: str) -> list:
+    files = []
+    for pattern in SNAPSHOT_PATTERNS:
+        files.extend(sorted(glob.glob(os.path.join(base_dir, pattern), recursive=True)))
+    return files
+
+
+def _render(base_dir: str, files: list) -> str:
+    """Same layout agent.log used inline: '--- path ---' then the content."""
+    parts = []
+    for file_path in files:
+        parts.append(f"--- {os.path.relpath(file_path, base_dir)} ---")
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                parts.append(f.read())
+        except Exception:
+            parts.append("[Could not read file]")
+        parts.append("")
+    return "\n".join(parts)
+
+
+def snapshot_codebase(store_dir: str, base_dir: str = None) -> str:
+    """Store the current sources under `store_dir/<id>.txt` once; return the id.
+
+    The id is the sha256 (first 16 hex chars) of the rendered snapshot, so
+    identical sources across runs share one file. Files are only re-read when
+    a path, mtime or size changed since the last call in this process.
+    """
+    base_dir = base_dir or BASE_DIR
+    files = _source_files(base_dir)
+    key = []
+    for file_path in files:
+        try:
+            st = os.stat(file_path)
+            key.append((file_path, st.st_mtime_ns, st.st_size))
+        except OSError:
+            key.append((file_path, None, None))
+    key = (base_dir, tuple(key))
+
+    with _lock:
+        if _snapshot["key"] != key:
+            text = _render(base_dir, files)
+            _snapshot.update(key=key, text=text, id=hashlib.sha256(text.encode("utf-8")).hexdigest()[:16])
+        snapshot_id, text = _snapshot["id"], _snapshot["text"]
+
+    path = os.path.join(store_dir, f"{snapshot_id}.txt")
+    if not os.path.exists(path):
+        os.makedirs(store_dir, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    return snapshot_id
@@ -0,0 +1,147 @@
+"""Parameter sweeps over a generated strategy via Backtest.optimize."""
+
+import ast
+import os
+
+# Appended to the generated code: optimize the Backtest the script built
+SWEEP_SNIPPET = """
+
+# --- nlbt parameter sweep ---
+_sweep_bt = [v for v in list(globals().values()) if isinstance(v, backtesting.Backtest)][-1]
+_sweep_stats, _sweep_heatmap = _sweep_bt.optimize(
+    maximize={maximize!r}, return_heatmap=True, **{grid!r}
+)
+emit_result(_sweep_stats)
+emit_artifact("heatmap", _sweep_heatmap)
+emit_artifact("best_params", {{k: getattr(_sweep_stats._strategy, k) for k in {names!r}}})
+"""
+
+
+def strategy_parameters(code: str) -> dict:
+    """Numeric class attributes of the Strategy subclass (the tunable knobs)."""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return {}
+    params = {}
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.ClassDef):
+            continue
+        bases = [getattr(b, "id", getattr(b, "attr", "")) for b in node.bases]
+        if "Strategy" not in bases:
+            continue
+        for stmt in node.body:
+            if (isinstance(stmt, ast.Assign) and len(stmt.targets) == 1
+                    and isinstance(stmt.targets[0], ast.Name)
+                    and isinstance(stmt.value, ast.Constant)
+                    and isinstance(stmt.value.value, (int, float))
+                    and not isinstance(stmt.value.value, bool)):
+                params[stmt.targets[0].id] = stmt.value.value
+    return params
+
+
+def _number(text: str):
+    value = float(text)
+    return int(value) if value.is_integer() and "." not in text else value
+
+
+def parse_grid(text: str) -> dict:
+    """Parse 'rsi_low=25,30 rsi_high=70,75 n=10:50:10' into value lists.
+
+    Comma lists are used as-is; start:stop:step ranges include stop.
+    """
+    grid = {}
+    for part in text.replace(";", " ").split():
+        if "=" not in part:
+            raise ValueError(f"Expected name=values, got '{part}'")
+        name, values = part.split("=", 1)
+        if ":" in values:
+            start, stop, step = (list(map(_number, values.split(":"))) + [1])[:3]
+            if step <= 0:
+                raise ValueError(f"Range step for '{name}' must be positive, got {step}")
+            items = []
+            current = start
+            while current <= stop + 1e-12:
+                items.append(current)
+                current = current + step
+            grid[name] = items
+        else:
+            grid[name] = [_number(v) for v in values.split(",") if v]
+    return grid
+
+
+def run_sweep(sandbox, code: str, grid: dict, maximize: str = "Return [%]", top_k: int = 5) -> dict:
+    """Execute the generated code once with Backtest.optimize over `grid`.
+
+    Returns {"success", "error", "heatmap", "top", "best_params", "artifacts"}.
+    Data comes through the sandbox's OHLCV cache and backtesting.py spreads
+    the grid over its own process pool.
+    """
+    known = strategy_parameters(code)
+    unknown = [name for name in grid if name not in known]
+    if unknown:
+        return {"success": False, "error": f"Unknown strategy parameters: {', '.join(unknown)} (available: {', '.join(known) or 'none'})"}
+
+    sweep_code = code + SWEEP_SNIPPET.format(maximize=maximize, grid=grid, names=list(grid))
+    result = sandbox.run(sweep_code)
+    artifacts = result.get("artifacts") or {}
+    if not result["success"] or artifacts.get("heatmap") is None:
+        return {"success": False, "error": result.get("error") or "Sweep produced no heatmap"}
+
+    heatmap = artifacts["heatmap"].dropna()
+    top = heatmap.sort_values(ascending=False).head(top_k).reset_index()
+    top.columns = list(grid) + [maximize]
+    return {
+        "success": True,
+        "error": None,
+        "heatmap": heatmap,
+        "top": top,
+        "best_params": artifacts.get("best_params", {}),
+        "artifacts": artifacts,
+    }
+
+
+def write_sweep_report(sweep: dict, run_dir: str, maximize: str = "Return [%]") -> str:
+    """Save sweep.md (top-K table), sweep.csv and sweep_heatmap.png; return md path."""
+    os.makedirs(run_dir, exist_ok=True)
+    heatmap = sweep["heatmap"]
+    heatmap.rename(maximize).reset_index().to_csv(os.path.join(run_dir, "sweep.csv"), index=False)
+
+    png_name = None
+    try:
+        import matplotlib.pyplot as plt  # type: ignore
+        names = list(heatmap.index.names)
+        plt.figure(figsize=(7, 5))
+        if len(names) == 1:
+            plt.plot(heatmap.index, heatmap.values, marker="o")
+            plt.xlabel(names[0])
+            plt.ylabel(maximize)
+        else:
+            # Best value over any remaining dimensions for the first two params
+            grid2d = heatmap.groupby(level=names[:2]).max().unstack()
+            plt.imshow(grid2d.values, aspect="auto", origin="lower", cmap="viridis")
+            plt.colorbar(label=maximize)
+            plt.xticks(range(len(grid2d.columns)), grid2d.columns)
+            plt.yticks(range(len(grid2d.index)), grid2d.index)
+            plt.xlabel(names[1])
+            plt.ylabel(names[0])
+        plt.title(f"Parameter sweep: {maximize}")
+        plt.tight_layout()
+        png_name = "sweep_heatmap.png"
+        plt.savefig(os.path.join(run_dir, png_name), dpi=150)
+        plt.close()
+    except Exception:
+        png_name = None
+
+    top = sweep["top"]
+    lines = [f"# Parameter Sweep ({len(heatmap)} configurations)", ""]
+    lines.append("| " + " | ".join(str(c) for c in top.columns) + " |")
+    lines.append("|" + "---|" * len(top.columns))
+    for _, row in top.iterrows():
+        lines.append("| " + " | ".join(f"{row[c]:.4g}" if isinstance(row[c], float) else str(row[c]) for c in top.columns) + " |")
+    if png_name:
+        lines += ["", f"![]({png_name})"]
+    md_path = os.path.join(run_dir, "sweep.md")
+    with open(md_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return md_path
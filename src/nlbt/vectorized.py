@@ -0,0 +1,271 @@
+"""Vectorized backtests for pure signal rules, exposed as `run_signals` in the sandbox.
+
+A long/flat or long/short rule driven by boolean entry/exit arrays doesn't
+need backtesting.py's per-bar `Strategy.next()` loop: positions come from
+a forward-fill of the signals, equity from array arithmetic, and only the
+fills themselves (one per position change) are walked in Python. Fills,
+sizing and commissions follow backtesting.py's broker, and the stats come
+from its own `compute_stats`, so the result is a regular stats Series that
+`emit_result` accepts. `parity()` runs the same rule through
+`Backtest.run` and lists any field that differs.
+
+Rule, evaluated at each bar's close once indicators have warmed up, with
+orders filled at the next bar's open (backtesting.py defaults):
+
+- long/flat: enter long on `entries`, go flat on `exits`
+- long/short (`short=True`): go long on `entries`, short on `exits`
+
+`entries` wins when both fire on the same bar. Positions use all available
+cash; trades still open at the end stay out of the trade stats, as with
+`Backtest(..., finalize_trades=False)`.
+"""
+
+import sys
+
+# backtesting.py's default order size (all available equity)
+_FULL_EQUITY = 1 - sys.float_info.epsilon
+
+
+class SignalRule:
+    """Stands in for the Strategy instance in stats["_strategy"]."""
+
+    def __init__(self, indicators: dict, short: bool):
+        from backtesting._util import _Indicator
+
+        self.short = short
+        self._indicators = []
+        for name, values in indicators.items():
+            indicator = _Indicator(values, name=name, scatter=False)
+            self._indicators.append(indicator)
+            # compute_stats reads indicator warmup from instance attributes
+            setattr(self, f"_{name}", indicator)
+
+    def __repr__(self):
+        return f"SignalRule(short={self.short})"
+
+
+def _as_arrays(data, entries, exits, indicators):
+    import numpy as np
+
+    n = len(data)
+    entries = np.asarray(entries, dtype=bool)
+    exits = np.zeros(n, dtype=bool) if exits is None else np.asarray(exits, dtype=bool)
+    if entries.shape != (n,) or exits.shape != (n,):
+        raise ValueError(f"entries/exits must be 1-D with one value per bar ({n})")
+    named = {"entries": entries, "exits": exits}
+    for name, values in (indicators or {}).items():
+        named[name] = np.asarray(values, dtype=float)
+    return entries, exits, named
+
+
+def _warmup(named: dict) -> int:
+    """Bars until every indicator is defined (as backtesting.py counts them)."""
+    import numpy as np
+
+    return max((int(np.isnan(np.atleast_2d(v).astype(float)).argmin(axis=-1).max())
+                for v in named.values()), default=0)
+
+
+def _held_positions(entries, exits, start: int, short: bool):
+    """Direction held during each bar (+1/0/-1), after that bar's open fill."""
+    import numpy as np
+
+    n = len(entries)
+    decided = np.full(n, np.nan)
+    decided[exits] = -1.0 if short else 0.0
+    decided[entries] = 1.0
+    decided[:start] = np.nan
+    decided[0] = 0.0
+    filled = np.maximum.accumulate(np.where(np.isnan(decided), 0, np.arange(n)))
+    target = decided[filled]
+    # Decided at bar i's close, filled at bar i+1's open
+    held = np.empty(n)
+    held[0] = 0.0
+    held[1:] = target[:-1]
+    return held
+
+
+def _trade(size, entry_bar, exit_bar, entry_price, exit_price, commission):
+    fees = abs(size) * entry_price * commission + abs(size) * exit_price * commission
+    return size, entry_bar, exit_bar, entry_price, exit_price, fees
+
+
+def _fill(opens, held, fills, cash, commission):
+    """Walk the position changes; returns trades, (cash, size, entry price)
+    after each fill, and the position still open."""
+    import numpy as np
+
+    balance = float(cash)
+    size, entry_price, entry_bar = 0, np.nan, -1
+    trades = []
+    state = np.empty((len(fills), 3))
+    for k, bar in enumerate(fills):
+        price = opens[bar]
+        if size:
+            trade = _trade(size, entry_bar, bar, entry_price, price, commission)
+            balance += size * (price - entry_price) - abs(size) * price * commission
+            trades.append(trade)
+            size = 0
+        direction = held[bar]
+        if direction:
+            # Same arithmetic as the broker's relative-size order, so unit
+            # counts match to the last share
+            price_plus_commission = price + _FULL_EQUITY * price * commission / _FULL_EQUITY
+            units = int((max(0.0, balance) * 1.0 * _FULL_EQUITY) // price_plus_commission)
+            if not units:
+                raise ValueError(f"bar {bar}: cash {balance:.2f} can't buy one unit at {price:.2f}")
+            balance -= units * price * commission
+            size, entry_price, entry_bar = int(units * direction), price, int(bar)
+        state[k] = balance, size, entry_price
+    return trades, state, (size, entry_price, entry_bar)
+
+
+def _equity(closes, fills, state, cash):
+    import numpy as np
+
+    n = len(closes)
+    if not len(fills):
+        return np.full(n, float(cash))
+    last_fill = np.searchsorted(fills, np.arange(n), side="right") - 1
+    known = last_fill >= 0
+    row = state[np.maximum(last_fill, 0)]
+    balance = np.where(known, row[:, 0], float(cash))
+    size = np.where(known, row[:, 1], 0.0)
+    entry = np.where(size != 0, row[:, 2], 0.0)
+    return balance + (closes * size - size * entry)
+
+
+def _trades_frame(trades, index):
+    """Trades in the layout Backtest.run produces."""
+    import numpy as np
+    import pandas as pd
+
+    frame = pd.DataFrame({
+        "Size": [t[0] for t in trades],
+        "EntryBar": [t[1] for t in trades],
+        "ExitBar": [t[2] for t in trades],
+        "EntryPrice": [t[3] for t in trades],
+        "ExitPrice": [t[4] for t in trades],
+        "SL": [None for _ in trades],
+        "TP": [None for _ in trades],
+        "PnL": [t[0] * (t[4] - t[3]) - t[5] for t in trades],
+        "Commission": [t[5] for t in trades],
+        "ReturnPct": [np.copysign(1, t[0]) * (t[4] / t[3] - 1) - t[5] / (abs(t[0]) * t[3]) for t in trades],
+        "EntryTime": [index[t[1]] for t in trades],
+        "ExitTime": [index[t[2]] for t in trades],
+    })
+    frame["Duration"] = frame["ExitTime"] - frame["EntryTime"]
+    frame["Tag"] = [None for _ in trades]
+    return frame
+
+
+def run_signals(data, entries, exits=None, cash: float = 10_000, commission: float = 0.0,
+                short: bool = False, indicators: dict = None):
+    """Backtest a signal rule without the per-bar loop; returns backtesting.py stats.
+
+    `indicators` maps names to the arrays the signals were computed from;
+    their NaN warmup delays the first trade exactly like `self.I` does.
+    """
+    import numpy as np
+    from backtesting._stats import compute_stats
+
+    entries, exits, named = _as_arrays(data, entries, exits, indicators)
+    opens = data["Open"].to_numpy(dtype=float)
+    closes = data["Close"].to_numpy(dtype=float)
+    start = 1 + _warmup(named)
+
+    held = _held_positions(entries, exits, start, short)
+    fills = np.flatnonzero(held[1:] != held[:-1]) + 1
+    trades, state, _ = _fill(opens, held, fills, cash, commission)
+    equity = _equity(closes, fills, state, cash)
+
+    # Out of money (a short can lose more than the cash): close at that
+    # bar's close and stop, like the broker does
+    broke = np.flatnonzero(equity[start:] <= 0)
+    if len(broke):
+        bar = start + int(broke[0])
+        fills = fills[:np.searchsorted(fills, bar, side="right")]
+        trades, state, (size, entry_price, entry_bar) = _fill(opens, held, fills, cash, commission)
+        if size:
+            trades.append(_trade(size, entry_bar, bar, entry_price, closes[bar], commission))
+        equity[bar:] = 0
+
+    stats = compute_stats(trades=_trades_frame(trades, data.index), equity=equity, ohlc_data=data,
+                          strategy_instance=SignalRule(named, short), risk_free_rate=0.0)
+    fees = sum(t[5] for t in trades)
+    if fees:
+        # Backtest.run lists commissions right before the return
+        items = list(stats.items())
+        at = [k for k, _ in items].index("Return [%]")
+        stats = type(stats)(dict(items[:at] + [("Commissions [$]", fees)] + items[at:]), dtype=object)
+    return stats
+
+
+def parity(data, entries, exits=None, cash: float = 10_000, commission: float = 0.0,
+           short: bool = False, indicators: dict = None, rtol: float = 1e-9) -> list:
+    """Run the rule both vectorized and through Backtest.run; list the differences.
+
+    Compares every public stats field, the equity curve and the core trade
+    columns. An empty list means the kernels agree.
+    """
+    import warnings
+
+    import numpy as np
+    import pandas as pd
+    from backtesting import Backtest
+
+    fast = run_signals(data, entries, exits, cash, commission, short, indicators)
+    entries, exits, named = _as_arrays(data, entries, exits, indicators)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        bt = Backtest(data, _reference_strategy(), cash=cash, commission=commission)
+        slow = bt.run(signals=named, short=short)
+
+    diffs = []
+    keys = [k for k in slow.index if not str(k).startswith("_")]
+    if [k for k in fast.index if not str(k).startswith("_")] != keys:
+        diffs.append(f"fields: {list(fast.index)} != {list(slow.index)}")
+    for key in keys:
+        a, b = fast.get(key), slow[key]
+        if isinstance(b, (float, np.floating)) or isinstance(a, (float, np.floating)):
+            same = np.isclose(float(a), float(b), rtol=rtol, atol=1e-9, equal_nan=True)
+        else:
+            same = (pd.isna(a) and pd.isna(b)) or a == b
+        if not same:
+            diffs.append(f"{key}: {a!r} != {b!r}")
+    if not np.allclose(fast["_equity_curve"]["Equity"], slow["_equity_curve"]["Equity"], rtol=rtol):
+        diffs.append("equity curve differs")
+    columns = ["Size", "EntryBar", "ExitBar", "EntryPrice", "ExitPrice", "PnL", "Commission", "ReturnPct"]
+    a, b = fast["_trades"], slow["_trades"]
+    if len(a) != len(b):
+        diffs.append(f"trades: {len(a)} != {len(b)}")
+    elif len(a) and not np.allclose(a[columns].to_numpy(float), b[columns].to_numpy(float), rtol=rtol):
+        diffs.append("trade details differ")
+    return diffs
+
+
+def _reference_strategy():
+    from backtesting import Strategy
+
+    class SignalStrategy(Strategy):
+        """The per-bar equivalent of run_signals, for parity checks."""
+        signals = None
+        short = False
+
+        def init(self):
+            for name, values in self.signals.items():
+                setattr(self, name, self.I(lambda v=values: v, name=name))
+
+        def next(self):
+            if self.entries[-1]:
+                if self.position.is_short:
+                    self.position.close()
+                if not self.position.is_long:
+                    self.buy()
+            elif self.exits[-1]:
+                if self.position.is_long:
+                    self.position.close()
+                if self.short and not self.position.is_short:
+                    self.sell()
+
+    return SignalStrategy
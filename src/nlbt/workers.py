@@ -0,0 +1,152 @@
+"""Pre-started worker processes for sandboxed strategy execution."""
+
+import atexit
+import multiprocessing
+import os
+import queue
+import threading
+
+# Imported once per worker at start-up so jobs skip the cold import cost
+WARM_IMPORTS = ["pandas", "numpy", "backtesting", "ta", "yfinance"]
+
+
+def _limit_memory(memory_mb: int):
+    """Cap the worker's address space so runaway strategies hit MemoryError."""
+    if not memory_mb:
+        return
+    try:
+        import resource
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except Exception:
+        # Not supported on this platform (e.g. Windows, some macOS setups)
+        pass
+
+
+def _worker_main(conn, memory_mb: int):
+    """Worker loop: receive code, execute in-process, send the result back."""
+    import importlib
+    from .sandbox import Sandbox
+
+    for lib in WARM_IMPORTS:
+        try:
+            importlib.import_module(lib)
+        except ImportError:
+            pass
+    _limit_memory(memory_mb)
+    # The parent sandbox memoizes results
+    sandbox = Sandbox(backend="inprocess", results=False)
+
+    while True:
+        try:
+            code = conn.recv()
+        except (EOFError, OSError):
+            break
+        if code is None:
+            break
+        result = sandbox.run(code)
+        try:
+            conn.send(result)
+        except Exception as e:
+            # Unpicklable artifacts: keep the text result rather than failing
+            result["artifacts"] = None
+            result["output"] += f"\n[artifacts dropped: {type(e).__name__}: {e}]"
+            conn.send(result)
+
+
+class _Worker:
+    def __init__(self, ctx, memory_mb: int):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, memory_mb), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+
+    def kill(self):
+        try:
+            self.process.kill()
+            self.process.join(5)
+        except Exception:
+            pass
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+
+class WorkerPool:
+    """Fixed-size pool of warm worker processes.
+
+    Each job runs in its own worker with a per-job timeout; a worker that
+    hangs, crashes or exceeds `max_jobs` is killed and replaced, so leaking
+    or crashing strategy code never takes down the engine.
+    """
+
+    def __init__(self, size: int = None, timeout: float = None, memory_mb: int = None, max_jobs: int = None):
+        self.size = size or int(os.getenv("NLBT_WORKERS", min(4, os.cpu_count() or 1)))
+        self.timeout = timeout or float(os.getenv("DEFAULT_TIMEOUT", 60))
+        self.memory_mb = memory_mb if memory_mb is not None else int(os.getenv("NLBT_WORKER_MEMORY_MB", 2048))
+        self.max_jobs = max_jobs or int(os.getenv("NLBT_WORKER_MAX_JOBS", 50))
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle = queue.Queue()
+        for _ in range(self.size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._ctx, self.memory_mb)
+
+    def run(self, code: str, timeout: float = None) -> dict:
+        """Execute code in a free worker; same result shape as Sandbox.run."""
+        timeout = timeout or self.timeout
+        worker = self._idle.get()
+        try:
+            worker.conn.send(code)
+            if not worker.conn.poll(timeout):
+                worker.kill()
+                worker = self._spawn()
+                return self._failure(f"TimeoutError: execution exceeded {timeout:.0f}s and was killed")
+            result = worker.conn.recv()
+            worker.jobs += 1
+            if worker.jobs >= self.max_jobs:
+                worker.conn.send(None)
+                worker.kill()
+                worker = self._spawn()
+            return result
+        except (EOFError, OSError, BrokenPipeError):
+            exitcode = worker.process.exitcode
+            worker.kill()
+            worker = self._spawn()
+            return self._failure(f"WorkerCrashed: sandbox process exited (code {exitcode})")
+        finally:
+            self._idle.put(worker)
+
+    @staticmethod
+    def _failure(error: str) -> dict:
+        return {"success": False, "output": "", "error": error, "artifacts": None}
+
+    def close(self):
+        """Stop all idle workers."""
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                worker.conn.send(None)
+            except Exception:
+                pass
+            worker.kill()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> WorkerPool:
+    """Shared process-wide pool, started on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool()
+            atexit.register(_pool.close)
+        return _pool
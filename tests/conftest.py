@@ -0,0 +1,7 @@
+"""Keep test runs out of the repo's .cache (results, indicators, OHLCV, prompts)."""
+
+import os
+import tempfile
+
+_CACHE_DIR = tempfile.TemporaryDirectory(prefix="nlbt-test-cache-")
+os.environ["CACHE_DIR"] = _CACHE_DIR.name
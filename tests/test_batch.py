@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Test headless batch mode: job loading and the parallel index."""
+
+import sys
+import os
+import json
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.nlbt import reflection
+from src.nlbt.batch import load_jobs, run_batch
+
+JOB = {"ticker": "AAPL", "period": "2023", "capital": "$10000", "strategy": "buy and hold"}
+
+
+class StubEngine:
+    """Completes every job except those for ticker FAIL; no LLM or sandbox."""
+
+    def __init__(self, model=None, interactive=True, reports_dir="reports"):
+        self.reports_dir = reports_dir
+        self.requirements = {}
+        self.phase = "understanding"
+        self.run_dir = None
+        self.tldr = None
+        self.last_error = None
+
+    def _phase2_implementation(self):
+        if self.requirements["ticker"] == "FAIL":
+            self.phase = "understanding"
+            self.last_error = "NameError: boom"
+            return "❌"
+        self.phase = "complete"
+        self.run_dir = os.path.join(self.reports_dir, f"run_{self.requirements['ticker']}")
+        self.tldr = f"{self.requirements['ticker']} in {self.requirements.get('lang', 'English')}"
+        return "done"
+
+
+def write_jobs(folder, lines):
+    path = os.path.join(folder, "jobs.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return path
+
+
+def test_load_jobs_assigns_ids_and_skips_blank_lines():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_jobs(tmp, [
+            "# strategies to run",
+            json.dumps(JOB),
+            "",
+            json.dumps(dict(JOB, id="msft", ticker="MSFT")),
+        ])
+        jobs = load_jobs(path)
+    assert [j["id"] for j in jobs] == ["job0002", "msft"]
+    assert jobs[1]["ticker"] == "MSFT"
+
+
+def test_load_jobs_reports_bad_lines():
+    with tempfile.TemporaryDirectory() as tmp:
+        for line, message in [("{not json", "jobs.jsonl:2: invalid JSON"),
+                              (json.dumps(dict(JOB, capital="")), "jobs.jsonl:2: missing capital")]:
+            path = write_jobs(tmp, [json.dumps(JOB), line])
+            try:
+                load_jobs(path)
+                assert False, "bad line must be rejected"
+            except ValueError as e:
+                assert message in str(e)
+
+
+def test_run_batch_indexes_every_job_in_order():
+    real = reflection.ReflectionEngine
+    reflection.ReflectionEngine = StubEngine
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            tickers = ["AAPL", "FAIL", "MSFT", "SPY", "QQQ"]
+            path = write_jobs(tmp, [json.dumps(dict(JOB, ticker=t, lang="Hindi")) for t in tickers])
+            batch_dir = run_batch(path, workers=3, reports_dir=tmp)
+
+            with open(os.path.join(batch_dir, "index.jsonl"), encoding="utf-8") as f:
+                rows = {row["ticker"]: row for row in map(json.loads, f)}
+            with open(os.path.join(batch_dir, "index.md"), encoding="utf-8") as f:
+                index = f.read()
+    finally:
+        reflection.ReflectionEngine = real
+
+    assert set(rows) == set(tickers)
+    assert rows["FAIL"]["status"] == "failed" and rows["FAIL"]["error"] == "NameError: boom"
+    assert rows["AAPL"]["status"] == "ok" and rows["AAPL"]["tldr"] == "AAPL in Hindi"
+    assert "4/5 succeeded" in index
+    table = [line.split(" | ")[1] for line in index.splitlines() if line.startswith("| job")]
+    assert table == tickers
+    assert "| ../run_AAPL |" in index
+
+
+if __name__ == "__main__":
+    test_load_jobs_assigns_ids_and_skips_blank_lines()
+    test_load_jobs_reports_bad_lines()
+    test_run_batch_indexes_every_job_in_order()
+    print("✅ Batch tests passed")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Test the single-call Phase 1 turn and its fallback to the legacy path."""
+
+import sys
+import os
+import json
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.nlbt.reflection import ReflectionEngine
+from src.nlbt.sandbox import Sandbox
+from tests.test_sandbox_results import FrameCache, synthetic_ohlcv
+
+
+class ScriptedLLM:
+    """Returns the scripted responses in order and records the prompts."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.prompts = []
+
+    def ask(self, prompt, cache=False, temperature=None):
+        self.prompts.append(prompt)
+        return self.responses.pop(0)
+
+
+def make_engine(*responses, extracted=None):
+    engine = ReflectionEngine("test-model", interactive=False)
+    engine.sandbox = Sandbox(cache=FrameCache(synthetic_ohlcv()), results=False)
+    engine.llm = ScriptedLLM(*responses)
+    engine.fast_llm = ScriptedLLM(json.dumps(extracted or {}))
+    engine._phase2_implementation = lambda attempt=1: "PHASE 2"
+    return engine
+
+
+def turn(requirements, reply="Got it.", implementable=None, clarifications=()):
+    return json.dumps({"requirements": requirements, "reply": reply,
+                       "implementable": implementable, "clarifications": list(clarifications)})
+
+
+def test_combined_turn_updates_requirements_and_replies():
+    engine = make_engine(turn({"ticker": "AAPL", "period": "2023", "capital": None, "strategy": None},
+                              reply="Nice, AAPL for 2023. How much capital?"))
+    reply = engine.chat("AAPL in 2023")
+    assert reply == "Nice, AAPL for 2023. How much capital?"
+    assert engine.requirements == {"ticker": "AAPL", "period": "2023"}
+    assert engine.phase == "understanding"
+    assert len(engine.llm.prompts) == 1 and engine.fast_llm.prompts == []
+
+
+def test_combined_turn_proceeds_or_asks_for_clarifications():
+    complete = {"ticker": "AAPL", "period": "2023", "capital": "$10000", "strategy": "buy and hold"}
+    engine = make_engine("```json\n" + turn(complete, implementable=True) + "\n```")
+    assert engine.chat("buy and hold AAPL in 2023 with $10000") == "PHASE 2"
+    assert engine.phase == "implementation"
+    assert engine.last_validation["implementable"] is True
+
+    engine = make_engine(turn(dict(complete, strategy="trade the news"), implementable=False,
+                              clarifications=["Which news source?"]))
+    reply = engine.chat("trade AAPL on the news in 2023 with $10000")
+    assert reply.startswith("⚠️") and "- Which news source?" in reply
+    assert engine.phase == "understanding"
+
+
+def test_malformed_response_falls_back_to_legacy_path():
+    engine = make_engine("Sure! Let me think about that...", "Which ticker and period?",
+                         extracted={"strategy": "RSI below 30"})
+    reply = engine.chat("an RSI strategy")
+    assert reply == "Which ticker and period?"
+    assert len(engine.llm.prompts) == 2 and len(engine.fast_llm.prompts) == 1
+    assert engine.requirements["strategy"] == "RSI below 30"
+
+    # Valid JSON without a reply is unusable too
+    engine = make_engine(json.dumps({"requirements": {}}), "Tell me more.")
+    assert engine.chat("hello") == "Tell me more."
+
+
+def test_legacy_status_ready_proceeds():
+    ready = ("STATUS: READY\nTICKER: MSFT\nPERIOD: 2022\nCAPITAL: $5000\n"
+             "STRATEGY: buy when RSI < 30\n\nI have everything needed to proceed with the backtest.")
+    engine = make_engine("not json", ready)
+    engine._validate_requirements_with_codebase = lambda: {"implementable": True, "clarifications": []}
+    assert engine.chat("hello") == "PHASE 2"
+    assert engine.phase == "implementation"
+    assert engine.requirements == {"ticker": "MSFT", "period": "2022", "capital": "$5000",
+                                   "strategy": "buy when RSI < 30"}
+
+
+if __name__ == "__main__":
+    test_combined_turn_updates_requirements_and_replies()
+    test_combined_turn_proceeds_or_asks_for_clarifications()
+    test_malformed_response_falls_back_to_legacy_path()
+    test_legacy_status_ready_proceeds()
+    print("✅ Combined turn tests passed")
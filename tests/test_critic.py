@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Test the rule-based critic decides clear cases without an LLM."""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.nlbt.critic import PROCEED, RETRY, parse_period, review
+from src.nlbt.sandbox import Sandbox
+from tests.test_sandbox_results import FrameCache, synthetic_ohlcv, CODE
+
+# synthetic_ohlcv() spans 2023-01-02 .. 2024-02-23
+REQUIREMENTS = {"ticker": "TEST", "period": "2023-01-01 to 2024-02-23", "capital": "$10,000", "strategy": "buy and hold"}
+
+
+def run(code=CODE):
+    result = Sandbox(cache=FrameCache(synthetic_ohlcv()), results=False).run(code)
+    assert result["success"], result["error"]
+    return result
+
+
+def test_parse_period():
+    assert parse_period("2024")[0].year == 2024
+    assert str(parse_period("2020-2024")[1].date()) == "2024-12-31"
+    assert str(parse_period("2023-03-01 to 2023-09-30")[0].date()) == "2023-03-01"
+    assert parse_period("last 5 years") is None
+
+
+def test_matching_run_proceeds():
+    result = run()
+    assert result["data_requests"][0]["ticker"] == "TEST"
+    decision, _ = review(REQUIREMENTS, result)
+    assert decision == PROCEED
+
+
+def test_wrong_ticker_cash_or_period_retries():
+    decision, reasons = review(dict(REQUIREMENTS, ticker="AAPL", capital="25000"), run())
+    assert decision == RETRY
+    assert any(r.startswith("ticker") for r in reasons) and any(r.startswith("cash") for r in reasons)
+
+    short = run(CODE.replace("'2024-12-31'", "'2023-06-30'"))
+    decision, reasons = review(REQUIREMENTS, short)
+    assert decision == RETRY and reasons[0].startswith("period")
+
+
+def test_ambiguous_cases_escalate():
+    decision, _ = review(dict(REQUIREMENTS, period="last 5 years"), run())
+    assert decision is None
+    printed_only = {"success": True, "output": "Return [%]  12.3", "artifacts": None}
+    assert review(REQUIREMENTS, printed_only)[0] is None
+    assert review(REQUIREMENTS, {"success": True, "output": "", "artifacts": None})[0] == RETRY
+
+
+if __name__ == "__main__":
+    test_parse_period()
+    test_matching_run_proceeds()
+    test_wrong_ticker_cash_or_period_retries()
+    test_ambiguous_cases_escalate()
+    print("✅ Rule-based critic tests passed")
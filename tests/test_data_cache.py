@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Test the on-disk OHLCV cache serves overlapping ranges from disk."""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from src.nlbt.data import OHLCVCache
+
+
+def _fake_yahoo(calls):
+    """Build a fetcher that mimics yf.download (tz-aware, MultiIndex columns)."""
+    def fetch(ticker, start, end):
+        calls.append((start.isoformat(), end.isoformat()))
+        idx = pd.bdate_range(start, end, inclusive="left", tz="America/New_York")
+        cols = pd.MultiIndex.from_product([["Open", "High", "Low", "Close", "Volume"], [ticker]])
+        values = [[float(i)] * 5 for i in range(len(idx))]
+        return pd.DataFrame(values, index=idx, columns=cols)
+    return fetch
+
+
+def test_overlapping_ranges_fetch_only_missing_edges():
+    """Second and third requests should only download the uncovered segments."""
+    calls = []
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = OHLCVCache(tmp, fetch=_fake_yahoo(calls))
+
+        first = cache.get("AAPL", "2023-01-01", "2023-07-01")
+        assert list(first.columns) == ["Open", "High", "Low", "Close", "Volume"]
+        assert first.index.tz is None
+        assert calls == [("2023-01-01", "2023-07-01")]
+
+        # Fully covered: served from disk
+        cache.get("AAPL", "2023-02-01", "2023-03-01")
+        assert len(calls) == 1
+
+        # Extends both edges: two small downloads
+        wide = cache.get("AAPL", "2022-12-01", "2023-08-01")
+        assert calls[1:] == [("2022-12-01", "2023-01-01"), ("2023-07-01", "2023-08-01")]
+        assert wide.index.is_monotonic_increasing
+        assert wide.index[0] >= pd.Timestamp("2022-12-01")
+        assert wide.index[-1] < pd.Timestamp("2023-08-01")
+
+
+def test_empty_download_is_not_cached_as_covered():
+    """A segment that came back empty is fetched again on the next request."""
+    calls = []
+    real = _fake_yahoo(calls)
+    outage = {"left": 1}
+
+    def flaky(ticker, start, end):
+        if outage["left"] and start.isoformat() == "2023-07-01":
+            outage["left"] -= 1
+            calls.append((start.isoformat(), end.isoformat()))
+            return pd.DataFrame()
+        return real(ticker, start, end)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = OHLCVCache(tmp, fetch=flaky)
+        cache.get("AAPL", "2023-01-01", "2023-07-01")
+
+        # The extension comes back empty: nothing new, span unchanged
+        missing = cache.get("AAPL", "2023-01-01", "2023-08-01")
+        assert missing.index[-1] < pd.Timestamp("2023-07-01")
+        assert calls[1:] == [("2023-07-01", "2023-08-01")]
+
+        # Asking again retries the segment and gets the real bars
+        retried = cache.get("AAPL", "2023-01-01", "2023-08-01")
+        assert calls[2:] == [("2023-07-01", "2023-08-01")]
+        assert retried.index[-1] >= pd.Timestamp("2023-07-03")
+        cache.get("AAPL", "2023-06-01", "2023-08-01")
+        assert len(calls) == 3
+
+        # A ticker with no data at all is never marked as covered either
+        try:
+            OHLCVCache(tmp, fetch=lambda *args: pd.DataFrame()).get("NONE", "2023-01-01", "2023-02-01")
+        except ValueError:
+            pass
+        assert cache._load("NONE") == (None, None)
+
+
+def test_empty_edges_next_to_cached_bars_are_covered():
+    """Weekends after the last bar and days before a listing are fetched once."""
+    calls = []
+    real = _fake_yahoo([])
+
+    def listed_in_march(ticker, start, end):
+        calls.append((start.isoformat(), end.isoformat()))
+        return real(ticker, max(start, pd.Timestamp("2023-03-01").date()), end)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = OHLCVCache(tmp, fetch=listed_in_march)
+        cache.get("NEW", "2023-03-01", "2023-03-04")  # Wed → Sat
+        cache.get("NEW", "2023-03-01", "2023-03-06")  # Saturday and Sunday only
+        cache.get("NEW", "2023-03-01", "2023-03-06")
+        assert calls[1:] == [("2023-03-04", "2023-03-06")]
+
+        # A long pre-listing lookback comes back empty and is not asked again
+        early = cache.get("NEW", "2022-01-01", "2023-03-06")
+        cache.get("NEW", "2022-06-01", "2023-03-06")
+        assert calls[2:] == [("2022-01-01", "2023-03-01")]
+        assert early.index[0] == pd.Timestamp("2023-03-01")
+
+        # Rows and span live in one file; a fresh instance sees both
+        assert os.listdir(os.path.join(tmp, "ohlcv")) == ["NEW.parquet"]
+        assert OHLCVCache(tmp)._load("NEW")[1] == (pd.Timestamp("2022-01-01").date(), pd.Timestamp("2023-03-06").date())
+
+
+def test_raised_fetch_is_retried():
+    calls = []
+    real = _fake_yahoo(calls)
+    outage = {"left": 1}
+
+    def flaky(ticker, start, end):
+        if start.isoformat() == "2023-07-01" and outage["left"]:
+            outage["left"] -= 1
+            raise ConnectionError("rate limited")
+        return real(ticker, start, end)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = OHLCVCache(tmp, fetch=flaky)
+        cache.get("AAPL", "2023-01-01", "2023-07-01")
+        try:
+            cache.get("AAPL", "2022-12-01", "2023-08-01")
+            assert False, "a failed download must not pass silently"
+        except ConnectionError:
+            pass
+        # The left edge that did download is kept; only the failed one is retried
+        wide = cache.get("AAPL", "2022-12-01", "2023-08-01")
+        assert calls[1:] == [("2022-12-01", "2023-01-01"), ("2023-07-01", "2023-08-01")]
+        assert wide.index[-1] >= pd.Timestamp("2023-07-31")
+
+
+def test_offline_serves_seeded_cache():
+    """A pre-seeded cache works without any network access."""
+    with tempfile.TemporaryDirectory() as tmp:
+        seeded = _fake_yahoo([])("SPY", pd.Timestamp("2024-01-01"), pd.Timestamp("2024-03-01"))
+        OHLCVCache(tmp).seed("SPY", seeded, "2024-01-01", "2024-03-01")
+
+        def no_network(*args):
+            raise AssertionError("offline cache must not fetch")
+
+        data = OHLCVCache(tmp, fetch=no_network, offline=True).get("SPY", "2024-01-15", "2024-02-01")
+        assert len(data) > 0
+        assert data.index[0] >= pd.Timestamp("2024-01-15")
+
+
+if __name__ == "__main__":
+    test_overlapping_ranges_fetch_only_missing_edges()
+    test_empty_download_is_not_cached_as_covered()
+    test_empty_edges_next_to_cached_bars_are_covered()
+    test_raised_fetch_is_retried()
+    test_offline_serves_seeded_cache()
+    print("✅ OHLCV cache tests passed")
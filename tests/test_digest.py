@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Test the results digest stays within its prompt budget."""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from src.nlbt.digest import build_digest, CHARS_PER_TOKEN
+
+
+def test_long_backtest_digest_is_bounded():
+    """A 10-year daily equity curve collapses to a small, informative block."""
+    idx = pd.bdate_range("2014-01-01", periods=2600)
+    equity = pd.DataFrame({"Equity": 10000 * np.exp(np.cumsum(np.sin(np.arange(2600) / 40) * 0.01))}, index=idx)
+    trades = pd.DataFrame({
+        "EntryTime": idx[:200:2], "ExitTime": idx[1:200:2],
+        "Size": 10, "PnL": np.linspace(-50, 80, 100), "ReturnPct": np.linspace(-0.05, 0.08, 100),
+    })
+    stats = pd.Series({"Return [%]": 12.5, "Sharpe Ratio": 0.9, "# Trades": 100})
+    artifacts = {"stats": stats, "equity": equity, "trades": trades}
+
+    digest = build_digest(artifacts, token_budget=1000)
+    assert len(digest) <= 1000 * CHARS_PER_TOKEN
+    assert "Return [%]: 12.5" in digest
+    assert "EQUITY" in digest and "DRAWDOWN EPISODES" in digest
+    assert len(equity.to_csv()) > 10 * len(digest)
+
+    # A tight budget keeps the highest-priority section only
+    tight = build_digest(artifacts, token_budget=40)
+    assert tight.startswith("STATS:") and "EQUITY" not in tight
+
+
+def test_legacy_output_strips_csv_dumps():
+    """Raw stdout falls back to text before the CSV markers."""
+    output = "Return [%]  10.0\nTRADES_CSV\n" + "1,2,3\n" * 5000 + "EQUITY_CSV\n" + "1,2\n" * 5000
+    digest = build_digest(None, output)
+    assert digest == "Return [%]  10.0"
+
+
+def test_numbers_are_fixed_point():
+    """Five-figure equity and small ratios never come out in scientific notation."""
+    stats = pd.Series({"Equity Final [$]": 104567.8, "Sharpe Ratio": 0.04321, "Return [%]": 4.5678})
+    digest = build_digest({"stats": stats})
+    assert "Equity Final [$]: 104,567.80" in digest
+    assert "Sharpe Ratio: 0.0432" in digest
+    assert "Return [%]: 4.57" in digest
+    assert "e+" not in digest and "e-" not in digest
+
+
+if __name__ == "__main__":
+    test_long_backtest_digest_is_bounded()
+    test_legacy_output_strips_csv_dumps()
+    test_numbers_are_fixed_point()
+    print("✅ Digest tests passed")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Test the cached indicator library and its use from generated strategies."""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from src.nlbt import indicators as ind
+from src.nlbt.sandbox import Sandbox
+from tests.test_sandbox_results import FrameCache, synthetic_ohlcv
+
+
+def _close():
+    return synthetic_ohlcv()["Close"].to_numpy()
+
+
+def test_matches_pandas_formulas():
+    close = _close()
+    s = pd.Series(close)
+    np.testing.assert_allclose(ind.sma(close, 20), s.rolling(20).mean(), equal_nan=True)
+    delta = s.diff()
+    gain = delta.where(delta > 0, 0).rolling(14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+    np.testing.assert_allclose(ind.rsi(close, 14), 100 - 100 / (1 + gain / loss), equal_nan=True)
+    line = s.ewm(span=12, adjust=False).mean() - s.ewm(span=26, adjust=False).mean()
+    np.testing.assert_allclose(ind.macd(close), line)
+    np.testing.assert_allclose(ind.macd_signal(close), line.ewm(span=9, adjust=False).mean())
+    upper, mid, lower = ind.bbands(close, 20, 2.0)
+    np.testing.assert_allclose(mid, s.rolling(20).mean(), equal_nan=True)
+    assert ind.stoch(close + 1, close - 1, close).shape == (2, len(close))
+
+
+def test_memory_and_disk_cache():
+    close = _close()
+    with tempfile.TemporaryDirectory() as tmp:
+        old = os.environ.get("CACHE_DIR")
+        os.environ["CACHE_DIR"] = tmp
+        try:
+            ind._memory.clear()
+            before = dict(ind.stats)
+            first = ind.ema(close, 33)
+            assert ind.stats["misses"] == before["misses"] + 1
+            first[:] = 0  # callers get copies; the cache stays intact
+            second = ind.ema(close, 33)
+            assert ind.stats["hits"] == before["hits"] + 1
+            assert not np.allclose(second, 0)
+            assert os.listdir(os.path.join(tmp, "indicators"))
+
+            ind._memory.clear()
+            third = ind.ema(close, 33)
+            assert ind.stats["disk_hits"] == before["disk_hits"] + 1
+            np.testing.assert_array_equal(second, third)
+
+            # Different params or data are different entries
+            ind.ema(close, 34)
+            ind.ema(close * 2, 33)
+            assert ind.stats["misses"] == before["misses"] + 3
+        finally:
+            if old is None:
+                os.environ.pop("CACHE_DIR", None)
+            else:
+                os.environ["CACHE_DIR"] = old
+
+
+def test_disk_cache_is_versioned_and_bounded():
+    close = _close()
+    with tempfile.TemporaryDirectory() as tmp:
+        saved = {k: os.environ.get(k) for k in ("CACHE_DIR", "NLBT_INDICATOR_CACHE_MAX_ENTRIES")}
+        os.environ.update(CACHE_DIR=tmp, NLBT_INDICATOR_CACHE_MAX_ENTRIES="3")
+        every, version = ind.PRUNE_EVERY, ind._source_hash
+        ind.PRUNE_EVERY = 1
+        try:
+            ind._memory.clear()
+            key = ind._key("sma", [close], ((5,), []))
+            # Editing indicators.py changes every key
+            ind._source_hash = b"edited"
+            assert ind._key("sma", [close], ((5,), [])) != key
+            ind._source_hash = version
+
+            for n in range(5, 10):
+                ind.sma(close, n)
+            files = os.listdir(os.path.join(tmp, "indicators"))
+            assert len(files) == 3
+            # The newest settings survive
+            assert f"{ind._key('sma', [close], ((9,), []))}.npy" in files
+        finally:
+            ind.PRUNE_EVERY, ind._source_hash = every, version
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+
+def test_available_in_sandbox():
+    code = """
+from backtesting import Backtest, Strategy
+
+data = get_ohlcv_data('TEST', '2023-01-01', '2024-12-31')
+
+class MyStrategy(Strategy):
+    def init(self):
+        self.rsi = self.I(ind.rsi, self.data.Close, 14)
+        self.upper, self.mid, self.lower = self.I(ind.bbands, self.data.Close, 20, 2.0)
+
+    def next(self):
+        if self.rsi[-1] < 40 and not self.position:
+            self.buy()
+        elif self.rsi[-1] > 60 and self.position:
+            self.position.close()
+
+bt = Backtest(data, MyStrategy, cash=10000)
+stats = bt.run()
+emit_result(stats)
+"""
+    result = Sandbox(cache=FrameCache(synthetic_ohlcv()), results=False).run(code)
+    assert result["success"], result["error"]
+    assert "Return [%]" in result["artifacts"]["stats"].index
+
+
+if __name__ == "__main__":
+    test_matches_pandas_formulas()
+    test_memory_and_disk_cache()
+    test_disk_cache_is_versioned_and_bounded()
+    test_available_in_sandbox()
+    print("✅ Indicator library tests passed")
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Test the in-process llm transport and backend selection with a fake `llm` module."""
+
+import sys
+import os
+import time
+import types
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.nlbt import llm as nlbt_llm
+from src.nlbt.llm import PythonTransport, SubprocessTransport, get_transport
+
+
+class UnknownModelError(KeyError):
+    pass
+
+
+class FakeResponse:
+    def __init__(self, text, delay=0.0):
+        self._text = text
+        self.delay = delay
+
+    def text(self):
+        time.sleep(self.delay)
+        return self._text
+
+    def __iter__(self):
+        for word in self._text.split():
+            yield word
+            time.sleep(self.delay)
+
+
+class FakeModel:
+    def __init__(self, name):
+        self.name = name
+        self.options = []
+
+    def prompt(self, prompt, **options):
+        self.options.append(options)
+        if prompt == "explode":
+            raise ConnectionError("provider down")
+        return FakeResponse(f"  {self.name} says {prompt}  ", delay=2.0 if prompt == "hang" else 0.0)
+
+
+def fake_llm_module():
+    module = types.ModuleType("llm")
+    module.UnknownModelError = UnknownModelError
+    module.loaded = []
+
+    def get_model(name):
+        if name == "missing":
+            raise UnknownModelError(f"Unknown model: {name}")
+        module.loaded.append(name)
+        return FakeModel(name)
+
+    module.get_model = get_model
+    module.get_default_model = lambda: "fake-default"
+    return module
+
+
+class fake_llm:
+    """Install `module` as `llm` (None makes it unimportable) with fresh transports."""
+
+    def __init__(self, module):
+        self.module = module
+
+    def __enter__(self):
+        self.saved_module = sys.modules.get("llm")
+        self.saved_transports = dict(nlbt_llm._TRANSPORTS)
+        self.saved_backend = os.environ.pop("LLM_BACKEND", None)
+        sys.modules["llm"] = self.module
+        nlbt_llm._TRANSPORTS.clear()
+        return self.module
+
+    def __exit__(self, *exc):
+        if self.saved_module is None:
+            sys.modules.pop("llm", None)
+        else:
+            sys.modules["llm"] = self.saved_module
+        nlbt_llm._TRANSPORTS.clear()
+        nlbt_llm._TRANSPORTS.update(self.saved_transports)
+        if self.saved_backend is not None:
+            os.environ["LLM_BACKEND"] = self.saved_backend
+
+
+def test_auto_selects_python_when_llm_is_importable():
+    with fake_llm(fake_llm_module()):
+        transport = get_transport()
+        assert isinstance(transport, PythonTransport)
+        assert get_transport("auto") is transport and get_transport("python") is transport
+        assert transport.default_model() == "fake-default"
+        assert isinstance(get_transport("cli"), SubprocessTransport)
+    with fake_llm(None):
+        assert isinstance(get_transport(), SubprocessTransport)
+        try:
+            get_transport("carrier-pigeon")
+            assert False, "unknown backends must be rejected"
+        except ValueError:
+            pass
+
+
+def test_python_transport_reuses_models_and_passes_options():
+    with fake_llm(fake_llm_module()) as module:
+        transport = PythonTransport()
+        assert transport.ask("m1", "hi") == "m1 says hi"
+        assert transport.ask("m1", "again", options={"temperature": 0.5}) == "m1 says again"
+        assert list(transport.stream("m1", "one two")) == ["m1", "says", "one", "two"]
+        assert module.loaded == ["m1"]
+        assert transport._models["m1"].options == [{}, {"temperature": 0.5}, {}]
+
+
+def test_python_transport_wraps_errors():
+    with fake_llm(fake_llm_module()):
+        transport = PythonTransport()
+        for call in (lambda: transport.ask("missing", "hi"),
+                     lambda: list(transport.stream("missing", "hi"))):
+            try:
+                call()
+                assert False, "unknown model must raise"
+            except RuntimeError as e:
+                assert str(e).startswith("LLM failed:") and "Unknown model: missing" in str(e)
+        for call in (lambda: transport.ask("m1", "explode"),
+                     lambda: list(transport.stream("m1", "explode"))):
+            try:
+                call()
+                assert False, "provider errors must raise"
+            except RuntimeError as e:
+                assert str(e) == "LLM failed: provider down"
+
+
+def test_python_transport_enforces_timeout():
+    with fake_llm(fake_llm_module()):
+        transport = PythonTransport()
+        started = time.monotonic()
+        try:
+            transport.ask("m1", "hang", timeout=0.2)
+            assert False, "a hung provider must time out"
+        except RuntimeError as e:
+            assert str(e) == "LLM failed: no response within 0.2s"
+        chunks = []
+        try:
+            for chunk in transport.stream("m1", "hang", timeout=0.2):
+                chunks.append(chunk)
+            assert False, "a stalled stream must time out"
+        except RuntimeError as e:
+            assert "no response within 0.2s" in str(e)
+        assert chunks == ["m1"]
+        assert time.monotonic() - started < 1.5
+
+
+if __name__ == "__main__":
+    test_auto_selects_python_when_llm_is_importable()
+    test_python_transport_reuses_models_and_passes_options()
+    test_python_transport_wraps_errors()
+    test_python_transport_enforces_timeout()
+    print("✅ LLM transport tests passed")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Test LLM clients are shared per role with per-role concurrency limits."""
+
+import sys
+import os
+import tempfile
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dotenv
+
+from src.nlbt import llm
+from src.nlbt.llm import ModelRegistry
+from src.nlbt.reflection import ReflectionEngine
+
+
+class SlowTransport:
+    """Counts how many requests are in flight at once."""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def ask(self, model, prompt, timeout=120, options=None):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        return f"{model}: ok"
+
+
+def test_engines_share_role_clients():
+    registry = ModelRegistry(models={"chat": "chat-model", "fast": "fast-model"})
+    first = ReflectionEngine(interactive=False, models=registry)
+    second = ReflectionEngine(interactive=False, models=registry)
+    assert first.fast_llm is second.fast_llm and first.fast_llm.model == "fast-model"
+    assert first.llm is second.llm and first.llm.model == "chat-model"
+    assert first.code_llm is registry.get("code")
+    assert ReflectionEngine("other-chat", interactive=False, models=registry).llm.model == "other-chat"
+
+
+def test_role_concurrency_limit_is_enforced():
+    registry = ModelRegistry(models={"fast": "fast-model"}, limits={"fast": 2})
+    client = registry.get("fast")
+    client._transport = SlowTransport()
+    threads = [threading.Thread(target=client.ask, args=("hi",)) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert client._transport.peak == 2
+
+
+def test_concurrency_limit_from_dotenv():
+    """LLM_<ROLE>_CONCURRENCY set only in .env applies to a fresh registry."""
+    real_load = dotenv.load_dotenv
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, ".env")
+        with open(path, "w") as f:
+            f.write("LLM_FAST_CONCURRENCY=3\n")
+        os.environ.pop("LLM_FAST_CONCURRENCY", None)
+        dotenv.load_dotenv = lambda *args, **kwargs: real_load(path)
+        llm._env_loaded = False
+        try:
+            registry = ModelRegistry()
+        finally:
+            dotenv.load_dotenv = real_load
+            os.environ.pop("LLM_FAST_CONCURRENCY", None)
+    assert registry.semaphores["fast"]._value == 3
+
+
+if __name__ == "__main__":
+    test_engines_share_role_clients()
+    test_role_concurrency_limit_is_enforced()
+    test_concurrency_limit_from_dotenv()
+    print("✅ Model registry tests passed")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Test the Phase 2 state machine: transitions, attempt records, checkpoints."""
+
+import sys
+import os
+import json
+import asyncio
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.nlbt.pipeline import Phase2Pipeline
+from src.nlbt.reflection import ReflectionEngine
+from src.nlbt.sandbox import Sandbox
+from tests.test_sandbox_results import FrameCache, synthetic_ohlcv, CODE
+
+BROKEN = "print('no backtest here')"
+
+
+class ScriptedLLM:
+    """Stands in for the code model: answers with the next scripted response."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def ask(self, prompt, cache=False, temperature=None):
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+def make_engine(*responses):
+    engine = ReflectionEngine("test-model", interactive=False)
+    engine.sandbox = Sandbox(cache=FrameCache(synthetic_ohlcv()), results=False)
+    engine.requirements = {"ticker": "TEST", "period": "2023", "capital": "10000", "strategy": "buy"}
+    engine.code_llm = ScriptedLLM(responses)
+    engine._critic_decision = lambda result: "DECISION: PROCEED"
+    engine._phase3_reporting = lambda: "📄 REPORT FOLDER: reports/test"
+    return engine
+
+
+def test_fix_then_accept():
+    engine = make_engine(BROKEN, CODE)
+    message = engine._phase2_implementation()
+    assert message.endswith("📄 REPORT FOLDER: reports/test")
+    pipeline = engine.pipeline
+    assert pipeline.state == "done"
+    assert [a["outcome"] for a in pipeline.attempts] == ["error", "accepted"]
+    assert [t["state"] for t in pipeline.timings] == ["generate", "execute", "fix", "execute", "critique", "report"]
+
+
+def test_timings_are_written_to_the_run_log():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(BROKEN, CODE)
+        engine.reports_dir = tmp
+        del engine._phase3_reporting
+        engine._write_report = lambda run_dir, trades, equity: f"📄 REPORT FOLDER: {run_dir}"
+        engine._phase2_implementation()
+        with open(os.path.join(engine.run_dir, "events.jsonl"), encoding="utf-8") as f:
+            events = [json.loads(line) for line in f]
+    states = [e for e in events if e["event"] == "pipeline_state"]
+    assert [(e["state"], e["attempt"]) for e in states] == [
+        ("generate", 1), ("execute", 1), ("fix", 2), ("execute", 2), ("critique", 2)]
+    assert all(e["seconds"] >= 0 for e in states)
+    assert events[0]["event"] == "report_started"
+
+
+def test_gives_up_after_max_attempts_without_recursing():
+    engine = make_engine(BROKEN, BROKEN, BROKEN)
+    message = engine._phase2_implementation()
+    assert "Failed after 3 attempts" in message
+    assert engine.phase == "understanding"
+    # One generation plus two fixes; the third failure doesn't ask for another fix
+    assert engine.code_llm.calls == 3
+    assert len(engine.pipeline.attempts) == 3
+
+
+def test_checkpoint_and_resume():
+    engine = make_engine(BROKEN, CODE)
+    pipeline = Phase2Pipeline(engine)
+    while pipeline.state != "fix":
+        pipeline.step()
+    saved = json.loads(json.dumps(pipeline.checkpoint()))
+
+    fresh = make_engine(CODE)
+    resumed = Phase2Pipeline.restore(fresh, saved)
+    assert resumed.state == "fix" and fresh.code == BROKEN
+    assert "REPORT FOLDER" in resumed.run()
+    assert [a["outcome"] for a in resumed.attempts] == ["error", "accepted"]
+    assert fresh.code_llm.calls == 1
+
+
+def test_pipelines_share_one_event_loop():
+    engines = [make_engine(CODE), make_engine(CODE)]
+
+    async def main():
+        return await asyncio.gather(*(Phase2Pipeline(e).run_async() for e in engines))
+
+    messages = asyncio.run(main())
+    assert all(m and "REPORT FOLDER" in m for m in messages)
+
+
+if __name__ == "__main__":
+    test_fix_then_accept()
+    test_timings_are_written_to_the_run_log()
+    test_gives_up_after_max_attempts_without_recursing()
+    test_checkpoint_and_resume()
+    test_pipelines_share_one_event_loop()
+    print("✅ Pipeline tests passed")
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Test static pre-validation fixes or reports common generated-code mistakes."""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.nlbt.precheck import parse_cash, precheck
+from src.nlbt.sandbox import Sandbox
+from tests.test_sandbox_results import FrameCache, synthetic_ohlcv
+
+BROKEN = """
+from backtesting import Backtest, Strategy
+import yfinance as yf
+
+def get_ohlcv_data(ticker, start, end):
+    return yf.download(ticker, start, end)
+
+data = get_ohlcv_data('TEST', '2023-01-01', '2024-12-31')
+
+def rsi(values, n=14):
+    import pandas as pd
+    delta = pd.Series(values).diff()
+    gain = delta.where(delta > 0, 0).rolling(n).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(n).mean()
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+def sma(values, n):
+    import pandas as pd
+    return pd.Series(values).rolling(n).mean().to_numpy()
+
+class MyStrategy(Strategy):
+    def init(self):
+        self.rsi = self.I(rsi, self.data.Close, 14)
+        self.sma = self.I(sma, self.data.Close, 20)
+
+    def next(self):
+        if self.rsi[-1] < 30 and not self.position:
+            self.buy()
+        elif self.rsi[-1] > 70 and self.position:
+            self.position.close()
+
+bt = Backtest(data, MyStrategy, cash='₹10,00,000')  # capital
+stats = bt.run()
+emit_result(stats)
+"""
+
+
+def test_parse_cash():
+    assert parse_cash("$10,000") == 10000
+    assert parse_cash("₹10,00,000") == 1000000
+    assert parse_cash("50k") == 50000
+    assert parse_cash("lots") is None
+
+
+def test_autofixes_make_broken_code_runnable():
+    code, fixes, errors = precheck(BROKEN)
+    assert errors == []
+    assert len(fixes) == 3
+    assert "def get_ohlcv_data" not in code
+    assert "cash=1000000)  # capital" in code
+    assert "return (100 - (100 / (1 + rs))).to_numpy()" in code
+    assert code.count(".to_numpy()") == 2  # sma was already fine
+
+    result = Sandbox(cache=FrameCache(synthetic_ohlcv()), results=False).run(code)
+    assert result["success"], result["error"]
+    assert precheck(code) == (code, [], [])
+
+
+def test_unfixable_problems_are_reported():
+    _, _, errors = precheck("data = get_ohlcv_data('X', '2023-01-01', '2024-01-01')\nprint(data)")
+    assert any("no Backtest(...) call" in e for e in errors)
+    _, _, errors = precheck("x = (")
+    assert errors[0].startswith("line 1: SyntaxError")
+    _, _, errors = precheck("bt = Backtest(data, S, cash='a lot')\nbt.run()")
+    assert errors == ["line 1: cash must be a number, got 'a lot'"]
+
+
+
+HELPERS = """
+from backtesting import Backtest, Strategy
+
+data = get_ohlcv_data('TEST', '2023-01-01', '2024-12-31')
+
+def bands(values, n=20):
+    import pandas as pd
+    s = pd.Series(values)
+    m = s.rolling(n).mean()
+    sd = s.rolling(n).std()
+    return m + 2*sd, m - 2*sd
+
+def band_list(values, n=20):
+    import pandas as pd
+    return [pd.Series(values).rolling(n).max(), pd.Series(values).rolling(n).min()]
+
+def closes(values):
+    import pandas as pd
+    s = pd.Series(values).shift(0)
+    return list(s)
+
+class MyStrategy(Strategy):
+    def init(self):
+        self.upper, self.lower = self.I(bands, self.data.Close)
+        self.high, self.low = self.I(band_list, self.data.Close)
+        self.close = self.I(closes, self.data.Close)
+
+    def next(self):
+        if self.data.Close[-1] < self.lower[-1] and not self.position:
+            self.buy()
+
+bt = Backtest(data, MyStrategy, cash=10000)
+stats = bt.run()
+emit_result(stats)
+"""
+
+
+def test_tuple_and_list_returns_are_left_alone():
+    code, fixes, errors = precheck(HELPERS)
+    assert errors == [] and fixes == []
+    assert code == HELPERS
+    result = Sandbox(cache=FrameCache(synthetic_ohlcv()), results=False).run(code)
+    assert result["success"], result["error"]
+
+
+CONVERTED = """
+from backtesting import Backtest, Strategy
+import numpy as np
+import pandas as pd
+
+data = get_ohlcv_data('TEST', '2023-01-01', '2024-12-31')
+
+def half_sma(values, n=10):
+    return pd.Series(values).rolling(n).mean().to_numpy() / 2
+
+def momentum(values, n=5):
+    return 100 * pd.Series(values).pct_change(n).to_numpy()
+
+def reversed_diff(values):
+    s = pd.Series(values)
+    x = s.diff().to_numpy()
+    return x[::-1]
+
+def spread(values, n=10):
+    s = pd.Series(values)
+    return np.where(s.diff() > 0, s.rolling(n).max(), s.rolling(n).min())
+
+def scaled(values, n=10):
+    s = pd.Series(values)
+    return s.rolling(n).mean() / 2
+
+class MyStrategy(Strategy):
+    def init(self):
+        self.a = self.I(half_sma, self.data.Close)
+        self.b = self.I(momentum, self.data.Close)
+        self.c = self.I(reversed_diff, self.data.Close)
+        self.d = self.I(spread, self.data.Close)
+        self.e = self.I(scaled, self.data.Close)
+
+    def next(self):
+        if not self.position:
+            self.buy()
+
+bt = Backtest(data, MyStrategy, cash=10000)
+stats = bt.run()
+emit_result(stats)
+"""
+
+
+def test_converted_returns_are_not_wrapped_again():
+    code, fixes, errors = precheck(CONVERTED)
+    assert errors == []
+    # Only the one helper still returning a Series gets fixed
+    assert fixes == ["line 25: indicator 'scaled' now returns .to_numpy()"]
+    assert "return (s.rolling(n).mean() / 2).to_numpy()" in code
+    assert "return pd.Series(values).rolling(n).mean().to_numpy() / 2\n" in code
+    result = Sandbox(cache=FrameCache(synthetic_ohlcv()), results=False).run(code)
+    assert result["success"], result["error"]
+
+
+if __name__ == "__main__":
+    test_parse_cash()
+    test_autofixes_make_broken_code_runnable()
+    test_unfixable_problems_are_reported()
+    test_tuple_and_list_returns_are_left_alone()
+    test_converted_returns_are_not_wrapped_again()
+    print("✅ Precheck tests passed")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Test the background OHLCV prefetch started from Phase 1."""
+
+import sys
+import os
+import tempfile
+import threading
+from datetime import date
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.nlbt.data import OHLCVCache
+from src.nlbt.prefetch import LOOKBACK_DAYS, prefetch, prefetch_window
+from src.nlbt.reflection import ReflectionEngine
+from src.nlbt.sandbox import Sandbox
+from tests.test_data_cache import _fake_yahoo
+
+
+def test_window_includes_warmup():
+    start, end = prefetch_window("2023")
+    assert end == date(2024, 1, 1)
+    assert (date(2023, 1, 1) - start).days == LOOKBACK_DAYS
+    start, end = prefetch_window("last 2 years")
+    assert end == date.today() and (end - start).days == 2 * 365 + LOOKBACK_DAYS
+    assert prefetch_window("since the crash") is None
+
+
+def test_sandbox_request_waits_for_prefetch():
+    calls = []
+    started, release = threading.Event(), threading.Event()
+    fake = _fake_yahoo(calls)
+
+    def slow_fetch(ticker, start, end):
+        started.set()
+        release.wait(5)
+        return fake(ticker, start, end)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = OHLCVCache(tmp, fetch=slow_fetch)
+        future = prefetch(cache, "aapl", "2023")
+        assert started.wait(5)
+        got = {}
+        reader = threading.Thread(target=lambda: got.update(data=cache.get("AAPL", "2022-06-01", "2023-12-31")))
+        reader.start()
+        release.set()
+        future.result(timeout=5)
+        reader.join(5)
+        # One download; the generated code's request is served from it
+        assert len(calls) == 1
+        assert len(got["data"]) > 300
+        assert prefetch(cache, "not a ticker", "2023") is None
+
+
+def test_engine_prefetches_once_requirements_are_known():
+    calls = []
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = ReflectionEngine("test-model", interactive=False)
+        engine.sandbox = Sandbox(cache=OHLCVCache(tmp, fetch=_fake_yahoo(calls)), results=False)
+
+        turn = {"requirements": {"ticker": "MSFT"}, "reply": "Which period?"}
+        assert engine._apply_combined_turn(turn, False) == "Which period?"
+        assert engine.prefetched is None
+
+        turn = {"requirements": {"ticker": "MSFT", "period": "2022-2023"}, "reply": "And capital?"}
+        engine._apply_combined_turn(turn, False)
+        key, future = engine.prefetched
+        assert key == ("MSFT", "2022-2023")
+        future.result(timeout=5)
+        assert len(calls) == 1
+
+        # Same ticker and period: nothing new is scheduled
+        engine._apply_combined_turn(turn, False)
+        assert engine.prefetched[1] is future
+
+        engine._await_prefetch()
+        engine.sandbox.cache.get("MSFT", "2021-06-01", "2023-12-31")
+        assert len(calls) == 1
+
+
+if __name__ == "__main__":
+    test_window_includes_warmup()
+    test_sandbox_request_waits_for_prefetch()
+    test_engine_prefetches_once_requirements_are_known()
+    print("✅ Prefetch tests passed")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Test the SQLite prompt cache (hits, TTL expiry, LRU eviction)."""
+
+import sys
+import os
+import sqlite3
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.nlbt.prompt_cache import PromptCache
+
+
+def test_hit_miss_and_eviction():
+    """Repeated prompts hit; the least recently used entry is evicted first."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PromptCache(os.path.join(tmp, "llm.sqlite"), ttl=3600, max_entries=2)
+
+        assert cache.get("gpt-4o-mini", "trades heading") is None
+        cache.put("gpt-4o-mini", "trades heading", "Trades")
+        assert cache.get("gpt-4o-mini", "trades heading") == "Trades"
+        # Same prompt on another model is a different key
+        assert cache.get("other-model", "trades heading") is None
+
+        cache.put("gpt-4o-mini", "equity heading", "Equity Curve")
+        time.sleep(0.01)
+        cache.get("gpt-4o-mini", "trades heading")  # refresh LRU position
+        cache.put("gpt-4o-mini", "title", "AAPL 2024 Buy and Hold")
+
+        assert cache.get("gpt-4o-mini", "equity heading") is None
+        assert cache.get("gpt-4o-mini", "trades heading") == "Trades"
+        stats = cache.stats()
+        assert stats["entries"] == 2
+        assert stats["hits"] == 3 and stats["misses"] == 3
+
+
+def test_ttl_expiry():
+    """Entries older than the TTL are treated as misses."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PromptCache(os.path.join(tmp, "llm.sqlite"), ttl=0.05, max_entries=10)
+        cache.put("m", "p", "r")
+        time.sleep(0.1)
+        assert cache.get("m", "p") is None
+
+
+class FailingConnection:
+    """Connection whose statements fail; remembers whether it was closed."""
+
+    def __init__(self):
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, *args):
+        raise sqlite3.OperationalError("database is locked")
+
+    def close(self):
+        self.closed = True
+
+
+def test_connections_close_on_errors():
+    """A failing statement is swallowed and never leaks the connection."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PromptCache(os.path.join(tmp, "llm.sqlite"))
+        opened = []
+        cache._connect = lambda: opened.append(FailingConnection()) or opened[-1]
+        cache.put("m", "p", "r")
+        assert cache.get("m", "p") is None
+        assert cache.stats()["entries"] == 0
+        assert len(opened) == 3 and all(conn.closed for conn in opened)
+
+
+if __name__ == "__main__":
+    test_hit_miss_and_eviction()
+    test_ttl_expiry()
+    test_connections_close_on_errors()
+    print("✅ Prompt cache tests passed")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Test Phase 3 generates the independent report sections concurrently."""
+
+import sys
+import os
+import tempfile
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from src.nlbt.reflection import ReflectionEngine
+
+
+class RoutingLLM:
+    """Answers by prompt type; calls listed in `meet` wait for each other."""
+
+    def __init__(self, answers, meet=(), barrier=None):
+        self.answers = answers
+        self.meet = meet
+        self.barrier = barrier
+
+    def ask(self, prompt, cache=False, temperature=None):
+        for marker, answer in self.answers.items():
+            if marker in prompt:
+                if marker in self.meet:
+                    # Times out (BrokenBarrierError) unless the calls overlap
+                    self.barrier.wait()
+                return answer
+        raise AssertionError(f"unexpected prompt: {prompt[:60]}")
+
+
+def make_engine(reports_dir):
+    engine = ReflectionEngine("test-model", interactive=False, reports_dir=reports_dir)
+    engine.requirements = {"ticker": "TEST", "period": "2023", "capital": "$10000", "strategy": "sma cross"}
+    engine.code = "print('strategy')"
+    idx = pd.bdate_range("2023-01-02", periods=30)
+    engine.artifacts = {
+        "stats": pd.Series({"Return [%]": 4.2, "Equity Final [$]": 10420.0}),
+        "equity": pd.DataFrame({"Equity": range(10000, 10030), "DrawdownPct": 0.0}, index=idx),
+        "trades": pd.DataFrame({"EntryTime": idx[:2], "ExitTime": idx[1:3], "Size": 5, "PnL": [12.0, -3.0]}),
+    }
+    barrier = threading.Barrier(3, timeout=10)
+    engine.llm = RoutingLLM({
+        "Plan a backtest report": "1. Summary",
+        "Write a professional backtest report": "DRAFT BODY",
+        "ONE-LINE OUTPUT": "Strategy: sma cross · End: 2023-02-10",
+    }, meet=("ONE-LINE OUTPUT",), barrier=barrier)
+    engine.fast_llm = RoutingLLM({
+        "concise report title": "SMA Cross on TEST",
+        "Section type: equity_curve": "Growth of Capital",
+        "Which column likely contains": "Equity",
+    }, meet=("concise report title", "Which column likely contains"), barrier=barrier)
+    return engine
+
+
+def test_sections_run_concurrently_and_keep_their_order():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(tmp)
+        real_heading = engine._generate_section_name
+
+        def heading(section_type, language="English"):
+            if section_type == "trades":
+                raise ConnectionError("provider down")
+            return real_heading(section_type, language)
+
+        engine._generate_section_name = heading
+        message = engine._phase3_reporting()
+        assert "📄 REPORT FOLDER:" in message
+        with open(os.path.join(engine.run_dir, "report.md"), encoding="utf-8") as f:
+            report = f.read()
+        assert os.path.exists(os.path.join(engine.run_dir, "equity.png"))
+
+    sections = ["# SMA Cross on TEST", "**Strategy: sma cross · End: 2023-02-10**", "DRAFT BODY",
+                "## Trades (first 50)", "## Growth of Capital", "![](equity.png)"]
+    positions = [report.index(s) for s in sections]
+    assert positions == sorted(positions)
+    assert engine.tldr == "Strategy: sma cross · End: 2023-02-10"
+    assert engine.phase == "complete"
+
+
+if __name__ == "__main__":
+    test_sections_run_concurrently_and_keep_their_order()
+    print("✅ Report section tests passed")
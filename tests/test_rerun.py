@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Test incremental re-runs for capital/period/language-only follow-ups."""
+
+import sys
+import os
+import json
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.nlbt.reflection import ReflectionEngine
+from src.nlbt.rerun import mentions_parameters, parameter_changes, patch_code
+from src.nlbt.sandbox import Sandbox
+from tests.test_sandbox_results import FrameCache, synthetic_ohlcv
+
+ACCEPTED = {"ticker": "TEST", "period": "2023", "capital": "$10,000", "strategy": "buy and hold"}
+
+CODE = """
+from backtesting import Backtest, Strategy
+
+# Warm up a year early
+data = get_ohlcv_data('TEST', '2022-01-01', '2023-12-31')
+
+class MyStrategy(Strategy):
+    def init(self):
+        pass
+
+    def next(self):
+        if not self.position:
+            self.buy()
+
+CASH = 10000
+bt = Backtest(data, MyStrategy, cash=CASH)
+stats = bt.run()
+emit_result(stats)
+"""
+
+
+class CannedLLM:
+    """Answers every prompt with the same text and counts calls."""
+
+    def __init__(self, response):
+        self.response = response
+        self.calls = 0
+
+    def ask(self, prompt, cache=False, temperature=None):
+        self.calls += 1
+        return self.response
+
+
+def test_parameter_changes():
+    assert parameter_changes(ACCEPTED, {"capital": "$50000"}) == {"capital": "$50000"}
+    assert parameter_changes(ACCEPTED, {"capital": "10k", "period": "2022", "lang": "Spanish"}) == {
+        "period": "2022", "lang": "Spanish"}
+    assert parameter_changes(ACCEPTED, {"ticker": "test", "strategy": "Buy and hold"}) == {}
+    assert parameter_changes(ACCEPTED, {"ticker": "MSFT", "capital": "$50000"}) is None
+    assert parameter_changes(ACCEPTED, {"strategy": "RSI below 30"}) is None
+
+
+def test_mentions_parameters():
+    for text in ["actually make it $50000", "use 2022 instead", "make it 10k", "from March to June", "in Spanish please"]:
+        assert mentions_parameters(text), text
+    for text in ["thanks!", "explain the drawdown", "what does the market do?"]:
+        assert not mentions_parameters(text), text
+
+
+def test_patch_code_keeps_warmup():
+    code, notes = patch_code(CODE, ACCEPTED, {"capital": "₹5,00,000", "period": "2020-2021"})
+    assert "CASH = 500000" in code and "cash=CASH" in code
+    assert "get_ohlcv_data('TEST', '2019-01-01', '2021-12-31')" in code
+    assert "# Warm up a year early" in code
+    assert len(notes) == 3
+    try:
+        patch_code(CODE, ACCEPTED, {"period": "last 3 years"})
+        assert False, "relative periods can't be patched"
+    except ValueError:
+        pass
+
+
+def make_engine(extracted):
+    engine = ReflectionEngine("test-model", interactive=False)
+    engine.sandbox = Sandbox(cache=FrameCache(synthetic_ohlcv()), results=False)
+    engine.fast_llm = CannedLLM(json.dumps(extracted))
+    engine.code_llm = CannedLLM("unused")
+    engine.llm = CannedLLM("unused")
+    engine._phase3_reporting = lambda: "📄 REPORT FOLDER: reports/test"
+    engine.requirements = dict(ACCEPTED)
+    engine.baseline = {"requirements": dict(ACCEPTED), "code": CODE}
+    engine.phase = "complete"
+    return engine
+
+
+def test_capital_change_skips_generation():
+    engine = make_engine({"capital": "$50000"})
+    reply = engine.chat("actually make it $50000")
+    assert reply.startswith("♻️ Re-ran the accepted strategy with capital: $50000")
+    assert "📄 REPORT FOLDER: reports/test" in reply
+    assert engine.code_llm.calls == 0 and engine.llm.calls == 0
+    assert engine.artifacts["summary"]["initial"] == 50000
+    assert engine.requirements["capital"] == "$50000"
+    assert engine.baseline["code"] == engine.code and "CASH = 50000" in engine.code
+
+
+def test_other_changes_take_the_normal_path():
+    engine = make_engine({"strategy": "RSI below 30"})
+    reply = engine.chat("use an RSI strategy instead")
+    assert "Ready for new strategy" in reply
+    assert engine.code_llm.calls == 0
+    assert engine.baseline["code"] == CODE
+
+
+def test_unrelated_message_skips_extraction():
+    engine = make_engine({"capital": "$50000"})
+    extracted = []
+    engine._extract_requirements_llm = lambda text: extracted.append(text) or {}
+    assert engine._incremental_rerun("thanks, what does the drawdown mean?") is None
+    assert extracted == []
+    engine._incremental_rerun("now with $50000")
+    assert extracted == ["now with $50000"]
+
+
+class NoSandbox:
+    def run(self, code):
+        raise AssertionError("a language change must not execute the code again")
+
+
+def test_language_change_only_reports_again():
+    engine = make_engine({"lang": "Spanish"})
+    engine.sandbox = NoSandbox()
+    reply = engine.chat("write the report in Spanish")
+    assert reply.startswith("♻️ Re-reporting the accepted strategy with lang: Spanish")
+    assert "📄 REPORT FOLDER: reports/test" in reply
+    assert engine.requirements["lang"] == "Spanish"
+    assert engine.baseline == {"requirements": engine.requirements, "code": CODE}
+
+
+if __name__ == "__main__":
+    test_parameter_changes()
+    test_mentions_parameters()
+    test_patch_code_keeps_warmup()
+    test_capital_change_skips_generation()
+    test_other_changes_take_the_normal_path()
+    test_unrelated_message_skips_extraction()
+    test_language_change_only_reports_again()
+    print("✅ Incremental re-run tests passed")
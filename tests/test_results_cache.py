@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Test memoized sandbox results keyed on code and data fingerprints."""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from src.nlbt.results import ResultCache
+from src.nlbt.sandbox import Sandbox
+from tests.test_sandbox_results import FrameCache, synthetic_ohlcv, CODE
+
+EMITTING = CODE + "emit_result(stats)\nemit_artifact('note', {'bars': len(data)})\n"
+
+
+def test_identical_run_is_served_from_cache():
+    with tempfile.TemporaryDirectory() as tmp:
+        results = ResultCache(tmp)
+        sandbox = Sandbox(cache=FrameCache(synthetic_ohlcv()), results=results)
+        first = sandbox.run(EMITTING)
+        assert first["success"], first["error"]
+        assert "memoized" not in first
+
+        # Comments and formatting don't change the key
+        second = sandbox.run("# same strategy\n" + EMITTING.replace("cash=10000", "cash = 10000"))
+        assert second["memoized"] and results.hits == 1
+        assert second["output"] == first["output"]
+        a, b = first["artifacts"], second["artifacts"]
+        for key in ("Return [%]", "# Trades", "Start", "Max. Drawdown Duration"):
+            assert a["stats"][key] == b["stats"][key]
+        pd.testing.assert_frame_equal(a["equity"], b["equity"], check_freq=False)
+        pd.testing.assert_frame_equal(a["trades"], b["trades"], check_dtype=False)
+        assert b["summary"] == a["summary"]
+        assert b["note"] == {"bars": 300}
+
+
+def test_refreshed_data_invalidates():
+    with tempfile.TemporaryDirectory() as tmp:
+        results = ResultCache(tmp)
+        Sandbox(cache=FrameCache(synthetic_ohlcv()), results=results).run(EMITTING)
+        refreshed = Sandbox(cache=FrameCache(synthetic_ohlcv(seed=8)), results=results).run(EMITTING)
+        assert "memoized" not in refreshed
+        assert results.misses == 2
+        # The entry now matches the refreshed data
+        again = Sandbox(cache=FrameCache(synthetic_ohlcv(seed=8)), results=results).run(EMITTING)
+        assert again["memoized"]
+
+
+def test_failures_and_unknown_data_are_not_stored():
+    with tempfile.TemporaryDirectory() as tmp:
+        results = ResultCache(tmp)
+        sandbox = Sandbox(cache=FrameCache(synthetic_ohlcv()), results=results)
+        assert not sandbox.run("raise ValueError('boom')")["success"]
+        assert sandbox.run("print('no data requested')")["success"]
+        assert os.listdir(tmp) == []
+
+
+def test_unkeyable_code_still_runs():
+    with tempfile.TemporaryDirectory() as tmp:
+        results = ResultCache(tmp)
+
+        def broken_key(code):
+            raise AttributeError("module 'ast' has no attribute 'unparse'")
+
+        results.key = broken_key
+        result = Sandbox(cache=FrameCache(synthetic_ohlcv()), results=results).run(EMITTING)
+        assert result["success"], result["error"]
+        assert results.misses == 1 and os.listdir(tmp) == []
+    # Unterminated code can't be tokenized; it keys on the raw text
+    assert ResultCache.key("x = (") == ResultCache.key("x = (")
+
+
+def test_disabled():
+    sandbox = Sandbox(cache=FrameCache(synthetic_ohlcv()), results=False)
+    assert sandbox.results is None
+    assert "memoized" not in sandbox.run(EMITTING)
+
+
+if __name__ == "__main__":
+    test_identical_run_is_served_from_cache()
+    test_refreshed_data_invalidates()
+    test_failures_and_unknown_data_are_not_stored()
+    test_unkeyable_code_still_runs()
+    test_disabled()
+    print("✅ Result cache tests passed")
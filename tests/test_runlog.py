@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Test run logs are flushed, closed and forgotten at the end of each run."""
+
+import sys
+import os
+import json
+import logging
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.nlbt.runlog import RunLog, open_run_files
+
+
+def test_run_log_writes_files_and_events():
+    with tempfile.TemporaryDirectory() as run_dir:
+        log = RunLog(run_dir)
+        log.debug.info("attempt 1")
+        log.agent.info("=== METADATA ===")
+        log.event("report_saved", tldr="up 5%", summary={"pnl_pct": 5.0})
+        log.close()
+
+        assert open(os.path.join(run_dir, "debug.log")).read() == "attempt 1\n"
+        assert "=== METADATA ===" in open(os.path.join(run_dir, "agent.log")).read()
+        event = json.loads(open(os.path.join(run_dir, "events.jsonl")).readline())
+        assert event["event"] == "report_saved" and event["summary"] == {"pnl_pct": 5.0}
+
+
+def test_many_runs_do_not_leak_handlers_or_loggers():
+    with tempfile.TemporaryDirectory() as root:
+        before = len(logging.Logger.manager.loggerDict)
+        for i in range(200):
+            run_dir = os.path.join(root, str(i))
+            os.makedirs(run_dir)
+            with RunLog(run_dir) as log:
+                log.debug.info("run %d", i)
+        assert open_run_files() == 0
+        assert len(logging.Logger.manager.loggerDict) <= before + 2
+        assert open(os.path.join(root, "199", "debug.log")).read() == "run 199\n"
+
+
+if __name__ == "__main__":
+    test_run_log_writes_files_and_events()
+    test_many_runs_do_not_leak_handlers_or_loggers()
+    print("✅ Run logging tests passed")
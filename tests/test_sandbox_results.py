@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Test that Sandbox.run hands backtest results back as objects."""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from src.nlbt.sandbox import Sandbox
+
+
+class FrameCache:
+    """In-memory stand-in for OHLCVCache serving one synthetic frame."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def get(self, ticker, start, end):
+        return self.data.loc[start:end]
+
+
+def synthetic_ohlcv(n=300, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    idx = pd.bdate_range("2023-01-02", periods=n)
+    return pd.DataFrame({
+        "Open": close * (1 + rng.normal(0, 0.002, n)),
+        "High": close * 1.01,
+        "Low": close * 0.99,
+        "Close": close,
+        "Volume": rng.integers(1_000, 10_000, n),
+    }, index=idx)
+
+
+CODE = """
+from backtesting import Backtest, Strategy
+
+data = get_ohlcv_data('TEST', '2023-01-01', '2024-12-31')
+
+class MyStrategy(Strategy):
+    def init(self):
+        pass
+
+    def next(self):
+        if not self.position:
+            self.buy()
+
+bt = Backtest(data, MyStrategy, cash=10000)
+stats = bt.run()
+print(stats)
+"""
+
+
+def test_emit_result_returns_objects():
+    """emit_result(stats) yields DataFrames and a summary, not CSV text."""
+    result = Sandbox(cache=FrameCache(synthetic_ohlcv()), results=False).run(CODE + "emit_result(stats)\n")
+    assert result["success"], result["error"]
+    artifacts = result["artifacts"]
+    assert isinstance(artifacts["equity"], pd.DataFrame)
+    assert isinstance(artifacts["trades"], pd.DataFrame)
+    assert "_strategy" not in artifacts["stats"].index
+    assert artifacts["summary"]["initial"] == 10000
+    assert "EQUITY_CSV" not in result["output"]
+
+
+def test_stats_picked_up_without_emit():
+    """Code that forgets emit_result still returns structured results."""
+    result = Sandbox(cache=FrameCache(synthetic_ohlcv()), results=False).run(CODE)
+    assert result["success"], result["error"]
+    assert result["artifacts"]["summary"]["equity_final"] > 0
+
+
+if __name__ == "__main__":
+    test_emit_result_returns_objects()
+    test_stats_picked_up_without_emit()
+    print("✅ Sandbox result channel tests passed")
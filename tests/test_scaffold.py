@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""Test the validator's scaffold context is a cached capability manifest."""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.nlbt import reflection
+from src.nlbt.reflection import scaffold_digest
+
+
+def test_scaffold_digest_is_versioned_and_cached():
+    text = scaffold_digest()
+    assert text.startswith("SCAFFOLD VERSION: ")
+    assert "get_ohlcv_data(ticker, start, end)" in text
+    assert "class Sandbox" not in text  # manifest, not raw source
+    key = reflection._SCAFFOLD_CACHE["key"]
+    assert scaffold_digest() is text
+    assert reflection._SCAFFOLD_CACHE["key"] == key
+
+
+def test_scaffold_digest_rebuilds_when_sources_change():
+    scaffold_digest()
+    reflection._SCAFFOLD_CACHE["key"] = ("stale",)
+    reflection._SCAFFOLD_CACHE["text"] = "old"
+    assert scaffold_digest().startswith("SCAFFOLD VERSION: ")
+
+
+if __name__ == "__main__":
+    test_scaffold_digest_is_versioned_and_cached()
+    test_scaffold_digest_rebuilds_when_sources_change()
+    print("✅ Scaffold context tests passed")
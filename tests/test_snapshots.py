@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Test agent.log codebase snapshots are stored once and referenced by id."""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.nlbt.snapshots import git_sha, snapshot_codebase
+
+
+def test_identical_sources_share_one_snapshot():
+    with tempfile.TemporaryDirectory() as src, tempfile.TemporaryDirectory() as store:
+        os.makedirs(os.path.join(src, "src"))
+        module = os.path.join(src, "src", "mod.py")
+        with open(module, "w") as f:
+            f.write("x = 1\n")
+
+        first = snapshot_codebase(store, base_dir=src)
+        assert snapshot_codebase(store, base_dir=src) == first
+        assert os.listdir(store) == [f"{first}.txt"]
+        assert "--- src/mod.py ---\nx = 1" in open(os.path.join(store, f"{first}.txt")).read()
+
+        with open(module, "w") as f:
+            f.write("x = 22\n")
+        second = snapshot_codebase(store, base_dir=src)
+        assert second != first
+        assert sorted(os.listdir(store)) == sorted([f"{first}.txt", f"{second}.txt"])
+
+
+def test_git_sha_is_resolved_once():
+    assert git_sha() is git_sha()
+
+
+if __name__ == "__main__":
+    test_identical_sources_share_one_snapshot()
+    test_git_sha_is_resolved_once()
+    print("✅ Snapshot tests passed")
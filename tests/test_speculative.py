@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Test speculative code generation picks the first accepted candidate."""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.nlbt.reflection import ReflectionEngine
+from src.nlbt.sandbox import Sandbox
+from tests.test_sandbox_results import FrameCache, synthetic_ohlcv, CODE
+
+
+class CannedLLM:
+    """Stands in for a code model: returns a fixed response after a delay."""
+
+    def __init__(self, response, delay=0.0):
+        self.response = response
+        self.delay = delay
+        self.temperatures = []
+
+    def ask(self, prompt, cache=False, temperature=None):
+        self.temperatures.append(temperature)
+        time.sleep(self.delay)
+        return self.response
+
+
+def make_engine():
+    engine = ReflectionEngine("test-model", interactive=False)
+    engine.sandbox = Sandbox(cache=FrameCache(synthetic_ohlcv()), results=False)
+    engine.requirements = {"ticker": "TEST", "period": "2023", "capital": "10000", "strategy": "sma"}
+    engine._critic_decision = lambda result: "DECISION: PROCEED"
+    return engine
+
+
+def test_first_passing_candidate_wins_and_slow_ones_are_abandoned():
+    engine = make_engine()
+    broken = CannedLLM("```python\nraise ValueError('bad')\n```")
+    good = CannedLLM(f"```python\n{CODE}\n```", delay=0.1)
+    slow = CannedLLM("print('too late')", delay=5)
+
+    started = time.time()
+    code, result, critique = engine._speculate("prompt", [(broken, None), (good, 0.3), (slow, 0.6)])
+    assert time.time() - started < 4
+    assert code == CODE.strip()
+    assert result["success"] and "PROCEED" in critique
+    assert good.temperatures == [0.3]
+
+
+def test_failed_candidate_is_handed_to_the_fix_loop():
+    engine = make_engine()
+    code, result, critique = engine._speculate(
+        "prompt", [(CannedLLM("raise ValueError('bad')"), None), (CannedLLM("raise KeyError('x')"), 0.3)]
+    )
+    assert not result["success"] and critique is None
+
+
+def test_speculation_is_off_by_default():
+    os.environ.pop("NLBT_SPECULATIVE", None)
+    assert len(make_engine()._speculative_candidates()) == 1
+    os.environ["NLBT_SPECULATIVE"] = "3"
+    try:
+        temperatures = [t for _, t in make_engine()._speculative_candidates()]
+        assert temperatures == [None, 0.3, 0.6]
+    finally:
+        os.environ.pop("NLBT_SPECULATIVE")
+
+
+if __name__ == "__main__":
+    test_first_passing_candidate_wins_and_slow_ones_are_abandoned()
+    test_failed_candidate_is_handed_to_the_fix_loop()
+    test_speculation_is_off_by_default()
+    print("✅ Speculative generation tests passed")
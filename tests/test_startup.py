@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Track import time of the CLI entry point and keep heavy modules lazy."""
+
+import sys
+import os
+import subprocess
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.nlbt import llm as llm_module
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ["pandas", "numpy", "matplotlib", "weasyprint", "yfinance", "backtesting", "llm", "rich"]
+BUDGET_US = 300_000
+
+
+def import_times(code: str) -> dict:
+    """Cumulative microseconds per module from `python -X importtime`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, timeout=60,
+        env=dict(os.environ, LLM_MODEL="test-model"),
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    times = {}
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_import_and_engine_construction_stay_light():
+    times = import_times(
+        "from src.nlbt.cli import main\n"
+        "from src.nlbt.reflection import ReflectionEngine\n"
+        "ReflectionEngine()\n"
+    )
+    loaded = [m for m in HEAVY if m in times]
+    assert loaded == [], f"imported at startup: {loaded}"
+    total = times["src.nlbt.cli"] + times.get("src.nlbt.reflection", 0)
+    print(f"  nlbt startup imports: {total / 1000:.1f} ms")
+    assert total < BUDGET_US
+
+
+class CountingTransport:
+    calls = 0
+
+    def default_model(self):
+        CountingTransport.calls += 1
+        return "resolved-model"
+
+
+def test_default_model_is_resolved_once_and_cached_on_disk():
+    with tempfile.TemporaryDirectory() as tmp:
+        old = os.environ.get("CACHE_DIR")
+        os.environ["CACHE_DIR"] = tmp
+        try:
+            llm_module._DEFAULTS.clear()
+            assert llm_module.default_model(CountingTransport, "test") == "resolved-model"
+            llm_module._DEFAULTS.clear()  # as in a fresh process
+            assert llm_module.default_model(CountingTransport, "test") == "resolved-model"
+            assert CountingTransport.calls == 1
+        finally:
+            llm_module._DEFAULTS.clear()
+            if old is None:
+                os.environ.pop("CACHE_DIR")
+            else:
+                os.environ["CACHE_DIR"] = old
+
+
+if __name__ == "__main__":
+    test_cli_import_and_engine_construction_stay_light()
+    test_default_model_is_resolved_once_and_cached_on_disk()
+    print("✅ Startup tests passed")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Test report text is streamed to the sink and report.md as it arrives."""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.nlbt.reflection import ReflectionEngine
+
+
+class ChunkedLLM:
+    """Stands in for the chat model: streams a canned answer in pieces."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.closed = False
+
+    def stream(self, prompt, temperature=None):
+        try:
+            for chunk in self.chunks:
+                yield chunk
+        finally:
+            self.closed = True
+
+
+def test_stream_reaches_sink_and_file_progressively():
+    engine = ReflectionEngine("test-model", interactive=False)
+    engine.llm = ChunkedLLM(["## Summary\n", "Return was ", "12%."])
+    seen = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "report.md")
+
+        def sink(stage, chunk):
+            seen.append((stage, chunk))
+            # Everything received so far is already on disk
+            assert open(path).read().endswith(chunk)
+
+        engine.stream_sink = sink
+        text = engine._stream_text("write", "report", path)
+
+    assert text == "## Summary\nReturn was 12%."
+    assert [c for _, c in seen] == engine.llm.chunks and seen[0][0] == "report"
+
+
+def test_abort_closes_the_stream():
+    engine = ReflectionEngine("test-model", interactive=False)
+    engine.llm = ChunkedLLM(["one ", "two ", "three"])
+
+    def sink(stage, chunk):
+        if chunk == "two ":
+            raise KeyboardInterrupt
+
+    engine.stream_sink = sink
+    try:
+        engine._stream_text("plan", "plan")
+        assert False, "expected KeyboardInterrupt"
+    except KeyboardInterrupt:
+        pass
+    assert engine.llm.closed
+
+
+if __name__ == "__main__":
+    test_stream_reaches_sink_and_file_progressively()
+    test_abort_closes_the_stream()
+    print("✅ Streaming tests passed")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Test parameter sweeps over a parameterized generated strategy."""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.nlbt.sandbox import Sandbox
+from src.nlbt.sweep import parse_grid, run_sweep, strategy_parameters, write_sweep_report
+from tests.test_sandbox_results import FrameCache, synthetic_ohlcv
+
+CODE = """
+from backtesting import Backtest, Strategy
+
+data = get_ohlcv_data('TEST', '2023-01-01', '2024-12-31')
+
+def sma(values, n):
+    import pandas as pd
+    return pd.Series(values).rolling(n).mean().to_numpy()
+
+class MyStrategy(Strategy):
+    fast = 10
+    slow = 30
+
+    def init(self):
+        self.f = self.I(sma, self.data.Close, self.fast)
+        self.s = self.I(sma, self.data.Close, self.slow)
+
+    def next(self):
+        if self.f[-1] > self.s[-1] and not self.position:
+            self.buy()
+        elif self.f[-1] < self.s[-1] and self.position:
+            self.position.close()
+
+bt = Backtest(data, MyStrategy, cash=10000)
+stats = bt.run()
+emit_result(stats)
+"""
+
+
+def test_parse_grid_and_parameters():
+    assert parse_grid("fast=5,10 slow=20:40:10") == {"fast": [5, 10], "slow": [20, 30, 40]}
+    assert strategy_parameters(CODE) == {"fast": 10, "slow": 30}
+    for bad in ("n=10:50:0", "n=10:50:-5"):
+        try:
+            parse_grid(bad)
+            assert False, "non-positive steps must be rejected"
+        except ValueError as e:
+            assert "must be positive" in str(e)
+
+
+def test_sweep_reports_top_configurations():
+    """One execution covers the whole grid and reports the best configs."""
+    sandbox = Sandbox(cache=FrameCache(synthetic_ohlcv(400)), results=False)
+    result = run_sweep(sandbox, CODE, {"fast": [5, 10], "slow": [20, 30, 40]}, top_k=3)
+    assert result["success"], result["error"]
+    assert len(result["heatmap"]) == 6
+    assert list(result["top"].columns) == ["fast", "slow", "Return [%]"]
+    assert set(result["best_params"]) == {"fast", "slow"}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        md_path = write_sweep_report(result, tmp)
+        assert "Parameter Sweep (6 configurations)" in open(md_path).read()
+        assert os.path.exists(os.path.join(tmp, "sweep.csv"))
+
+
+def test_unknown_parameter_is_rejected():
+    result = run_sweep(Sandbox(cache=FrameCache(synthetic_ohlcv()), results=False), CODE, {"rsi_low": [25]})
+    assert not result["success"]
+    assert "fast, slow" in result["error"]
+
+
+if __name__ == "__main__":
+    test_parse_grid_and_parameters()
+    test_sweep_reports_top_configurations()
+    test_unknown_parameter_is_rejected()
+    print("✅ Sweep tests passed")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Test the vectorized signal kernel against Backtest.run."""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from src.nlbt import indicators as ind
+from src.nlbt.precheck import precheck
+from src.nlbt.sandbox import Sandbox
+from src.nlbt.vectorized import parity, run_signals
+from tests.test_sandbox_results import FrameCache, synthetic_ohlcv
+
+
+def _random_signals(n, seed, rate=0.05):
+    rng = np.random.default_rng(seed)
+    return rng.random(n) < rate, rng.random(n) < rate
+
+
+def test_parity_long_flat():
+    for seed in range(3):
+        data = synthetic_ohlcv(n=400, seed=seed)
+        entries, exits = _random_signals(len(data), seed)
+        assert parity(data, entries, exits, cash=10_000) == []
+
+
+def test_parity_long_short_and_commission():
+    data = synthetic_ohlcv(n=400, seed=11)
+    entries, exits = _random_signals(len(data), 11)
+    assert parity(data, entries, exits, cash=10_000, short=True) == []
+    assert parity(data, entries, exits, cash=25_000, commission=0.002) == []
+    assert parity(data, entries, exits, cash=25_000, commission=0.002, short=True) == []
+
+
+def test_parity_indicator_warmup():
+    data = synthetic_ohlcv(n=400, seed=5)
+    close = data["Close"].to_numpy()
+    fast, slow = ind.sma(close, 10), ind.sma(close, 60)
+    diffs = parity(data, fast > slow, fast < slow, indicators={"fast": fast, "slow": slow})
+    assert diffs == []
+    stats = run_signals(data, fast > slow, fast < slow, indicators={"fast": fast, "slow": slow})
+    # No trade before the slow SMA exists
+    assert stats["_trades"]["EntryBar"].min() > 60
+
+
+def test_parity_out_of_money():
+    data = synthetic_ohlcv(n=300, seed=1)
+    trend = np.linspace(1, 4, len(data))
+    for column in ("Open", "High", "Low", "Close"):
+        data[column] = data[column] * trend
+    exits = np.zeros(len(data), dtype=bool)
+    exits[10] = True
+    assert parity(data, np.zeros(len(data), dtype=bool), exits, short=True) == []
+
+
+def test_sandbox_fast_path():
+    code = """
+data = get_ohlcv_data('TEST', '2023-01-01', '2024-12-31')
+close = data['Close'].to_numpy()
+rsi = ind.rsi(close, 14)
+stats = run_signals(data, entries=rsi < 40, exits=rsi > 60, cash='$10,000', indicators={'rsi': rsi})
+emit_result(stats)
+"""
+    code, fixes, errors = precheck(code)
+    assert errors == [] and any("cash" in f for f in fixes)
+    result = Sandbox(cache=FrameCache(synthetic_ohlcv()), results=False).run(code)
+    assert result["success"], result["error"]
+    assert result["artifacts"]["summary"]["initial"] == 10000
+
+
+if __name__ == "__main__":
+    test_parity_long_flat()
+    test_parity_long_short_and_commission()
+    test_parity_indicator_warmup()
+    test_parity_out_of_money()
+    test_sandbox_fast_path()
+    print("✅ Vectorized kernel tests passed")
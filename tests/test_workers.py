@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Test the worker pool survives hangs and crashes in strategy code."""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.nlbt.workers import WorkerPool
+
+
+def test_pool_kills_hangs_and_recovers_from_crashes():
+    """A hung job times out, a crashing job is reported, the pool keeps serving."""
+    pool = WorkerPool(size=1, timeout=20)
+    try:
+        ok = pool.run("import pandas as pd\nprint(len(pd.Series([1, 2, 3])))")
+        assert ok["success"], ok["error"]
+        assert ok["output"].strip() == "3"
+
+        hung = pool.run("while True:\n    pass", timeout=1)
+        assert not hung["success"]
+        assert "TimeoutError" in hung["error"]
+
+        crashed = pool.run("import os\nos._exit(3)")
+        assert not crashed["success"]
+        assert "WorkerCrashed" in crashed["error"]
+
+        failed = pool.run("raise ValueError('bad strategy')")
+        assert not failed["success"]
+        assert "ValueError: bad strategy" in failed["error"]
+
+        again = pool.run("print('still alive')")
+        assert again["success"] and "still alive" in again["output"]
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    test_pool_kills_hangs_and_recovers_from_crashes()
+    print("✅ Worker pool tests passed")